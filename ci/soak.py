@@ -0,0 +1,27 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import subprocess
+import sys
+
+import click
+
+
+@click.command()
+@click.option("--iterations", default=100000, help="Number of updates to run.")
+def soak(iterations):
+    """Run the heap fragmentation soak test in micropython"""
+    print("Running soak test")
+    os.environ["MICROPYPATH"] = "src:" + os.environ.get(
+        "MICROPYPATH", ":examples:.frozen:~/.micropython/lib:/usr/lib/micropython"
+    )
+    result = subprocess.run(
+        ["micropython", "tests/tempe/soak_updates.py", str(iterations)]
+    )
+    sys.exit(result.returncode)
+
+
+if __name__ == "__main__":
+    soak()
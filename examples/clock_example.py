@@ -9,7 +9,7 @@ from machine import RTC
 import gc
 
 from tempe import colors
-from tempe.geometry import ColumnGeometry, RowGeometry
+from tempe.geometry import ColumnGeometry, RowGeometry, Transformed
 from tempe.data_view import Repeat
 from tempe.font import TempeFont
 from tempe.polar_geometry import polar_r_lines, polar_points, polar_point_arrays
@@ -68,61 +68,46 @@ class Clock:
             font=self.font,
         )
 
+        # hands are drawn pointing right from the origin, and then rotated
+        # and moved to the center of the clock as the time changes
+        self.hour_geometry = Transformed(
+            polar_point_arrays(
+                0,
+                0,
+                RowGeometry.from_lists(
+                    [[self.r - 50, -3, self.r - 50, 3, -10, -30, -10, 30]]
+                ),
+            )
+        )
+        self.minute_geometry = Transformed(
+            polar_point_arrays(
+                0,
+                0,
+                RowGeometry.from_lists(
+                    [[self.r - 20, -1, self.r - 20, 1, -20, -5, -20, 5]]
+                ),
+            )
+        )
+        self.second_geometry = Transformed(polar_r_lines(0, 0, [[-15, 0, self.r]]))
+        self.set_angles()
+
         self.hour_hand = surface.polygons(
-            DRAWING, self.hour_geometry(), colors.grey_8
+            DRAWING, self.hour_geometry, colors.grey_8
         )
         self.minute_hand = surface.polygons(
-            DRAWING, self.minute_geometry(), colors.grey_a
+            DRAWING, self.minute_geometry, colors.grey_a
         )
-        self.second_hand = surface.lines(DRAWING, self.second_geometry(), "#c22")
+        self.second_hand = surface.lines(DRAWING, self.second_geometry, "#c22")
 
         surface.circles(OVERLAY, (self.cx, self.cy, 3), colors.grey_2)
 
-    def hour_geometry(self):
-        angle = int(360 * (self.h % 12 + self.m / 60) / 12 - 90)
-        return polar_point_arrays(
-            self.cx,
-            self.cy,
-            RowGeometry.from_lists(
-                [
-                    [
-                        self.r - 50,
-                        angle - 3,
-                        self.r - 50,
-                        angle + 3,
-                        -10,
-                        angle - 30,
-                        -10,
-                        angle + 30,
-                    ]
-                ]
-            ),
-        )
-
-    def minute_geometry(self):
-        angle = int(360 * (self.m + self.s / 60) / 60 - 90)
-        return polar_point_arrays(
-            self.cx,
-            self.cy,
-            RowGeometry.from_lists(
-                [
-                    [
-                        self.r - 20,
-                        angle - 1,
-                        self.r - 20,
-                        angle + 1,
-                        -20,
-                        angle - 5,
-                        -20,
-                        angle + 5,
-                    ]
-                ]
-            ),
-        )
-
-    def second_geometry(self):
-        angle = int(360 * self.s / 60 - 90)
-        return polar_r_lines(self.cx, self.cy, [[-15, angle, self.r]])
+    def set_angles(self):
+        hour_angle = int(360 * (self.h % 12 + self.m / 60) / 12 - 90)
+        self.hour_geometry.set_rotation(hour_angle, tx=self.cx, ty=self.cy)
+        minute_angle = int(360 * (self.m + self.s / 60) / 60 - 90)
+        self.minute_geometry.set_rotation(minute_angle, tx=self.cx, ty=self.cy)
+        second_angle = int(360 * self.s / 60 - 90)
+        self.second_geometry.set_rotation(second_angle, tx=self.cx, ty=self.cy)
 
     async def update_time(self):
         while True:
@@ -131,14 +116,17 @@ class Clock:
                 self.h = h
                 self.m = m
                 self.s = s
-                self.hour_hand.update(geometry=self.hour_geometry())
-                self.minute_hand.update(geometry=self.minute_geometry())
-                self.second_hand.update(geometry=self.second_geometry())
+                self.set_angles()
+                # passing the geometry damages the old and new positions
+                self.hour_hand.update(geometry=self.hour_geometry)
+                self.minute_hand.update(geometry=self.minute_geometry)
+                self.second_hand.update(geometry=self.second_geometry)
             elif s != self.s:
                 self.m = m
                 self.s = s
-                self.minute_hand.update(geometry=self.minute_geometry())
-                self.second_hand.update(geometry=self.second_geometry())
+                self.set_angles()
+                self.minute_hand.update(geometry=self.minute_geometry)
+                self.second_hand.update(geometry=self.second_geometry)
 
             await asyncio.sleep(0.1)
 
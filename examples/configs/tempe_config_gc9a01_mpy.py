@@ -25,8 +25,14 @@ class GC9A01MpyDisplay(Display):
         self.display = config(rotation, buffer_size, options)
         self.size = (self.display.width(), self.display.height())
 
-    def blit(self, buffer, x, y, w, h):
-        self.display.blit_buffer(buffer, x, y, w, h)
+    def blit(self, buffer, x, y, w, h, stride=None):
+        if stride is None or stride == w:
+            self.display.blit_buffer(buffer, x, y, w, h)
+            return
+        # send rows separately, since the buffer isn't contiguous
+        buffer = memoryview(buffer)
+        for i in range(h):
+            self.display.blit_buffer(buffer[2 * stride * i : 2 * (stride * i + w)], x, y + i, w, 1)
 
 
 async def init_display():
@@ -10,6 +10,7 @@ import gc
 
 from tempe import colors
 from tempe.font import TempeFont
+from tempe.scheduler import FrameScheduler
 from tempe.surface import Surface, BACKGROUND, DRAWING
 from tempe.text import BOTTOM, CENTER, TOP
 
@@ -71,13 +72,12 @@ async def update_temperature(adc, text_field):
 
 
 async def refresh_display(surface, display, working_buffer):
-    import time
-
+    # batch the clock and temperature updates into at most 10 frames a second
+    scheduler = FrameScheduler(surface, display, working_buffer, fps=10)
     while True:
         await surface.refresh_needed.wait()
-        start = time.ticks_us()
-        surface.refresh(display, working_buffer)
-        print(time.ticks_diff(time.ticks_us(), start))
+        await scheduler.frame()
+        print(scheduler.last_ms, scheduler.missed)
 
 
 async def run(display=None):
@@ -81,3 +81,362 @@ def intersect_poly_rect(polygon: ptr16, n: int, x: int, y: int, w: int, h: int)
         and y < max_y
         and min_y < y1
     )
+
+
+@micropython.viper
+def fill_rects(raster, rects: ptr16, n: int, k: int, colors, color: int, fill: int):
+    buf = ptr16(raster.buf)
+    offset = int(raster.offset)
+    stride = int(raster.stride)
+    rx = int(raster.x)
+    ry = int(raster.y)
+    rw = int(raster.w)
+    rh = int(raster.h)
+    palette = ptr16(rects)
+    if color < 0:
+        palette = ptr16(colors)
+    c: int = color
+    edges: int = 1
+    if fill == 0:
+        edges = 4
+    for i in range(n):
+        j: int = i * k
+        px: int = rects[j]
+        py: int = rects[j + 1]
+        pw: int = rects[j + 2]
+        ph: int = rects[j + 3]
+        # convert from unsigned 16-bit values
+        if px > 0x7FFF:
+            px -= 0x10000
+        if py > 0x7FFF:
+            py -= 0x10000
+        if pw > 0x7FFF:
+            pw -= 0x10000
+        if ph > 0x7FFF:
+            ph -= 0x10000
+        if color < 0:
+            c = palette[i]
+        px -= rx
+        py -= ry
+        if pw < 0:
+            px += pw
+            pw = -pw
+        if ph < 0:
+            py += ph
+            ph = -ph
+        for e in range(edges):
+            x0: int = px
+            y0: int = py
+            x1: int = px + pw
+            y1: int = py + ph
+            if edges == 4:
+                # outline is top, bottom, left, right edges
+                if e == 0:
+                    y1 = y0 + 1
+                elif e == 1:
+                    y0 = y1 - 1
+                elif e == 2:
+                    x1 = x0 + 1
+                else:
+                    x0 = x1 - 1
+            if x0 < 0:
+                x0 = 0
+            if y0 < 0:
+                y0 = 0
+            if x1 > rw:
+                x1 = rw
+            if y1 > rh:
+                y1 = rh
+            p: int = offset + y0 * stride
+            for row in range(y0, y1):
+                for col in range(x0, x1):
+                    buf[p + col] = c
+                p += stride
+
+
+@micropython.viper
+def fill_lines(raster, lines: ptr16, n: int, k: int, colors, color: int, vertical: int):
+    buf = ptr16(raster.buf)
+    offset = int(raster.offset)
+    stride = int(raster.stride)
+    rx = int(raster.x)
+    ry = int(raster.y)
+    rw = int(raster.w)
+    rh = int(raster.h)
+    palette = ptr16(lines)
+    if color < 0:
+        palette = ptr16(colors)
+    c: int = color
+    for i in range(n):
+        j: int = i * k
+        x0: int = lines[j]
+        y0: int = lines[j + 1]
+        l: int = lines[j + 2]
+        # convert from unsigned 16-bit values
+        if x0 > 0x7FFF:
+            x0 -= 0x10000
+        if y0 > 0x7FFF:
+            y0 -= 0x10000
+        if l > 0x7FFF:
+            l -= 0x10000
+        if color < 0:
+            c = palette[i]
+        x0 -= rx
+        y0 -= ry
+        if vertical:
+            x1: int = x0 + 1
+            y1: int = y0 + l
+        else:
+            x1 = x0 + l
+            y1 = y0 + 1
+        if x0 < 0:
+            x0 = 0
+        if y0 < 0:
+            y0 = 0
+        if x1 > rw:
+            x1 = rw
+        if y1 > rh:
+            y1 = rh
+        p: int = offset + y0 * stride
+        for row in range(y0, y1):
+            for col in range(x0, x1):
+                buf[p + col] = c
+            p += stride
+
+
+@micropython.viper
+def fill_pixels(raster, points: ptr16, n: int, k: int, colors, color: int):
+    buf = ptr16(raster.buf)
+    offset = int(raster.offset)
+    stride = int(raster.stride)
+    rx = int(raster.x)
+    ry = int(raster.y)
+    rw = uint(raster.w)
+    rh = uint(raster.h)
+    palette = ptr16(points)
+    if color < 0:
+        palette = ptr16(colors)
+    c: int = color
+    for i in range(n):
+        j: int = i * k
+        px: int = points[j]
+        py: int = points[j + 1]
+        if px > 0x7FFF:
+            px -= 0x10000
+        if py > 0x7FFF:
+            py -= 0x10000
+        px -= rx
+        py -= ry
+        # unsigned comparison also rejects negative values
+        if uint(px) < rw and uint(py) < rh:
+            if color < 0:
+                c = palette[i]
+            buf[offset + py * stride + px] = c
+
+
+@micropython.viper
+def pack_column(buffer: ptr16, column: ptr16, start: int, n: int, k: int, j: int):
+    p: int = j
+    for i in range(start, start + n):
+        buffer[p] = column[i]
+        p += k
+
+
+@micropython.viper
+def pack_value(buffer: ptr16, value: int, n: int, k: int, j: int):
+    p: int = j
+    for i in range(n):
+        buffer[p] = value
+        p += k
+
+
+@micropython.viper
+def expand_palette(
+    dest: ptr16, src: ptr8, row: int, n: int, stride: int, palette: ptr16, format: int
+):
+    p: int = row * stride
+    if format == 6:
+        # GS8
+        for i in range(n):
+            dest[i] = palette[src[p + i]]
+    elif format == 2:
+        # GS4_HMSB
+        for i in range(n):
+            v: int = src[p >> 1]
+            if p & 1:
+                v &= 0xF
+            else:
+                v >>= 4
+            dest[i] = palette[v]
+            p += 1
+    elif format == 0:
+        # MONO_VLSB, where each byte is a column of 8 rows
+        p = (row >> 3) * stride
+        shift: int = row & 7
+        for i in range(n):
+            dest[i] = palette[(src[p + i] >> shift) & 1]
+    elif format == 3:
+        # MONO_HLSB
+        for i in range(n):
+            dest[i] = palette[(src[p >> 3] >> (7 - (p & 7))) & 1]
+            p += 1
+    else:
+        # MONO_HMSB
+        for i in range(n):
+            dest[i] = palette[(src[p >> 3] >> (p & 7)) & 1]
+            p += 1
+
+
+@micropython.viper
+def hash_tile(buf: ptr8, start: int, w: int, h: int, stride: int) -> uint:
+    # 32-bit FNV-1a hash of w bytes from each of h rows
+    mask: uint = (uint(0xFFFF) << 16) | uint(0xFFFF)
+    result: uint = (uint(0x811C) << 16) | uint(0x9DC5)
+    prime: uint = uint(0x01000193)
+    p: int = start
+    for i in range(h):
+        for j in range(w):
+            result = ((result ^ uint(buf[p + j])) * prime) & mask
+        p += stride
+    return result
+
+
+@micropython.viper
+def copy_rows(dest: ptr8, src: ptr8, start: int, row_bytes: int, stride: int, rows: int):
+    q: int = 0
+    p: int = start
+    for i in range(rows):
+        for j in range(row_bytes):
+            dest[q + j] = src[p + j]
+        q += row_bytes
+        p += stride
+
+
+@micropython.viper
+def shift_rect(buf: ptr8, start: int, row_bytes: int, rows: int, stride: int, dx: int, dy: int):
+    # copy in an order which never reads bytes that were already written
+    n: int = row_bytes - dx
+    d: int = dx
+    if dx < 0:
+        n = row_bytes + dx
+        d = 0
+    m: int = rows - dy
+    row: int = start + (rows - 1) * stride
+    step: int = -stride
+    if dy <= 0:
+        m = rows + dy
+        row = start
+        step = stride
+    if n <= 0 or m <= 0:
+        return
+    s: int = d - dx - dy * stride
+    p: int = 0
+    q: int = 0
+    j: int = 0
+    for i in range(m):
+        p = row + d
+        q = row + s
+        if dx > 0:
+            j = n - 1
+            while j >= 0:
+                buf[p + j] = buf[q + j]
+                j -= 1
+        else:
+            for j in range(n):
+                buf[p + j] = buf[q + j]
+        row += step
+
+
+@micropython.viper
+def transform_points(buf: ptr16, n: int, k: int, points: int, matrix: ptr16):
+    a: int = matrix[0]
+    b: int = matrix[1]
+    c: int = matrix[2]
+    d: int = matrix[3]
+    tx: int = matrix[4]
+    ty: int = matrix[5]
+    # convert from unsigned 16-bit values
+    if a > 0x7FFF:
+        a -= 0x10000
+    if b > 0x7FFF:
+        b -= 0x10000
+    if c > 0x7FFF:
+        c -= 0x10000
+    if d > 0x7FFF:
+        d -= 0x10000
+    if tx > 0x7FFF:
+        tx -= 0x10000
+    if ty > 0x7FFF:
+        ty -= 0x10000
+    for i in range(n):
+        p: int = i * k
+        for j in range(points):
+            x: int = buf[p]
+            y: int = buf[p + 1]
+            if x > 0x7FFF:
+                x -= 0x10000
+            if y > 0x7FFF:
+                y -= 0x10000
+            # matrix entries have 10 fractional bits, rounded to nearest
+            buf[p] = ((a * x + b * y + 512) >> 10) + tx
+            buf[p + 1] = ((c * x + d * y + 512) >> 10) + ty
+            p += 2
+
+
+@micropython.viper
+def fill_heatmap(
+    raster,
+    indices: ptr8,
+    width: int,
+    height: int,
+    x: int,
+    y: int,
+    w: int,
+    h: int,
+    colormap: ptr16,
+):
+    buf = ptr16(raster.buf)
+    offset = int(raster.offset)
+    stride = int(raster.stride)
+    rx = int(raster.x)
+    ry = int(raster.y)
+    rw = int(raster.w)
+    rh = int(raster.h)
+    # part of the heatmap inside the raster, in raster coordinates
+    x0: int = x - rx
+    y0: int = y - ry
+    x1: int = x0 + w
+    y1: int = y0 + h
+    if x0 < 0:
+        x0 = 0
+    if y0 < 0:
+        y0 = 0
+    if x1 > rw:
+        x1 = rw
+    if y1 > rh:
+        y1 = rh
+    if x0 >= x1 or y0 >= y1:
+        return
+    # cells of the first pixels, then stepped without dividing
+    i: int = (x0 + rx - x) * width
+    first_column: int = i // w
+    first_error: int = i - first_column * w
+    i = (y0 + ry - y) * height
+    row: int = i // h
+    row_error: int = i - row * h
+    p: int = offset + y0 * stride
+    for py in range(y0, y1):
+        start: int = row * width
+        column: int = first_column
+        error: int = first_error
+        for px in range(x0, x1):
+            buf[p + px] = colormap[indices[start + column]]
+            error += width
+            while error >= w:
+                error -= w
+                column += 1
+        p += stride
+        row_error += height
+        while row_error >= h:
+            row_error -= h
+            row += 1
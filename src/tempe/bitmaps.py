@@ -2,10 +2,9 @@
 #
 # SPDX-License-Identifier: MIT
 
-from array import array
 import framebuf
 
-from .shapes import ColoredGeometry, Shape, BLIT_KEY_RGB565
+from .shapes import ColoredGeometry, Shape, _blit_key, _palette, _palette_buf
 
 
 class Bitmaps(Shape):
@@ -19,6 +18,8 @@ class Bitmaps(Shape):
         self.buffers = buffers
         self.key = key
         self.palette = palette
+        self._palette_fbuf = None
+        self._palette_data = None
 
     def update(self, geometry=None, buffers=None):
         if geometry is not None:
@@ -26,7 +27,7 @@ class Bitmaps(Shape):
                 # invalidate old geometry bounds
                 if self._bounds is None:
                     self._bounds = self._get_bounds()
-                self.surface.damage(self._bounds)
+                self.surface.damage(self._bounds, self.layer)
             self.geometry = geometry
             # bounds are no longer valid
             self._bounds = None
@@ -46,10 +47,14 @@ class Bitmaps(Shape):
         y = raster.y
         w = raster.w
         h = raster.h
-        if self.palette is not None:
+        palette = self._palette_fbuf
+        if self.palette is not None and self.palette is not self._palette_data:
+            # palette has changed, so create a new palette framebuffer
             palette = framebuf.FrameBuffer(
                 self.palette, len(self.palette), 1, framebuf.RGB565
             )
+            self._palette_fbuf = palette
+            self._palette_data = self.palette
         for geometry, fbuf in self:
             px = geometry[0] - x
             py = geometry[1] - y
@@ -62,6 +67,22 @@ class Bitmaps(Shape):
             else:
                 buffer.blit(fbuf, px, py, self.key)
 
+    def _get_opaque(self):
+        if self.key != -1:
+            return None
+        opaque = None
+        for geometry, fbuf in self:
+            if opaque is not None:
+                # only single bitmaps are considered
+                return None
+            w = geometry[2]
+            h = geometry[3]
+            if w <= 0 or h <= 0 or fbuf.pixel(w - 1, h - 1) is None:
+                # the framebuffer doesn't cover the whole rectangle
+                return None
+            opaque = (geometry[0], geometry[1], w, h)
+        return opaque
+
     def _get_bounds(self):
         max_x = -0x7FFF
         min_x = 0x7FFF
@@ -75,6 +96,17 @@ class Bitmaps(Shape):
 
         return (min_x, min_y, max_x - min_x, max_y - min_y)
 
+    def _item_bounds(self):
+        for geometry in self.geometry:
+            x, y, w, h = geometry[0], geometry[1], geometry[2], geometry[3]
+            if w < 0:
+                x += w
+                w = -w
+            if h < 0:
+                y += h
+                h = -h
+            yield (x, y, w, h)
+
 
 class ColoredBitmaps(ColoredGeometry):
     """Draw 1-bit framebuffers bitmaps at points in given colors."""
@@ -100,8 +132,9 @@ class ColoredBitmaps(ColoredGeometry):
         y = raster.y
         w = raster.w
         h = raster.h
-        palette_buf = array("H", [BLIT_KEY_RGB565, 0x0000])
-        palette = framebuf.FrameBuffer(palette_buf, 2, 1, framebuf.RGB565)
+        palette_buf = _palette_buf
+        palette = _palette
+        key = _blit_key(raster)
         for geometry, color, buf in self:
             palette_buf[1] = color
             px = geometry[0] - x
@@ -110,7 +143,7 @@ class ColoredBitmaps(ColoredGeometry):
             ph = geometry[3]
             if (px + pw < 0 or px > w or py + ph < 0 or py > h):
                 continue
-            buffer.blit(buf, px, py, BLIT_KEY_RGB565, palette)
+            buffer.blit(buf, px, py, key, palette)
 
     def _get_bounds(self):
         max_x = -0x7FFF
@@ -124,3 +157,14 @@ class ColoredBitmaps(ColoredGeometry):
             min_y = min(min_y, geometry[1], geometry[1] + geometry[3])
 
         return (min_x, min_y, max_x - min_x, max_y - min_y)
+
+    def _item_bounds(self):
+        for geometry in self.geometry:
+            x, y, w, h = geometry[0], geometry[1], geometry[2], geometry[3]
+            if w < 0:
+                x += w
+                w = -w
+            if h < 0:
+                y += h
+                h = -h
+            yield (x, y, w, h)
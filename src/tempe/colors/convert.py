@@ -43,6 +43,15 @@ def rgb24_to_rgb565(r, g, b, big_endian=True):
         return bytes
 
 
+def rgb565_to_rgb24(color, big_endian=True):
+    if big_endian:
+        color = (color >> 8) | ((color & 0xFF) << 8)
+    r = (color >> 11) & 0x1F
+    g = (color >> 5) & 0x3F
+    b = color & 0x1F
+    return ((r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2))
+
+
 def rgb_to_rgb565(r, g, b, big_endian=True):
     bytes = (
         (int(round(r * 0x1F)) << 11)
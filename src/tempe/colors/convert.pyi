@@ -16,6 +16,8 @@ def rgb444_to_rgb565(r: int, g: int, b: int, big_endian: bool = True) -> rgb565:
 
 def rgb24_to_rgb565(r: int, g: int, b: int, big_endian: bool = True) -> rgb565: ...
 
+def rgb565_to_rgb24(color: rgb565, big_endian: bool = True) -> tuple[int, int, int]: ...
+
 def rgb_to_rgb565(r: float, g: float, b: float, big_endian: bool = True) -> rgb565: ...
 
 def from_str(color_str: str) -> rgb565: ...
@@ -18,9 +18,10 @@ from array import array
 
 from .colors import grey_1, grey_2, grey_e, grey_f
 from .geometry import RowGeometry, ColumnGeometry, StripGeometry
-from .data_view import DataView, Range
+from .data_view import DataView, Range, Repeat
 from .markers import Marker
 from .surface import BACKGROUND, DRAWING
+from .util import ArrayBuffer
 
 try:
     from .fonts import ubuntu16
@@ -74,22 +75,62 @@ class Component:
             self.shapes["background"] = self.surface.rectangles(
                 BACKGROUND,
                 RowGeometry.from_lists([self.bounds]),
-                [self.style["background_color"]],
+                [self._color(self.style["background_color"])],
                 clip=self.bounds,
             )
 
+    def _color(self, color):
+        """A style color as drawn on the surface, mapping it into any palette."""
+        if self.surface.palette is not None:
+            return self.surface.palette_index(color)
+        return color
+
+    def _colors(self, colors):
+        """Colors as drawn on the surface, mapping them into any palette."""
+        if self.surface.palette is None:
+            return colors
+        if isinstance(colors, Repeat):
+            return Repeat(self.surface.palette_index(colors.data))
+        return [self.surface.palette_index(color) for color in colors]
+
+    def _array(self, buffer, n):
+        """An array of n coordinates, which is new if another thread may be drawing."""
+        if self.surface.threaded:
+            return array("h", bytearray(2 * n))
+        return buffer.get(n)
+
+    def _refill(self, shape, rows):
+        """Replace a shape's rows, without changing arrays another thread may read."""
+        if self.surface.threaded:
+            shape.geometry = RowGeometry.from_lists(rows)
+        else:
+            shape.geometry.refill(rows)
+
+    def _set_first(self, shape, name, value):
+        """Set the first item of a shape's data, copying it if it may be shared."""
+        values = getattr(shape, name)
+        if self.surface.threaded:
+            values = list(values)
+            setattr(shape, name, values)
+        values[0] = value
+
     def move(self, bounds):
         self.surface.damage(bounds)
         self.surface.damage(self.bounds)
         self.bounds = bounds
-        self.shapes["background"].geometry = RowGeometry.from_lists([self.bounds])
-        self.shapes["background"].clip = self.bounds
+        if "background" in self.shapes:
+            self._refill(self.shapes["background"], [bounds])
+            self.shapes["background"].clip = bounds
         self.update()
 
     def update(self):
         if "background" in self.shapes:
             if self.style["background_color"] is not None:
-                self.shapes["background"].colors = [self.style["background_color"]]
+                self._set_first(
+                    self.shapes["background"],
+                    "colors",
+                    self._color(self.style["background_color"]),
+                )
             else:
                 del self.shapes["background"]
         elif self.style["background_color"] is not None:
@@ -119,14 +160,14 @@ class Label(Component):
         self.shapes["text"] = self.surface.text(
             DRAWING,
             RowGeometry.from_lists([self.bounds[:2]]),
-            [self.style["color"]],
+            [self._color(self.style["color"])],
             [self.format(self.value)],
             font=self.style["font"],
             clip=self.bounds,
         )
 
     def move(self, bounds):
-        self.shapes["text"].geometry = RowGeometry.from_lists([bounds[:2]])
+        self._refill(self.shapes["text"], [bounds[:2]])
         self.shapes["text"].clip = bounds
         super().move(bounds)
 
@@ -134,8 +175,8 @@ class Label(Component):
         if "text" not in self.shapes:
             self.draw()
         else:
-            self.shapes["text"].texts = [self.format(self.value)]
-            self.shapes["text"].colors[0] = self.style["color"]
+            self._set_first(self.shapes["text"], "texts", self.format(self.value))
+            self._set_first(self.shapes["text"], "colors", self._color(self.style["color"]))
             self.shapes["text"].font = self.style["font"]
         super().update()
 
@@ -182,9 +223,10 @@ class LinePlot(Component):
         self.orientation = orientation
         self.x_origin = x_origin
         self.y_origin = y_origin
+        self._vertices = ArrayBuffer("h")
 
     def map_xy(self):
-        vertex_strip = array("h", bytearray(4 * len(self.values)))
+        vertex_strip = self._array(self._vertices, 2 * len(self.values))
         for i, (index, value) in enumerate(zip(self.index, self.values)):
             x = self.bounds[0] + self.bounds[2] * (index - self.index_range[0]) / (
                 self.index_range[1] - self.index_range[0]
@@ -207,7 +249,7 @@ class LinePlot(Component):
         self.shapes["lines"] = self.surface.lines(
             DRAWING,
             StripGeometry(vertices),
-            self.colors,
+            self._colors(self.colors),
             clip=self.bounds,
         )
 
@@ -220,7 +262,7 @@ class LinePlot(Component):
             self.draw()
         else:
             self.shapes["lines"].geometry.geometry = self.map_xy()
-            self.shapes["lines"].colors = self.colors
+            self.shapes["lines"].colors = self._colors(self.colors)
         super().update()
 
 
@@ -271,10 +313,13 @@ class ScatterPlot(Component):
         self.orientation = orientation
         self.x_origin = x_origin
         self.y_origin = y_origin
+        self._xs = ArrayBuffer("h")
+        self._ys = ArrayBuffer("h")
+        self._columns = [None, None]
 
     def map_xy(self):
-        xs = array("h", bytearray(2 * len(self.values)))
-        ys = array("h", bytearray(2 * len(self.values)))
+        xs = self._array(self._xs, len(self.values))
+        ys = self._array(self._ys, len(self.values))
         for i, (index, value) in enumerate(zip(self.index, self.values)):
             x = self.bounds[0] + self.bounds[2] * (index - self.index_range[0]) / (
                 self.index_range[1] - self.index_range[0]
@@ -289,15 +334,19 @@ class ScatterPlot(Component):
             xs[i] = int(x)
             ys[i] = int(y)
 
-        return xs, ys
+        columns = self._columns
+        if self.surface.threaded:
+            columns = [None, None]
+        columns[0] = xs
+        columns[1] = ys
+        return columns
 
     def draw(self):
         super().draw()
-        xs, ys = self.map_xy()
-        self.shapes["markers"] = self.surface.points(
+        self.shapes["markers"] = self.surface.markers(
             DRAWING,
-            ColumnGeometry([xs, ys]),
-            self.colors,
+            ColumnGeometry(self.map_xy()),
+            self._colors(self.colors),
             self.sizes,
             self.markers,
             clip=self.bounds,
@@ -312,7 +361,7 @@ class ScatterPlot(Component):
             self.draw()
         else:
             self.shapes["markers"].geometry.geometry = self.map_xy()
-            self.shapes["markers"].colors = self.colors
+            self.shapes["markers"].colors = self._colors(self.colors)
             self.shapes["markers"].markers = self.markers
         super().update()
 
@@ -364,10 +413,13 @@ class BarPlot(Component):
         self.orientation = orientation
         self.x_origin = x_origin
         self.y_origin = y_origin
+        self._xs = ArrayBuffer("h")
+        self._hs = ArrayBuffer("h")
+        self._columns = [None, Repeat(0), Repeat(3), None]
 
     def map_xy(self):
-        xs = array("h", bytearray(2 * len(self.values)))
-        hs = array("h", bytearray(2 * len(self.values)))
+        xs = self._array(self._xs, len(self.values))
+        hs = self._array(self._hs, len(self.values))
         for i, (index, value) in enumerate(zip(self.index, self.values)):
             x = self.bounds[0] + self.bounds[2] * (index - self.index_range[0]) / (
                 self.index_range[1] - self.index_range[0]
@@ -380,12 +432,13 @@ class BarPlot(Component):
             xs[i] = int(x)
             hs[i] = int(h)
 
-        return (
-            xs,
-            DataView.create(self.bounds[1] + self.bounds[3]),
-            DataView.create(3),
-            hs,
-        )
+        columns = self._columns
+        if self.surface.threaded:
+            columns = [None, Repeat(0), Repeat(3), None]
+        columns[0] = xs
+        columns[1].data = self.bounds[1] + self.bounds[3]
+        columns[3] = hs
+        return columns
 
     def draw(self):
         super().draw()
@@ -393,7 +446,7 @@ class BarPlot(Component):
         self.shapes["rects"] = self.surface.rectangles(
             DRAWING,
             ColumnGeometry(geometry),
-            self.colors,
+            self._colors(self.colors),
             clip=self.bounds,
         )
 
@@ -406,5 +459,5 @@ class BarPlot(Component):
             self.draw()
         else:
             self.shapes["rects"].geometry.geometry = self.map_xy()
-            self.shapes["rects"].colors = self.colors
+            self.shapes["rects"].colors = self._colors(self.colors)
         super().update()
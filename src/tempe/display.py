@@ -4,13 +4,49 @@
 
 import framebuf
 
+from .raster import Raster
+from .util import ArrayBuffer, expand_palette, shift_rect
+
+# shared row buffer for palette expansion
+_row_buffer = ArrayBuffer("H")
+
 
 class Display:
     """Abstract base class for Displays"""
 
     size: tuple[int, int]
+    format = framebuf.RGB565
+    raster = None
+
+    def blit(self, buffer, x, y, w, h, stride=None):
+        raise NotImplementedError
+
+    def flush(self, x, y, w, h):
+        pass
+
+    def scroll(self, rect, dx, dy):
+        return False
+
+    def blit_palette(self, buffer, x, y, w, h, stride, format, palette):
+        row = _row_buffer.get(w)
+        for i in range(h):
+            expand_palette(row, buffer, i, w, stride, palette, format)
+            self.blit(row, x, y + i, w, 1)
+
+    def fill(self, x, y, w, h, color):
+        row = _row_buffer.get(w)
+        for i in range(w):
+            row[i] = color
+        for i in range(h):
+            self.blit(row, x, y + i, w, 1)
+
+
+class MonoDisplay(Display):
+    """Abstract base class for 1-bit Displays"""
+
+    format = framebuf.MONO_VLSB
 
-    def blit(self, buffer, x, y, w, h):
+    def blit(self, buffer, x, y, w, h, stride=None):
         raise NotImplementedError
 
 
@@ -20,16 +56,74 @@ class FrameBufferDisplay(Display):
     fbuf: framebuf.FrameBuffer
     palette: framebuf.FrameBuffer | None = None
 
-    def __init__(self, fbuf, size, palette=None):
+    def __init__(self, fbuf, size, palette=None, format=framebuf.RGB565, buffer=None):
         self.fbuf = fbuf
         self.size = size
         self.palette = palette
-
-    def blit(self, buffer, x, y, w, h):
+        self.format = format
+        if buffer is not None:
+            # a view of the whole buffer that surfaces can draw into directly
+            self.raster = Raster(buffer, 0, 0, size[0], size[1], format=format)
+        self._index_palette = None
+        self._index_palette_fbuf = None
+
+    def blit(self, buffer, x, y, w, h, stride=None):
         if isinstance(buffer, framebuf.FrameBuffer):
             self.fbuf.blit(buffer, x, y, -1, self.palette)
+        elif stride is None:
+            self.fbuf.blit((buffer, w, h, self.format), x, y, -1, self.palette)
+        else:
+            self.fbuf.blit((buffer, w, h, self.format, stride), x, y, -1, self.palette)
+
+    def blit_palette(self, buffer, x, y, w, h, stride, format, palette):
+        if self.palette is not None:
+            # expand to RGB565 so the display palette can be applied
+            super().blit_palette(buffer, x, y, w, h, stride, format, palette)
+            return
+        if palette is not self._index_palette:
+            self._index_palette_fbuf = framebuf.FrameBuffer(
+                palette, len(palette), 1, framebuf.RGB565
+            )
+            self._index_palette = palette
+        self.fbuf.blit(
+            (buffer, w, h, format, stride), x, y, -1, self._index_palette_fbuf
+        )
+
+    def fill(self, x, y, w, h, color):
+        if self.palette is not None:
+            # the color needs to go through the display palette
+            super().fill(x, y, w, h, color)
+            return
+        self.fbuf.fill_rect(x, y, w, h, color)
+
+    def scroll(self, rect, dx, dy):
+        x, y, w, h = rect
+        raster = self.raster
+        if raster is None:
+            if rect == (0, 0, self.size[0], self.size[1]):
+                self.fbuf.scroll(dx, dy)
+                return True
+            return False
+        view = raster.clip(x, y, w, h)
+        if (
+            view is None
+            or view.clip_rect is not None
+            or view.x != x
+            or view.y != y
+            or view.w != w
+            or view.h != h
+        ):
+            # the rectangle isn't entirely in the buffer, or isn't aligned
+            return False
+        if raster.bits >= 8:
+            # move whole rows of bytes
+            size = raster.bits // 8
+            shift_rect(
+                view.buf, view.offset * size, w * size, h, view.stride * size, dx * size, dy
+            )
         else:
-            self.fbuf.blit((buffer, w, h, framebuf.RGB565), x, y, -1, self.palette)
+            view.fbuf.scroll(dx, dy)
+        return True
 
     def clear(self) -> None:
         self.fbuf.rect(0, 0, *self.size, 0, True)
@@ -52,18 +146,36 @@ class FileDisplay(Display):
         for i in range(self.size[1]):
             self._io.write(row)
 
-    def blit(self, buffer, x, y, w, h):
+    def blit(self, buffer, x, y, w, h, stride=None):
         cols, rows = self.size
         if x + w > cols or y + h > rows:
             raise ValueError("Buffer too large")
         if self._io is None:
             raise RuntimeError("File is not open")
+        if stride is None:
+            stride = w
 
         # write out a row at a time
         ps = self.pixel_size
+        buffer = memoryview(buffer)
         for i in range(h):
             self._io.seek(ps * (cols * (y + i) + x))
-            self._io.write(memoryview(buffer)[ps * w * i : ps * w * (i + 1)])
+            self._io.write(buffer[ps * stride * i : ps * (stride * i + w)])
+
+    def blit_palette(self, buffer, x, y, w, h, stride, format, palette):
+        cols, rows = self.size
+        if x + w > cols or y + h > rows:
+            raise ValueError("Buffer too large")
+        if self._io is None:
+            raise RuntimeError("File is not open")
+
+        # expand and write out a row at a time
+        ps = self.pixel_size
+        row = _row_buffer.get(w)
+        for i in range(h):
+            expand_palette(row, buffer, i, w, stride, palette, format)
+            self._io.seek(ps * (cols * (y + i) + x))
+            self._io.write(row)
 
     def __enter__(self):
         if self._io is None:
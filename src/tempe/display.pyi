@@ -15,13 +15,23 @@ from array import array
 import framebuf
 from typing import Self, Protocol, runtime_checkable
 
+from .raster import Raster
+
 @runtime_checkable
 class Display(Protocol):
     """Abstract base class for Displays"""
 
     size: tuple[int, int]
 
-    def blit(self, buffer: array, x: int, y: int, w: int, h: int):
+    #: The framebuf format of pixel data passed to ``blit``.  Surfaces
+    #: rendering in the same format blit their buffers directly.
+    format: int = framebuf.RGB565
+
+    #: A Raster viewing the display's own pixel buffer, if surfaces can
+    #: render into it directly, otherwise None.
+    raster: Raster | None = None
+
+    def blit(self, buffer: array, x: int, y: int, w: int, h: int, stride: int | None = None):
         """Render the buffer to the given rectangle of the Display.
 
         The array buffer must match the width and height, and the edges
@@ -30,6 +40,8 @@ class Display(Protocol):
         Concrete subclasses must implement this method, either to
         directly render partial updates to the underlying device, or to
         render to a complete framebuffer which is then rendered.
+        Surfaces give a stride when they blit only part of the width of
+        their buffer, so implementations must skip the rest of each row.
 
         Parameters
         ----------
@@ -43,12 +55,161 @@ class Display(Protocol):
             The width of the rectangle to render into.
         h : int
             The height of the rectangle to render into.
+        stride : int | None
+            The number of pixels from the start of one row of the buffer to
+            the start of the next, or None if the rows are contiguous.
+        """
+
+    def blit_palette(
+        self,
+        buffer: array,
+        x: int,
+        y: int,
+        w: int,
+        h: int,
+        stride: int,
+        format: int,
+        palette: array[int],
+    ):
+        """Render palette-indexed pixels to the given rectangle of the Display.
+
+        This is used by Surfaces which render in an indexed format such as
+        GS8 or GS4_HMSB.  The default implementation expands each row to
+        RGB565 using the palette and calls ``blit`` for it, but subclasses
+        may override this to expand the palette more efficiently.
+
+        Parameters
+        ----------
+        buffer : array or other buffer
+            An array of pixel data in the given format.
+        x : int
+            The x-coordinate of the rectangle to render into.
+        y : int
+            The y-coordinate of the rectangle to render into.
+        w : int
+            The width of the rectangle to render into.
+        h : int
+            The height of the rectangle to render into.
+        stride : int
+            The number of pixels between the starts of rows in the buffer.
+        format : int
+            The framebuf format of the pixel data.
+        palette : array[int]
+            An array of RGB565 colors for each palette index.
+        """
+
+    def flush(self, x: int, y: int, w: int, h: int) -> None:
+        """Push a region rendered directly into ``raster`` to the device.
+
+        This is called by ``Surface.refresh`` for each damaged region when
+        it renders without a working buffer.  The default implementation
+        does nothing, which is appropriate when the buffer is the device's
+        memory or is sent to the device separately.
+
+        Parameters
+        ----------
+        x : int
+            The x-coordinate of the region that changed.
+        y : int
+            The y-coordinate of the region that changed.
+        w : int
+            The width of the region that changed.
+        h : int
+            The height of the region that changed.
+        """
+
+    def fill(self, x: int, y: int, w: int, h: int, color: int) -> None:
+        """Fill a rectangle of the Display with a single color.
+
+        Surfaces call this for damaged regions which are entirely covered
+        by one solid rectangle, instead of rendering and blitting pixels.
+        The default implementation blits a row of the color at a time, but
+        subclasses should override this if the device can fill faster.
+
+        Parameters
+        ----------
+        x : int
+            The x-coordinate of the rectangle to fill.
+        y : int
+            The y-coordinate of the rectangle to fill.
+        w : int
+            The width of the rectangle to fill.
+        h : int
+            The height of the rectangle to fill.
+        color : int
+            The RGB565 color to fill with.
+        """
+
+    def scroll(self, rect: tuple[int, int, int, int], dx: int, dy: int) -> bool:
+        """Shift the pixels within a rectangle of the Display.
+
+        This is called by ``Surface.refresh`` when scrolled content, such as
+        a Window whose offset changed, can be moved rather than redrawn.
+        Pixels move ``dx`` to the right and ``dy`` down, and the exposed
+        bands can be left as they are, since the Surface redraws them.
+
+        Displays which can't shift pixels, or can't for this rectangle,
+        return False and the Surface redraws the whole rectangle instead.
+        The default implementation always returns False.
+
+        Parameters
+        ----------
+        rect : tuple[int, int, int, int]
+            The rectangle whose pixels are shifted.
+        dx : int
+            The distance to shift pixels to the right.
+        dy : int
+            The distance to shift pixels down.
+
+        Returns
+        -------
+        bool
+            Whether the pixels were shifted.
         """
 
     def clear(self) -> None:
         """Clear the display, setting all pixels to 0."""
 
 
+class MonoDisplay(Display):
+    """Abstract base class for 1-bit Displays
+
+    Surfaces which render in the same 1-bit format as the display send
+    packed pixels straight to ``blit``, with no conversion.  Concrete
+    subclasses must implement ``blit`` to send the data to the device,
+    and should set ``format`` to the layout the device expects.
+    """
+
+    #: The framebuf format of the packed pixel data: MONO_VLSB (the page
+    #: layout used by SSD1306-class displays), MONO_HLSB or MONO_HMSB.
+    format: int = framebuf.MONO_VLSB
+
+    def blit(self, buffer: array, x: int, y: int, w: int, h: int, stride: int | None = None):
+        """Render packed 1-bit pixels to the given rectangle of the Display.
+
+        Rows of the buffer are packed as for a framebuf FrameBuffer of the
+        display's format with the given width and height.  For MONO_VLSB
+        surfaces, ``y`` and ``h`` are multiples of 8 except possibly for
+        the last rows of the display.
+
+        Parameters
+        ----------
+        buffer : array or other buffer
+            An array of pixel data in the display's format.
+        x : int
+            The x-coordinate of the rectangle to render into.
+        y : int
+            The y-coordinate of the rectangle to render into.
+        w : int
+            The width of the rectangle to render into.
+        h : int
+            The height of the rectangle to render into.
+        stride : int | None
+            The number of pixels from the start of one row of the buffer to
+            the start of the next, or None if the rows are contiguous.
+        """
+
+
 class FrameBufferDisplay(Display):
     """Display that renders into a FrameBuffer.
 
@@ -60,6 +221,20 @@ class FrameBufferDisplay(Display):
     RGB565 pixel values to pixel values of the target array. Note that this
     may be impractically large in most cases (eg. even a 1-bit image needs an
     8 kilobyte palette).
+
+    Palette-indexed buffers from ``blit_palette`` are expanded directly by
+    ``FrameBuffer.blit`` when the FrameBuffer is RGB565.
+
+    For monochrome panels whose drivers are FrameBuffer subclasses, such
+    as the standard SSD1306 driver, pass the driver with ``format`` set to
+    its 1-bit format and render a Surface of the same format, then call
+    the driver's ``show`` method after refreshing.
+
+    If the underlying buffer is also given, Surfaces can render straight
+    into it by refreshing with no working buffer.  This avoids drawing
+    each damaged pixel twice and the memory cost of the working buffer.
+    Subclasses can override ``flush`` to push just the damaged regions to
+    a panel.
     """
 
     fbuf: framebuf.FrameBuffer
@@ -70,9 +245,19 @@ class FrameBufferDisplay(Display):
             fbuf: framebuf.FrameBuffer,
             size: tuple[int, int],
             palette: framebuf.FrameBuffer | None = None,
+            format: int = framebuf.RGB565,
+            buffer: bytearray | None = None,
         ) -> None: ...
 
-    def blit(self, buffer: framebuf.FrameBuffer | array, x: int, y: int, w: int, h: int):
+    def blit(
+        self,
+        buffer: framebuf.FrameBuffer | array,
+        x: int,
+        y: int,
+        w: int,
+        h: int,
+        stride: int | None = None,
+    ):
         """Render the buffer to the given rectangle of the Display.
 
         This uses the FrameBuffer.blit method, so buffer can either be a
@@ -92,6 +277,27 @@ class FrameBufferDisplay(Display):
             The width of the rectangle to render into.
         h : int
             The height of the rectangle to render into.
+        stride : int | None
+            The number of pixels from the start of one row of the buffer to
+            the start of the next, or None if the rows are contiguous.
+        """
+
+    def fill(self, x: int, y: int, w: int, h: int, color: int) -> None:
+        """Fill a rectangle of the FrameBuffer with a single color.
+
+        This uses ``FrameBuffer.fill_rect`` unless a palette is needed to
+        map the color to the FrameBuffer's pixel values.
+        """
+
+    def scroll(self, rect: tuple[int, int, int, int], dx: int, dy: int) -> bool:
+        """Shift the pixels within a rectangle of the FrameBuffer.
+
+        If the underlying buffer was given, rows of whole-byte formats are
+        moved with a native memmove-style copy, and sub-byte formats use
+        ``FrameBuffer.scroll`` on a view of the rectangle.  The rectangle
+        must lie within the buffer and, for sub-byte formats, start on a
+        byte boundary.  Without the buffer, only the whole display can be
+        scrolled.
         """
 
 
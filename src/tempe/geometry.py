@@ -5,13 +5,30 @@
 from array import array
 from math import pi, sin, cos
 
-from .data_view import DataView
+from .data_view import DataView, Repeat
+from .util import ArrayBuffer, pack_column, pack_value, transform_points
 
 POINT = "point"
 CIRCLE = "circle"
 RECTANGLE = "rectangle"
 POLY = "poly"
 
+# Transform matrix entries are fixed-point with this many fractional bits.
+_FRACTION_BITS = const(10)
+_ONE = const(1 << _FRACTION_BITS)
+
+
+def _is_16_bit(column):
+    """Whether an array or memoryview has 2-byte items."""
+    typecode = getattr(column, "typecode", None)
+    if typecode is not None:
+        return typecode in ("h", "H")
+    try:
+        return memoryview(column).itemsize == 2
+    except AttributeError:
+        # item size is not available, so can't be sure
+        return False
+
 
 class Geometry(DataView):
     """Efficient storage of geometric information."""
@@ -26,6 +43,29 @@ class Geometry(DataView):
     def __len__(self):
         raise NotImplementedError()
 
+    def pack(self, buffer, rows=None):
+        """Pack rows into a flat buffer, yielding the number of rows packed.
+
+        Each time the buffer is full the row count is yielded, and the
+        buffer is reused for the next rows, so consumers must finish with
+        the buffer contents before resuming the generator.
+        """
+        k = self.coords
+        n = len(buffer) // k
+        if rows is not None:
+            n = min(n, rows)
+        size = n * k
+        i = 0
+        for row in self:
+            for j in range(k):
+                buffer[i + j] = row[j]
+            i += k
+            if i == size:
+                yield n
+                i = 0
+        if i:
+            yield i // k
+
 
 class RowGeometry(Geometry):
     """Geometry where coordinates are provided as ragged rows."""
@@ -38,6 +78,32 @@ class RowGeometry(Geometry):
                 coords = None
         return cls([array("h", coord) for coord in rows], coords)
 
+    def refill(self, rows):
+        """Replace the rows, copying into the existing arrays where sizes match."""
+        geometry = self.geometry
+        if not isinstance(geometry, list):
+            geometry = self.geometry = list(geometry)
+        n = len(geometry)
+        i = 0
+        for row in rows:
+            if i < n and len(geometry[i]) == len(row):
+                current = geometry[i]
+                for j in range(len(row)):
+                    current[j] = row[j]
+            elif i < n:
+                geometry[i] = array("h", row)
+            else:
+                geometry.append(array("h", row))
+            i += 1
+        if i < n:
+            del geometry[i:]
+        if geometry:
+            # rows may have changed length
+            coords = len(geometry[0])
+            if any(len(row) != coords for row in geometry):
+                coords = None
+            self.coords = coords
+
     def __iter__(self):
         yield from self.geometry
 
@@ -50,10 +116,21 @@ class ColumnGeometry(Geometry):
 
     def __init__(self, geometry):
         super().__init__(geometry, len(geometry))
+        self._buf = array("h", bytearray(2 * self.coords))
 
     def __iter__(self):
-        for coords in zip(*self.geometry):
-            yield array("h", coords)
+        columns = [iter(column) for column in self.geometry]
+        k = len(columns)
+        buf = self._buf
+        if len(buf) != k:
+            buf = self._buf = array("h", bytearray(2 * k))
+        try:
+            while True:
+                for j in range(k):
+                    buf[j] = next(columns[j])
+                yield buf
+        except StopIteration:
+            return
 
     def __len__(self):
         lengths = [len(coord) for coord in self.geometry if len(coord) is not None]
@@ -62,6 +139,50 @@ class ColumnGeometry(Geometry):
         else:
             return None
 
+    def pack(self, buffer, rows=None):
+        """Pack rows into a flat buffer, yielding the number of rows packed.
+
+        Columns which are 16-bit arrays or Repeat views are interleaved
+        using native code, otherwise this falls back to copying row by row,
+        eg. for lists or arrays of other item sizes.
+        """
+        columns = self.geometry
+        length = None
+        for column in columns:
+            if type(column) is DataView:
+                column = column.data
+            if isinstance(column, (array, memoryview)) and _is_16_bit(column):
+                if length is None or len(column) < length:
+                    length = len(column)
+            elif not isinstance(column, Repeat):
+                length = None
+                break
+        else:
+            if length is not None:
+                yield from self._pack_columns(buffer, rows, length)
+                return
+        yield from super().pack(buffer, rows)
+
+    def _pack_columns(self, buffer, rows, length):
+        k = self.coords
+        n = len(buffer) // k
+        if rows is not None:
+            n = min(n, rows)
+        columns = self.geometry
+        start = 0
+        while start < length:
+            count = min(n, length - start)
+            for j in range(k):
+                column = columns[j]
+                if isinstance(column, Repeat):
+                    pack_value(buffer, column.data, count, k, j)
+                else:
+                    if type(column) is DataView:
+                        column = column.data
+                    pack_column(buffer, column, start, count, k, j)
+            start += count
+            yield count
+
 
 class StripGeometry(Geometry):
     """Geometry generating connected strip of n-gons from vertices.
@@ -74,13 +195,18 @@ class StripGeometry(Geometry):
         self.n_groups = n_groups
         self.step = step
         self.n_coords = n_coords
+        self._buf = None
 
     def __iter__(self):
         size = self.n_groups * self.n_coords
         start = 0
-        buf = array("h", bytearray(2 * size))
+        buf = self._buf
+        if buf is None or len(buf) != size:
+            buf = self._buf = array("h", bytearray(2 * size))
+        geometry = self.geometry
         for i in range(len(self)):
-            buf[:] = self.geometry[start : start + size]
+            for j in range(size):
+                buf[j] = geometry[start + j]
             start += self.step * self.n_coords
             yield buf
 
@@ -95,13 +221,19 @@ class PointsToLines(Geometry):
         if geometry.coords is not None and geometry.coords < 2:
             raise ValueError("Expected Geometry with at least 2 coordinates")
         super().__init__(geometry, 4)
+        self._buf = array("h", bytearray(8))
 
     def __iter__(self):
-        buf = array("h", bytearray(8))
-        for i, point in enumerate(self.geometry):
-            buf[:2] = buf[2:]
-            buf[2:] = point[:2]
-            if i != 0:
+        buf = self._buf
+        first = True
+        for point in self.geometry:
+            buf[0] = buf[2]
+            buf[1] = buf[3]
+            buf[2] = point[0]
+            buf[3] = point[1]
+            if first:
+                first = False
+            else:
                 yield buf
 
     def __len__(self):
@@ -113,25 +245,36 @@ class PointsToLines(Geometry):
 
 
 class Extend(Geometry):
+    """Concatenate multiple geometries row-wise."""
+
     def __init__(self, geometry):
         if any(geom.coords is None for geom in geometry):
             coords = None
         else:
-            coords = sum(geom.coords is None for geom in geometry)
+            coords = sum(geom.coords for geom in geometry)
         super().__init__(geometry, coords)
+        self._buf = ArrayBuffer("h", coords or 0)
 
     def __iter__(self):
-        if self.coords is not None:
-            # can use a single buffer
-            buf = array("h", bytearray(2 * self.coords))
-        for coords in zip(*self.geometry):
-            if self.coords is None:
-                buf = array("h", bytearray(2 * sum(len(coord) for coord in coords)))
-            i = 0
-            for coord in coords:
-                buf[i : i + len(coord)] = coord
-                i += len(coord)
-            yield buf
+        geometries = [iter(geom) for geom in self.geometry]
+        rows = [None] * len(geometries)
+        try:
+            while True:
+                size = 0
+                for j in range(len(geometries)):
+                    row = next(geometries[j])
+                    rows[j] = row
+                    size += len(row)
+                # only re-allocates if the row size exceeds capacity
+                buf = self._buf.get(size)
+                i = 0
+                for row in rows:
+                    for j in range(len(row)):
+                        buf[i + j] = row[j]
+                    i += len(row)
+                yield buf
+        except StopIteration:
+            return
 
     def __len__(self):
         lengths = [len(coord) for coord in self.geometry if len(coord) is not None]
@@ -144,15 +287,28 @@ class Extend(Geometry):
 class ProductGeometry(Geometry):
     """Cartesian product of 2 geometries."""
 
+    def __init__(self, geometry):
+        geom_1, geom_2 = geometry
+        coords_1 = getattr(geom_1, "coords", None)
+        coords_2 = getattr(geom_2, "coords", None)
+        if coords_1 is None or coords_2 is None:
+            coords = None
+        else:
+            coords = coords_1 + coords_2
+        super().__init__(geometry, coords)
+        self._buf = ArrayBuffer("h", coords or 0)
+
     def __iter__(self):
         geom_1, geom_2 = self.geometry
         for x in geom_1:
             sx = len(x)
             for y in geom_2:
                 sy = len(y)
-                buf = array("h", bytearray(2 * (sx + sy)))
-                buf[:sx] = x
-                buf[sx:] = y
+                buf = self._buf.get(sx + sy)
+                for i in range(sx):
+                    buf[i] = x[i]
+                for i in range(sy):
+                    buf[sx + i] = y[i]
                 yield buf
 
     def __len__(self):
@@ -171,11 +327,121 @@ class Select(Geometry):
     def __init__(self, geometry, selection):
         super().__init__(geometry, len(selection))
         self.selection = selection
+        self._buf = ArrayBuffer("h", len(selection))
 
     def __iter__(self):
         selection = self.selection
-        buffer = array("h", len(2 * len(selection)))
-        for geometry in self.geometry:
-            for i, j in enumerate(selection):
-                buffer[i] = geometry[j]
-            yield buffer
+        k = len(selection)
+        buf = self._buf.get(k)
+        for row in self.geometry:
+            for i in range(k):
+                buf[i] = row[selection[i]]
+            yield buf
+
+    def __len__(self):
+        return len(self.geometry)
+
+
+class Transformed(Geometry):
+    """Apply an affine transform to the points of another geometry."""
+
+    def __init__(self, geometry, matrix=None, points=None):
+        super().__init__(geometry, getattr(geometry, "coords", None))
+        self.points = points
+        self.matrix = array("h", [_ONE, 0, 0, _ONE, 0, 0])
+        if matrix is not None:
+            self.set_matrix(*matrix)
+        self._buf = ArrayBuffer("h", self.coords or 0)
+        self._extent = None
+
+    def set_matrix(self, a, b, c, d, tx, ty):
+        """Set the transform to x' = a*x + b*y + tx, y' = c*x + d*y + ty."""
+        matrix = self.matrix
+        matrix[0] = round(a * _ONE)
+        matrix[1] = round(b * _ONE)
+        matrix[2] = round(c * _ONE)
+        matrix[3] = round(d * _ONE)
+        matrix[4] = round(tx)
+        matrix[5] = round(ty)
+
+    def set_rotation(self, angle, scale=1, tx=0, ty=0):
+        """Rotate by an angle in degrees and scale about the origin, then translate."""
+        theta = angle * pi / 180
+        c = scale * cos(theta)
+        s = scale * sin(theta)
+        self.set_matrix(c, -s, s, c, tx, ty)
+
+    def invalidate(self):
+        """Forget the cached extent after the source geometry changes."""
+        self._extent = None
+
+    def bounds(self):
+        """Estimate the bounds of the transformed points.
+
+        The corners of the untransformed points' bounding box are
+        transformed, so this is exact for translations and scaling, and
+        an overestimate for rotations.
+        """
+        extent = self._extent
+        if extent is None:
+            extent = self._extent = self._get_extent()
+        x0, y0, x1, y1 = extent
+        a, b, c, d, tx, ty = self.matrix
+        min_x = min_y = 0x7FFF
+        max_x = max_y = -0x8000
+        for x, y in ((x0, y0), (x1, y0), (x0, y1), (x1, y1)):
+            px = ((a * x + b * y + (_ONE >> 1)) >> _FRACTION_BITS) + tx
+            py = ((c * x + d * y + (_ONE >> 1)) >> _FRACTION_BITS) + ty
+            min_x = min(min_x, px)
+            max_x = max(max_x, px)
+            min_y = min(min_y, py)
+            max_y = max(max_y, py)
+        return (min_x, min_y, max_x, max_y)
+
+    def _get_extent(self):
+        min_x = min_y = 0x7FFF
+        max_x = max_y = -0x8000
+        points = self.points
+        for row in self.geometry:
+            n = len(row) if points is None else 2 * points
+            for i in range(0, n - 1, 2):
+                x = row[i]
+                y = row[i + 1]
+                min_x = min(min_x, x)
+                max_x = max(max_x, x)
+                min_y = min(min_y, y)
+                max_y = max(max_y, y)
+        if max_x < min_x:
+            return (0, 0, 0, 0)
+        return (min_x, min_y, max_x, max_y)
+
+    def __iter__(self):
+        points = self.points
+        matrix = self.matrix
+        for row in self.geometry:
+            n = len(row)
+            buf = self._buf.get(n)
+            for i in range(n):
+                buf[i] = row[i]
+            transform_points(buf, 1, n, n // 2 if points is None else points, matrix)
+            yield buf
+
+    def __len__(self):
+        return len(self.geometry)
+
+    def pack(self, buffer, rows=None):
+        """Pack rows into a flat buffer, yielding the number of rows packed.
+
+        The source geometry packs the rows, and the points are transformed
+        in place in the buffer using native code.
+        """
+        geometry = self.geometry
+        if not isinstance(geometry, Geometry):
+            yield from super().pack(buffer, rows)
+            return
+        k = self.coords
+        points = k // 2 if self.points is None else self.points
+        matrix = self.matrix
+        for n in geometry.pack(buffer, rows):
+            transform_points(buffer, n, k, points, matrix)
+            yield n
@@ -20,6 +20,24 @@ class Geometry[DataType](DataView[DataType]):
 
     def __init__(self, geometry: Sequence, coords: int | None = None) -> None: ...
 
+    def pack(self, buffer: array[int], rows: int | None = None) -> Generator[int, None, None]:
+        """Pack rows into a flat buffer, yielding the number of rows packed.
+
+        This requires the geometry to have a fixed number of coordinates.
+        Each row is copied into consecutive ``coords`` entries of the buffer
+        and each time the buffer is full, the number of rows is yielded.
+        The buffer is reused for subsequent rows, so consumers must finish
+        with the buffer contents before resuming the generator.
+
+        Parameters
+        ----------
+        buffer : array[int]
+            A signed 16-bit array to pack rows into.
+        rows : int | None
+            The maximum number of rows to pack at a time.  If None, as many
+            rows as will fit in the buffer are packed.
+        """
+
 
 class RowGeometry[DataType](Geometry[DataType]):
     """Geometry where coordinates are provided as ragged rows."""
@@ -27,8 +45,27 @@ class RowGeometry[DataType](Geometry[DataType]):
     @classmethod
     def from_lists(cls, rows: Iterable[Sequence[int]]) -> RowGeometry[T]: ...
 
+    def refill(self, rows: Iterable[Sequence[int]]) -> None:
+        """Replace the rows, copying into the existing arrays where sizes match.
+
+        This avoids allocating new row arrays when a shape's geometry is
+        updated with data of the same shape, such as when moving a Component.
+        Shapes using the geometry still need to be updated to mark the
+        changed regions as damaged.  The number of coordinates is updated to
+        the length of the new rows, or None if they have different lengths.
+        """
+
 class ColumnGeometry[DataType](Geometry[DataType]):
-    """Geometry where coordinates are provided as ragged columns"""
+    """Geometry where coordinates are provided as ragged columns
+
+    Iteration yields a single reused buffer, so consumers must copy rows
+    they wish to keep, such as with ``[array("h", row) for row in geometry]``
+    rather than ``list(geometry)``.  Packing columns which are 16-bit arrays or Repeat
+    views is done using native code where available.  Columns with other
+    item sizes, such as 8 or 32-bit arrays, are copied row by row.
+    """
+
+    def __init__(self, geometry: Sequence[Sequence[int]]) -> None: ...
 
 class StripGeometry(Geometry[point_array]):
     """Geometry generating connected strip of n-gons from vertices.
@@ -48,14 +85,95 @@ class PointsToLines(Geometry[points]):
     def __init__(self, geometry: Geometry[point]) -> None: ...
 
 class Extend[DataType](Geometry[DataType]):
-    """Concatenate multiple geometries row-wise."""
+    """Concatenate multiple geometries row-wise.
+
+    Iteration yields a reused buffer, which is only re-allocated if the
+    concatenated row is larger than any seen previously.
+    """
 
     def __init__(self, geometry: Sequence[Geometry]) -> None: ...
 
 class ProductGeometry[DataType](Geometry[DataType]):
+    """Cartesian product of 2 geometries.
+
+    Iteration yields a reused buffer of the concatenated rows.
+    """
 
     def __init__(self, geometry: tuple[Sequence, Sequence]) -> None: ...
 
 class Select[DataType](Geometry[DataType]):
+    """Select coordinates from another geometry.
+
+    Iteration yields a reused buffer of the selected coordinates.
+    """
 
     def __init__(self, geometry: Sequence[Sequence], selection: Sequence[int]) -> None: ...
+
+class Transformed[DataType](Geometry[DataType]):
+    """Apply an affine transform to the points of another geometry.
+
+    The transform is applied as rows are iterated or packed, into a reused
+    buffer, so moving, scaling or rotating a shape only changes the six
+    numbers of the matrix rather than rebuilding its geometry.  The shape
+    still needs to be updated to mark the old and new positions as damaged.
+
+    The matrix is stored as a signed 16-bit array of fixed-point values
+    with 10 fractional bits for the linear part, and whole pixels for the
+    translation, so scale factors must be less than 32.
+
+    Lines, PolyLines and Polygons estimate their bounds from the
+    transformed bounding box of the untransformed points, which is cached,
+    rather than by iterating the transformed geometry.
+
+    Parameters
+    ----------
+    geometry : Sequence
+        The geometry to transform.
+    matrix : tuple[float, float, float, float, int, int] | None
+        The a, b, c, d, tx, ty values of the transform, as for
+        ``set_matrix``.  If None, the identity transform is used.
+    points : int | None
+        The number of x, y pairs at the start of each row which are points
+        to transform.  Any further coordinates, such as sizes, are passed
+        through unchanged.  If None, every pair of coordinates is a point.
+    """
+
+    matrix: array[int]
+    points: int | None
+
+    def __init__(
+        self,
+        geometry: Sequence,
+        matrix: tuple[float, float, float, float, int, int] | None = None,
+        points: int | None = None,
+    ) -> None: ...
+
+    def set_matrix(self, a: float, b: float, c: float, d: float, tx: int, ty: int) -> None:
+        """Set the transform to x' = a*x + b*y + tx, y' = c*x + d*y + ty."""
+
+    def set_rotation(self, angle: float, scale: float = 1, tx: int = 0, ty: int = 0) -> None:
+        """Rotate by an angle in degrees and scale about the origin, then translate.
+
+        Angles are clockwise on screen, as y increases downwards, matching
+        the polar geometry functions.
+        """
+
+    def invalidate(self) -> None:
+        """Forget the cached extent after the source geometry changes.
+
+        This is only needed if the untransformed geometry is changed in
+        place, not when the matrix changes.
+        """
+
+    def bounds(self) -> tuple[int, int, int, int]:
+        """Estimate the bounds of the transformed points.
+
+        The corners of the untransformed points' bounding box are
+        transformed, so this is exact for translations and scaling, and
+        an overestimate for rotations.
+
+        Returns
+        -------
+        bounds : tuple[int, int, int, int]
+            The minimum x, minimum y, maximum x and maximum y.
+        """
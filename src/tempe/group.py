@@ -0,0 +1,174 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+from .raster import RasterPool
+from .shapes import Shape
+from .util import ArrayBuffer
+
+
+class Group(Shape):
+    """A Shape which draws child shapes with a shared offset and clip."""
+
+    def __init__(self, shapes=(), offset=(0, 0), *, surface=None, clip=None):
+        super().__init__(surface, clip)
+        self.offset = offset
+        self.shapes = []
+        # children call this when they are updated
+        self._spatial_index = None
+        self._raster_pool = RasterPool()
+        self._margins = ArrayBuffer("H")
+        self.culled_draws = 0
+        for shape in shapes:
+            self.add_shape(shape)
+
+    def add_shape(self, shape):
+        """Add a child shape, drawn after the existing children."""
+        if shape.surface is None:
+            shape.surface = self
+        elif shape.surface is not self:
+            raise RuntimeError(f"Shape {shape} is already on a surface: {shape.surface}")
+        self.shapes.append(shape)
+        shape.update()
+
+    def remove_shape(self, shape):
+        """Remove a child shape."""
+        self.shapes.remove(shape)
+        shape.update()
+        if shape.clip is not None:
+            self.damage(shape.clip)
+        elif shape._bounds is not None:
+            self.damage(shape._bounds)
+        shape.surface = None
+
+    def damage(self, rect, layer=None, priority=0):
+        """Mark a rectangle in the group's coordinates as needing a refresh."""
+        ox, oy = self.offset
+        x, y, w, h = rect
+        x += ox
+        y += oy
+        clip = self.clip
+        if clip is not None:
+            x0 = max(x, clip[0])
+            y0 = max(y, clip[1])
+            x1 = min(x + w, clip[0] + clip[2])
+            y1 = min(y + h, clip[1] + clip[3])
+            if x0 >= x1 or y0 >= y1:
+                return
+            x, y, w, h = x0, y0, x1 - x0, y1 - y0
+        elif self._bounds is not None:
+            # children may have grown, so keep the bounds covering them
+            bx, by, bw, bh = self._bounds
+            x0 = min(bx, x)
+            y0 = min(by, y)
+            self._bounds = (
+                x0, y0, max(bx + bw, x + w) - x0, max(by + bh, y + h) - y0
+            )
+        if self.surface:
+            self.surface.damage((x, y, w, h), self.layer, priority)
+
+    def scroll(self, shape, dx, dy):
+        """Redraw a clipped child whose contents have moved."""
+        if dx == 0 and dy == 0:
+            return
+        # the parent surface can't shift pixels of a child it doesn't draw
+        # directly, so damage the child's clip in the group's coordinates
+        self.damage(shape.clip, shape.layer)
+
+    def update(self, offset=None):
+        if offset is not None:
+            dx = offset[0] - self.offset[0]
+            dy = offset[1] - self.offset[1]
+            if self.clip is None:
+                if self._bounds is None:
+                    self._bounds = self._get_bounds()
+                if self.surface:
+                    self.surface.damage(self._bounds, self.layer)
+            else:
+                if self.surface:
+                    self.surface.damage(self.clip, self.layer)
+                x, y, w, h = self.clip
+                # the clip moves with the group
+                self.clip = (x + dx, y + dy, w, h)
+            self.offset = offset
+            self._bounds = None
+        super().update()
+
+    def draw_raster(self, raster):
+        ox, oy = self.offset
+        x0 = raster.x - ox
+        y0 = raster.y - oy
+        x1 = x0 + raster.w
+        y1 = y0 + raster.h
+        bounds = self._bounds
+        if self.clip is None and bounds is not None:
+            # cull the whole group with one test
+            if (
+                bounds[0] - ox >= x1
+                or bounds[1] - oy >= y1
+                or bounds[0] + bounds[2] - ox <= x0
+                or bounds[1] + bounds[3] - oy <= y0
+            ):
+                self.culled_draws += len(self.shapes)
+                return
+        pool = self._raster_pool
+        # raster translated to the group's coordinates
+        raster = pool.raster(
+            raster.buf,
+            x0,
+            y0,
+            raster.w,
+            raster.h,
+            raster.stride,
+            raster.offset,
+            raster.format,
+        )
+        for shape in self.shapes:
+            extent = shape.clip
+            if extent is None:
+                extent = shape._bounds
+                if extent is None:
+                    shape.draw_raster(raster)
+                    continue
+            if (
+                extent[0] >= x1
+                or extent[1] >= y1
+                or extent[0] + extent[2] <= x0
+                or extent[1] + extent[3] <= y0
+            ):
+                self.culled_draws += 1
+                continue
+            if shape.clip is None:
+                shape.draw_raster(raster)
+                continue
+            x, y, w, h = shape.clip
+            clip = pool.clip(raster, x, y, w, h)
+            if clip is None:
+                continue
+            if clip.clip_rect is not None:
+                # clip was widened to a byte boundary
+                margins = self._margins.get(clip.margin_size())
+                clip.save_margins(margins)
+                shape.draw_raster(clip)
+                clip.restore_margins(margins)
+            else:
+                shape.draw_raster(clip)
+
+    def _get_bounds(self):
+        x0 = y0 = 0x7FFF
+        x1 = y1 = -0x8000
+        for shape in self.shapes:
+            extent = shape.clip
+            if extent is None:
+                if shape._bounds is None:
+                    shape._bounds = shape._get_bounds()
+                extent = shape._bounds
+            x, y, w, h = extent
+            x0 = min(x0, x)
+            y0 = min(y0, y)
+            x1 = max(x1, x + w)
+            y1 = max(y1, y + h)
+        ox, oy = self.offset
+        if x1 <= x0 or y1 <= y0:
+            return (ox, oy, 0, 0)
+        return (x0 + ox, y0 + oy, x1 - x0, y1 - y0)
@@ -0,0 +1,113 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""This module defines the Group class."""
+
+from collections.abc import Iterable
+
+from .raster import Raster
+from .shapes import Shape
+from .surface import rectangle
+
+
+class Group(Shape):
+    """A Shape which draws child shapes with a shared offset and clip.
+
+    The child shapes are drawn in order in the Group's layer, with their
+    coordinates relative to the Group's offset.  Where shapes share a clip,
+    it is cheaper to put them in a Group with that clip: one clipped raster
+    is made per strip for the whole Group rather than one per shape.
+    Children without their own clip are drawn straight onto that raster,
+    and any child clips are in the Group's coordinates.
+
+    An unclipped Group keeps the union of the bounds of its children, so
+    that a strip which misses them all is skipped with a single test.
+    Changing the offset with ``update(offset=...)`` moves all of the
+    children, and the clip if there is one, without changing their
+    geometry.
+
+    Children are updated as usual, and their damage is passed on to the
+    Group's surface, moved by the offset and limited to the clip.  A Group
+    doesn't have separate items for hit testing, so it is hit as a whole.
+
+    Parameters
+    ----------
+    shapes : Iterable[Shape]
+        The initial child shapes, in drawing order.
+    offset : tuple[int, int]
+        The position of the Group's origin in the surface.
+    surface : Surface | None
+        The surface the Group is drawn on.
+    clip : rectangle | None
+        The region of the surface that children are drawn in.
+
+    Attributes
+    ----------
+    shapes : list[Shape]
+        The child shapes, in drawing order.
+    culled_draws : int
+        The number of child draws skipped because a child was outside the
+        strip being drawn.
+    """
+
+    offset: tuple[int, int]
+    shapes: list[Shape]
+    culled_draws: int
+
+    def __init__(
+        self,
+        shapes: Iterable[Shape] = (),
+        offset: tuple[int, int] = (0, 0),
+        *,
+        surface=None,
+        clip: rectangle | None = None,
+    ): ...
+
+    def add_shape(self, shape: Shape) -> None:
+        """Add a child shape, drawn after the existing children.
+
+        Raises
+        ------
+        RuntimeError
+            If the shape is already on another surface or Group.
+        """
+
+    def remove_shape(self, shape: Shape) -> None:
+        """Remove a child shape."""
+
+    def damage(self, rect: rectangle, layer=None, priority: int = 0) -> None:
+        """Mark a rectangle in the group's coordinates as needing a refresh.
+
+        This is called by child shapes when they are updated.
+        """
+
+    def scroll(self, shape: Shape, dx: int, dy: int) -> None:
+        """Redraw a clipped child whose contents have moved.
+
+        This is called by children such as Window when their contents
+        move within their clip rectangle.  Pixels of children can't be
+        shifted on the display, so the child's clip is damaged instead,
+        translated by the Group's offset and clipped to the Group's clip.
+
+        Parameters
+        ----------
+        shape : Shape
+            A child shape with a clip rectangle whose contents have moved.
+        dx : int
+            The distance the contents moved to the right.
+        dy : int
+            The distance the contents moved down.
+        """
+
+    def update(self, offset: tuple[int, int] | None = None) -> None:
+        """Update the Group, marking a redraw as needed.
+
+        Parameters
+        ----------
+        offset : tuple[int, int] | None
+            The new position of the Group's origin in the surface.
+        """
+
+    def draw_raster(self, raster: Raster) -> None:
+        """Draw the children which overlap the Raster."""
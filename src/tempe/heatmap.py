@@ -0,0 +1,189 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+import framebuf
+
+from .shapes import Shape
+from .util import fill_heatmap
+
+
+class Heatmap(Shape):
+    """Draw a grid of values as colormapped cells filling a rectangle."""
+
+    def __init__(
+        self,
+        rect,
+        values,
+        width,
+        height,
+        colormap,
+        value_range=(0, 255),
+        *,
+        surface=None,
+        clip=None,
+    ):
+        super().__init__(surface, clip=clip)
+        _check_colormap(colormap)
+        _check_value_range(value_range)
+        self.rect = rect
+        self.values = values
+        self.width = width
+        self.height = height
+        self.colormap = colormap
+        self.value_range = value_range
+        self._indices = bytearray(width * height)
+        self._spare = bytearray(width * height)
+        self._scale_values(self._indices)
+
+    def update(self, values=None, colormap=None, value_range=None, rect=None):
+        if values is not None:
+            self.values = values
+        if value_range is not None:
+            _check_value_range(value_range)
+            self.value_range = value_range
+        if colormap is not None:
+            _check_colormap(colormap)
+            if getattr(self.surface, "palette", None) is not None:
+                # colors are drawn as indices into the surface's palette
+                colormap = self.surface._palette_colormap(colormap)
+            self.colormap = colormap
+        if rect is not None:
+            if self.clip is None:
+                # invalidate old bounds
+                if self._bounds is None:
+                    self._bounds = self._get_bounds()
+                if self.surface:
+                    self.surface.damage(self._bounds, self.layer)
+            self.rect = rect
+            # bounds are no longer valid
+            self._bounds = None
+        if (
+            (values is None and value_range is None)
+            or rect is not None
+            or colormap is not None
+            or self.surface is None
+        ):
+            self._scale_values(self._indices)
+            super().update()
+            return
+
+        # only the values changed, so compare colormap indices and swap
+        # buffers rather than overwrite the one being drawn from
+        old = self._indices
+        new = self._spare
+        self._scale_values(new)
+        self._indices = new
+        self._spare = old
+        self._damage_changes(old, new)
+
+    def draw_raster(self, raster):
+        x, y, w, h = self.rect
+        if w <= 0 or h <= 0:
+            return
+        if raster.format == framebuf.RGB565:
+            fill_heatmap(
+                raster, self._indices, self.width, self.height, x, y, w, h, self.colormap
+            )
+        else:
+            self.draw(raster.fbuf, raster.x, raster.y)
+
+    def draw(self, buffer, x=0, y=0):
+        hx, hy, w, h = self.rect
+        width = self.width
+        height = self.height
+        indices = self._indices
+        colormap = self.colormap
+        for row in range(height):
+            py0, py1 = _span(row, height, h)
+            for column in range(width):
+                px0, px1 = _span(column, width, w)
+                buffer.fill_rect(
+                    hx + px0 - x,
+                    hy + py0 - y,
+                    px1 - px0,
+                    py1 - py0,
+                    colormap[indices[row * width + column]],
+                )
+
+    def _scale_values(self, indices):
+        low, high = self.value_range
+        n = len(self.colormap) - 1
+        scale = n / (high - low)
+        values = self.values
+        for i in range(self.width * self.height):
+            j = int((values[i] - low) * scale)
+            if j < 0:
+                j = 0
+            elif j > n:
+                j = n
+            indices[i] = j
+
+    def _damage_changes(self, old, new):
+        """Damage a rectangle for each row of cells with changed colors."""
+        x, y, w, h = self.rect
+        width = self.width
+        height = self.height
+        clip = self.clip
+        for row in range(height):
+            start = row * width
+            end = start + width
+            if old[start:end] == new[start:end]:
+                continue
+            first = start
+            while old[first] == new[first]:
+                first += 1
+            last = end - 1
+            while old[last] == new[last]:
+                last -= 1
+            px0 = _span(first - start, width, w)[0]
+            px1 = _span(last - start, width, w)[1]
+            py0, py1 = _span(row, height, h)
+            rect = (x + px0, y + py0, px1 - px0, py1 - py0)
+            if clip is not None:
+                x0 = max(rect[0], clip[0])
+                y0 = max(rect[1], clip[1])
+                x1 = min(rect[0] + rect[2], clip[0] + clip[2])
+                y1 = min(rect[1] + rect[3], clip[1] + clip[3])
+                if x0 >= x1 or y0 >= y1:
+                    continue
+                rect = (x0, y0, x1 - x0, y1 - y0)
+            self.surface.damage(rect, self.layer)
+
+    def _get_bounds(self):
+        return self.rect
+
+    def _get_opaque(self):
+        # every pixel of the rectangle is drawn
+        x, y, w, h = self.rect
+        if w <= 0 or h <= 0:
+            return None
+        return self.rect
+
+    def _item_bounds(self):
+        x, y, w, h = self.rect
+        width = self.width
+        height = self.height
+        for row in range(height):
+            py0, py1 = _span(row, height, h)
+            for column in range(width):
+                px0, px1 = _span(column, width, w)
+                yield (x + px0, y + py0, px1 - px0, py1 - py0)
+
+
+def _check_colormap(colormap):
+    if len(colormap) > 256:
+        raise ValueError(f"Colormap has {len(colormap)} colors, but at most 256 are allowed")
+
+
+def _check_value_range(value_range):
+    if value_range[0] == value_range[1]:
+        raise ValueError(f"Value range {value_range} is empty")
+
+
+def _span(cell, cells, size):
+    """The start and end pixel offsets of a cell, for nearest-neighbour scaling."""
+    return (
+        (cell * size + cells - 1) // cells,
+        ((cell + 1) * size + cells - 1) // cells,
+    )
@@ -0,0 +1,110 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""Heatmap shape class."""
+
+from array import array
+from collections.abc import Sequence
+
+import tempe.surface
+from .shapes import Shape, rectangle
+from .colors import rgb565
+
+
+class Heatmap(Shape):
+    """Draw a grid of values as colormapped cells filling a rectangle.
+
+    The values are scaled to indices into the colormap once, when the
+    shape is created or updated.  Drawing then only looks up colors and
+    upscales the cells with nearest-neighbour sampling, using native code
+    for RGB565 rasters, so a thermal camera frame or other 2D grid is drawn
+    without a shape or framebuf call per cell.
+
+    Updating only the values or value range redraws just the cells whose
+    colors changed, as one rectangle for each row of cells spanning its
+    changed cells.
+
+    Parameters
+    ----------
+    rect : rectangle
+        The x, y, w, h rectangle which the cells are scaled to fill.
+    values : Sequence[float]
+        The values of the cells, one row after another, such as an array
+        of ints or floats.
+    width : int
+        The number of columns of cells.
+    height : int
+        The number of rows of cells.
+    colormap : array[rgb565]
+        The colors which the value range is mapped onto, such as one of
+        the ``tempe.colormaps``.  At most 256 colors are allowed.  For
+        Surfaces with a palette these are palette indices, which
+        ``Surface.heatmap`` finds from RGB565 colors.
+    value_range : tuple[float, float]
+        The values which map to the first and last colors of the colormap.
+        Values outside the range use the first or last color.
+    surface : Surface | None
+        The surface which this shape is associated with.
+    clip : rectangle | None
+        An (x, y, w, h) tuple to clip drawing to - anything drawn outside
+        this region will not show on the display.
+
+    Raises
+    ------
+    ValueError
+        If the colormap has more than 256 colors, or the two ends of the
+        value range are equal.
+    """
+
+    rect: rectangle
+    values: Sequence[float]
+    width: int
+    height: int
+    colormap: array[rgb565]
+    value_range: tuple[float, float]
+
+    def __init__(
+        self,
+        rect: rectangle,
+        values: Sequence[float],
+        width: int,
+        height: int,
+        colormap: array[rgb565],
+        value_range: tuple[float, float] = (0, 255),
+        *,
+        surface: "tempe.surface.Surface | None" = None,
+        clip: rectangle | None = None,
+    ): ...
+
+    def update(
+        self,
+        values: Sequence[float] | None = None,
+        colormap: array[rgb565] | None = None,
+        value_range: tuple[float, float] | None = None,
+        rect: rectangle | None = None,
+    ):
+        """Update the state of the Shape, marking a redraw as needed.
+
+        Values which are changed in place should be passed again to
+        redraw the changed cells.
+
+        Parameters
+        ----------
+        values : Sequence[float] | None
+            The values of the cells, one row after another.
+        colormap : array[rgb565] | None
+            The colors which the value range is mapped onto.  If the
+            Heatmap is on a Surface with a palette, these are mapped to
+            their closest palette entries.
+        value_range : tuple[float, float] | None
+            The values which map to the first and last colors.
+        rect : rectangle | None
+            The rectangle which the cells are scaled to fill.
+
+        Raises
+        ------
+        ValueError
+            If the colormap has more than 256 colors, or the two ends of
+            the value range are equal.
+        """
@@ -0,0 +1,94 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+import framebuf
+
+from .raster import Raster, _buffer_size
+
+
+class LayerCache:
+    """An offscreen copy of the rendered contents of the back layers."""
+
+    def __init__(
+        self, layers, width, height, budget=None, tile_width=16, format=framebuf.RGB565
+    ):
+        rows = height
+        if budget is not None:
+            rows = min(height, budget // _buffer_size(width, 1, format))
+        if rows <= 0:
+            raise ValueError(f"Budget of {budget} bytes too small for layer cache")
+        self.layers = layers
+        self.tile_width = tile_width
+        self.raster = Raster.from_rect(0, 0, width, rows, format)
+        # validity is tracked for each row of tiles
+        self._columns = (width + tile_width - 1) // tile_width
+        self._valid = bytearray(self._columns * rows)
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, rect):
+        """Mark the tiles which overlap a rectangle as needing re-rendering."""
+        x, y, w, h = rect
+        tile_width = self.tile_width
+        columns = self._columns
+        c0 = max(x // tile_width, 0)
+        c1 = min((x + w + tile_width - 1) // tile_width, columns)
+        r0 = max(y, 0)
+        r1 = min(y + h, self.raster.h)
+        valid = self._valid
+        for row in range(r0, r1):
+            i = row * columns
+            for column in range(c0, c1):
+                valid[i + column] = 0
+
+    def invalidate_all(self):
+        """Mark all tiles as needing re-rendering."""
+        valid = self._valid
+        for i in range(len(valid)):
+            valid[i] = 0
+
+    def is_valid(self, x, y, w, h):
+        """Whether every tile overlapping a rectangle holds current data."""
+        cache = self.raster
+        if x < 0 or y < 0 or x + w > cache.w or y + h > cache.h:
+            return False
+        tile_width = self.tile_width
+        columns = self._columns
+        c0 = x // tile_width
+        c1 = (x + w + tile_width - 1) // tile_width
+        valid = self._valid
+        for row in range(y, y + h):
+            i = row * columns
+            for column in range(c0, c1):
+                if not valid[i + column]:
+                    return False
+        return True
+
+    def load(self, raster):
+        """Copy cached pixels into a raster."""
+        raster.fbuf.blit(self.raster.fbuf, -raster.x, -raster.y)
+        self.hits += 1
+
+    def store(self, raster):
+        """Copy rendered pixels from a raster and mark covered tiles as valid."""
+        x = raster.x
+        y = raster.y
+        w = raster.w
+        cache = self.raster
+        cache.fbuf.blit(raster.fbuf, x, y)
+        self.misses += 1
+
+        # only tiles entirely inside the raster are now known to be valid,
+        # where the last tile in each row may be clipped by the cache
+        tile_width = self.tile_width
+        columns = self._columns
+        c0 = max((x + tile_width - 1) // tile_width, 0)
+        c1 = columns if x + w >= cache.w else (x + w) // tile_width
+        r0 = max(y, 0)
+        r1 = min(y + raster.h, cache.h)
+        valid = self._valid
+        for row in range(r0, r1):
+            i = row * columns
+            for column in range(c0, c1):
+                valid[i + column] = 1
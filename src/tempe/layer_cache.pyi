@@ -0,0 +1,79 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""This module defines the LayerCache class.
+
+This is an internal class used by Surfaces to hold an offscreen copy of
+the rendered back layers, so that strips can be started by copying pixels
+rather than re-drawing shapes which rarely change.
+"""
+
+import framebuf
+
+from .raster import Raster
+from .shapes import rectangle
+
+class LayerCache:
+    """An offscreen copy of the rendered contents of the back layers.
+
+    Each row of the cache is divided into tiles, each of which is either
+    valid or in need of re-rendering.  Damage to a cached layer invalidates
+    the overlapping tiles, and tiles become valid again when a raster which
+    completely covers them is stored.  Since strips are rendered a few rows
+    at a time, tiles are a single row high.
+
+    Parameters
+    ----------
+    layers : tuple[str, ...]
+        The layers held in the cache.
+    width : int
+        The width of the cached region.
+    height : int
+        The height of the cached region.
+    budget : int | None
+        The maximum number of bytes to use for pixel storage.  If the full
+        region does not fit, only as many rows as fit are cached.
+    tile_width : int
+        The width of the tiles used to track validity.
+    format : int
+        The framebuffer format of the cache, which should match the Surface.
+
+    Attributes
+    ----------
+    hits : int
+        The number of rasters which were filled from the cache.
+    misses : int
+        The number of rasters where the cached layers had to be drawn.
+    """
+
+    layers: tuple[str, ...]
+    raster: Raster
+    tile_width: int
+    hits: int
+    misses: int
+
+    def __init__(
+        self,
+        layers: tuple[str, ...],
+        width: int,
+        height: int,
+        budget: int | None = None,
+        tile_width: int = 16,
+        format: int = framebuf.RGB565,
+    ): ...
+
+    def invalidate(self, rect: rectangle) -> None:
+        """Mark the tiles which overlap a rectangle as needing re-rendering."""
+
+    def invalidate_all(self) -> None:
+        """Mark all tiles as needing re-rendering."""
+
+    def is_valid(self, x: int, y: int, w: int, h: int) -> bool:
+        """Whether every tile overlapping a rectangle holds current data."""
+
+    def load(self, raster: Raster) -> None:
+        """Copy cached pixels into a raster."""
+
+    def store(self, raster: Raster) -> None:
+        """Copy rendered pixels from a raster and mark covered tiles as valid."""
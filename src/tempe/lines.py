@@ -5,9 +5,12 @@
 from array import array
 from math import sqrt
 
-from .shapes import SizedGeometry
+from .shapes import SizedGeometry, _simplified_vertices
 from .util import line_points, intersect_poly_rect
 
+# Reusable vertex buffer for wide line segments.
+_vertices = array("h", bytearray(16))
+
 
 class WideLines(SizedGeometry):
     """Render multiple colored line segments with variable width.
@@ -25,7 +28,7 @@ class WideLines(SizedGeometry):
         y = raster.y
         w = raster.w
         h = raster.h
-        vertices = array("h", bytearray(16))
+        vertices = _vertices
         should_round = self.round
         for geometry, color, lw in self:
             if intersect_poly_rect(geometry[:4], 4, x - lw, y - lw, w + 2 * lw, h + 2 * lw):
@@ -62,14 +65,28 @@ class WidePolyLines(SizedGeometry):
     """Render multiple colored polylines with variable width.
     """
 
+    def __init__(self, geometry, colors, sizes, *, tolerance=None, surface=None, clip=None):
+        super().__init__(geometry, colors, sizes, surface=surface, clip=clip)
+        self.tolerance = tolerance
+        self._simplified = None
+        # storage for each row's simplified vertices, reused when they change
+        self._simplify_buffers = []
+
+    def update(self, geometry=None, colors=None, sizes=None, tolerance=None):
+        if geometry is not None or tolerance is not None:
+            self._simplified = None
+        if tolerance is not None:
+            self.tolerance = tolerance
+        super().update(geometry=geometry, colors=colors, sizes=sizes)
+
     def draw_raster(self, raster):
         buffer = raster.fbuf
         x = raster.x
         y = raster.y
         w = raster.w
         h = raster.h
-        vertices = array("h", bytearray(16))
-        for lines, color, lw in self:
+        vertices = _vertices
+        for lines, color, lw in zip(_simplified_vertices(self), self.colors, self.sizes):
             if intersect_poly_rect(lines, len(lines), x - lw, y - lw, w + 2 * lw, h + 2 * lw):
                 for i in range(0, len(lines) - 2, 2):
                     x0 = lines[i]
@@ -72,7 +72,61 @@ class WidePolyLines(SizedGeometry[point_array]):
     line drawing routines.  For line widths of 2 or more, this renders each
     polyline using rectanglular polygons for the segments and circles at
     the vertices.
+
+    If a tolerance is given, each polyline's vertices are simplified with
+    the Douglas-Peucker algorithm the first time it is drawn, and the
+    simplified vertices are kept until the geometry or tolerance is
+    updated.  This also saves drawing a circle at each dropped vertex.
+
+    Parameters
+    ----------
+    geometry : Iterable[point_array]
+        The sequence of polylines to render.
+    colors : Iterable[rgb565]
+        The sequence of colors for each polyline.
+    sizes : Iterable[int]
+        The line width of each polyline.
+    tolerance : float | None
+        The distance in pixels within which vertices may be dropped, or
+        None to draw every vertex.
+    surface : Surface | None
+        The surface which this shape is associated with.
+    clip : rectangle | None
+        An (x, y, w, h) tuple to clip drawing to - anything drawn outside
+        this region will not show on the display.
     """
+    tolerance: float | None
+
+    def __init__(
+        self,
+        geometry: Iterable[point_array],
+        colors: Iterable[rgb565],
+        sizes: Iterable[int],
+        *,
+        tolerance: float | None = None,
+        surface: "tempe.surface.Surface | None" = None,
+        clip: rectangle | None = None,
+    ): ...
+    def update(
+        self,
+        geometry: Iterable[point_array] | None = None,
+        colors: Iterable[rgb565] | None = None,
+        sizes: Iterable[int] | None = None,
+        tolerance: float | None = None,
+    ):
+        """Update the state of the Shape, marking a redraw as needed.
+
+        Parameters
+        ----------
+        geometry : Geometry[point_array] | None
+            The sequence of polylines to render.
+        colors : Iterable[rgb565] | None
+            The sequence of colors for each polyline.
+        sizes : Iterable[int] | None
+            The line width of each polyline.
+        tolerance : float | None
+            The distance in pixels within which vertices may be dropped.
+        """
 
 def line_points(
     x0: int,
@@ -6,7 +6,14 @@ from array import array
 import framebuf
 
 from .data_view import Repeat
-from .shapes import SizedGeometry, BLIT_KEY_RGB565
+from .shapes import SizedGeometry, _padded, _blit_key, _palette, _palette_buf
+from .util import fill_pixels
+
+# Maximum number of pre-rendered marker stamps to keep.
+_STAMP_CACHE_SIZE = const(16)
+
+# Largest marker size which is pre-rendered.
+_MAX_STAMP_SIZE = const(32)
 
 
 class Marker:
@@ -19,6 +26,45 @@ class Marker:
     CROSS = 6
 
 
+_stamp_cache = {}
+
+
+def clear_stamp_cache():
+    """Discard all pre-rendered marker stamps."""
+    global _stamp_cache
+    _stamp_cache = {}
+
+
+def _get_stamp(marker, size):
+    """Get a 1-bit stamp of a marker, or None if it is not stamped."""
+    if (
+        size < 1
+        or size > _MAX_STAMP_SIZE
+        or not (marker == Marker.CIRCLE or marker == Marker.PLUS or marker == Marker.CROSS)
+    ):
+        return None
+    key = (size << 3) | marker
+    stamp = _stamp_cache.get(key)
+    if stamp is None:
+        d = 2 * size + 1
+        stamp = framebuf.FrameBuffer(
+            bytearray(((d + 7) >> 3) * d), d, d, framebuf.MONO_HLSB
+        )
+        if marker == Marker.CIRCLE:
+            stamp.ellipse(size, size, size, size, 1, True)
+        elif marker == Marker.PLUS:
+            stamp.hline(0, size, d, 1)
+            stamp.vline(size, 0, d, 1)
+        else:
+            c = (size * 17 // 24) + 1  # very rough approximation of r/(sqrt(2)) + 1
+            stamp.line(size - c, size - c, size + c, size + c, 1)
+            stamp.line(size - c, size + c, size + c, size - c, 1)
+        if len(_stamp_cache) >= _STAMP_CACHE_SIZE:
+            _stamp_cache.popitem()
+        _stamp_cache[key] = stamp
+    return stamp
+
+
 class Markers(SizedGeometry):
     def __init__(self, geometry, colors, sizes, markers, *, surface=None, clip=None):
         super().__init__(geometry, colors, sizes, surface=surface, clip=clip)
@@ -28,19 +74,45 @@ class Markers(SizedGeometry):
         yield from zip(self.geometry, self.colors, self.sizes, self.markers)
 
     def draw_raster(self, raster):
+        if self._is_pixels() and self._can_batch(raster):
+            k = self.geometry.coords
+            for points, n, colors, color in self._batches():
+                fill_pixels(raster, points, n, k, colors, color)
+            return
         buffer = raster.fbuf
         x = raster.x
         y = raster.y
         w = raster.w
         h = raster.h
-        palette_buf = array("H", [BLIT_KEY_RGB565, 0x0000])
-        palette = framebuf.FrameBuffer(palette_buf, 2, 1, framebuf.RGB565)
-        for geometry, color, size, marker in self:
+        palette_buf = _palette_buf
+        palette = _palette
+        key = _blit_key(raster)
+        last_marker = None
+        last_size = None
+        stamp = None
+        colors = iter(self.colors)
+        sizes = iter(self.sizes)
+        markers = iter(self.markers)
+        for geometry in self.geometry:
+            try:
+                color = next(colors)
+                size = next(sizes)
+                marker = next(markers)
+            except StopIteration:
+                break
             px = geometry[0] - x
             py = geometry[1] - y
             if px + size < 0 or px - size > w or py + size < 0 or py - size > h:
                 continue
-            if size < 1 or marker == Marker.PIXEL:
+            if marker != last_marker or size != last_size:
+                # only look up stamps when the marker changes
+                last_marker = marker
+                last_size = size
+                stamp = _get_stamp(marker, size)
+            if stamp is not None:
+                palette_buf[1] = color
+                buffer.blit(stamp, px - size, py - size, key, palette)
+            elif size < 1 or marker == Marker.PIXEL:
                 buffer.pixel(px, py, color)
             elif marker == Marker.CIRCLE:
                 buffer.ellipse(px, py, size, size, color, True)
@@ -63,7 +135,7 @@ class Markers(SizedGeometry):
             elif isinstance(marker, framebuf.FrameBuffer):
                 # assume 1-bit framebuffer - no way to test!
                 palette_buf[1] = color
-                buffer.blit(marker, px, py, BLIT_KEY_RGB565, palette)
+                buffer.blit(marker, px, py, key, palette)
             elif isinstance(marker, array):
                 buffer.poly(px, py, marker, color, True)
 
@@ -72,6 +144,10 @@ class Markers(SizedGeometry):
             self.markers = markers
         super().update(geometry=geometry, colors=colors, sizes=sizes)
 
+    def _is_pixels(self):
+        markers = self.markers
+        return isinstance(markers, Repeat) and markers.data == Marker.PIXEL
+
     def _get_bounds(self):
         max_x = -0x7FFF
         min_x = 0x7FFF
@@ -85,24 +161,44 @@ class Markers(SizedGeometry):
 
         return (min_x - 1, min_y - 1, max_x - min_x + 2, max_y - min_y + 2)
 
+    def _item_bounds(self):
+        for geometry, size in zip(self.geometry, self.sizes):
+            x = geometry[0]
+            y = geometry[1]
+            size = abs(size)
+            yield _padded(x - size, y - size, x + size, y + size)
+
 
 class Points(Markers):
     def __init__(self, geometry, colors, markers, *, surface=None, clip=None):
         sizes = Repeat(0)  # Dummy
-        super().__init__(geometry, colors, sizes, surface=surface, clip=clip)
+        super().__init__(geometry, colors, sizes, markers, surface=surface, clip=clip)
 
     def __iter__(self):
         yield from zip(self.geometry, self.colors, self.markers)
 
     def draw_raster(self, raster):
+        if self._is_pixels() and self._can_batch(raster):
+            k = self.geometry.coords
+            for points, n, colors, color in self._batches():
+                fill_pixels(raster, points, n, k, colors, color)
+            return
         buffer = raster.fbuf
         x = raster.x
         y = raster.y
         w = raster.w
         h = raster.h
-        palette_buf = array("H", [BLIT_KEY_RGB565, 0x0000])
-        palette = framebuf.FrameBuffer(palette_buf, 2, 1, framebuf.RGB565)
-        for geometry, color, marker in self:
+        palette_buf = _palette_buf
+        palette = _palette
+        key = _blit_key(raster)
+        colors = iter(self.colors)
+        markers = iter(self.markers)
+        for geometry in self.geometry:
+            try:
+                color = next(colors)
+                marker = next(markers)
+            except StopIteration:
+                break
             px = geometry[0] - x
             py = geometry[1] - y
             if px < 0 or px > w or py < 0 or py > h:
@@ -114,7 +210,7 @@ class Points(Markers):
             elif isinstance(marker, framebuf.FrameBuffer):
                 # assume 1-bit framebuffer - no way to test!
                 palette_buf[1] = color
-                buffer.blit(marker, px, py, BLIT_KEY_RGB565, palette)
+                buffer.blit(marker, px, py, key, palette)
             elif isinstance(marker, array):
                 buffer.poly(px, py, marker, color, True)
 
@@ -130,3 +226,7 @@ class Points(Markers):
             min_y = min(min_y, geometry[1])
 
         return (min_x - 1, min_y - 1, max_x - min_x + 2, max_y - min_y + 2)
+
+    def _item_bounds(self):
+        for geometry in self.geometry:
+            yield _padded(geometry[0], geometry[1], geometry[0], geometry[1])
@@ -25,6 +25,15 @@ class Marker:
     PLUS = 5
     CROSS = 6
 
+def clear_stamp_cache() -> None:
+    """Discard all pre-rendered marker stamps.
+
+    Circle, plus and cross markers are rendered once for each size into
+    small 1-bit stamps which are then blitted at each point.  A small
+    number of these stamps are cached and shared between all Markers;
+    this function frees that memory if it is needed elsewhere.
+    """
+
 class Markers(ColoredGeometry[point_length]):
     """Display sized, colored markers at points.
 
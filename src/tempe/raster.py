@@ -4,36 +4,206 @@
 
 import framebuf
 
+# bits per pixel of supported formats
+_FORMAT_BITS = {
+    framebuf.RGB565: 16,
+    framebuf.GS8: 8,
+    framebuf.GS4_HMSB: 4,
+    framebuf.MONO_VLSB: 1,
+    framebuf.MONO_HLSB: 1,
+    framebuf.MONO_HMSB: 1,
+}
+
+# pixel alignment needed for the start of a row in each format
+_FORMAT_ALIGN = {
+    framebuf.RGB565: 1,
+    framebuf.GS8: 1,
+    framebuf.GS4_HMSB: 2,
+    framebuf.MONO_VLSB: 1,
+    framebuf.MONO_HLSB: 8,
+    framebuf.MONO_HMSB: 8,
+}
+
+# MONO_VLSB packs columns of 8 pixels, so rows must be aligned instead
+_VLSB_ROWS = 8
+
+
+def _stride(w, format):
+    align = _FORMAT_ALIGN[format]
+    return (w + align - 1) // align * align
+
+
+def _buffer_size(w, h, format):
+    if format == framebuf.MONO_VLSB:
+        return _stride(w, format) * ((h + _VLSB_ROWS - 1) // _VLSB_ROWS)
+    return (_stride(w, format) * h * _FORMAT_BITS[format] + 7) // 8
+
+
+def _byte_offset(offset, stride, format):
+    """Convert an offset in pixels to an offset in bytes."""
+    if format == framebuf.MONO_VLSB:
+        return offset // stride // _VLSB_ROWS * stride + offset % stride
+    return offset * _FORMAT_BITS[format] // 8
+
+
+def _clip_rect(raster, x, y, w, h):
+    """Intersect a rectangle with a raster, aligned to the raster format.
+
+    Returns the aligned rectangle followed by the exact intersection, or
+    None if there is no intersection.
+    """
+    x1 = max(x, raster.x)
+    x2 = min(x + w, raster.x + raster.w)
+    y1 = max(y, raster.y)
+    y2 = min(y + h, raster.y + raster.h)
+    if x2 <= x1 or y2 <= y1:
+        return None
+    # sub-byte formats can only start on a byte boundary
+    ax = x1 - (x1 - raster.x) % _FORMAT_ALIGN[raster.format]
+    ay = y1
+    if raster.format == framebuf.MONO_VLSB:
+        ay -= (y1 - raster.y) % _VLSB_ROWS
+    return (ax, ay, x2 - ax, y2 - ay, x1, y1, x2 - x1, y2 - y1)
+
 
 class Raster:
     """A rectangular buffer that can be drawn on by a surface."""
 
     def __init__(self, buf, x, y, w, h, stride=None, offset=0, format=framebuf.RGB565):
-        stride = stride if stride is not None else w
+        stride = stride if stride is not None else _stride(w, format)
         self.buf = buf
         self.x = x
         self.y = y
         self.w = w
         self.h = h
-        self.pixel_size = 2
+        self.bits = _FORMAT_BITS[format]
+        # bytes per pixel, for compatibility with code predating bits
+        self.pixel_size = self.bits // 8
         self.offset = offset
         self.stride = stride
         self.format = format
+        self.clip_rect = None
         self.fbuf = framebuf.FrameBuffer(
-            memoryview(buf)[self.pixel_size * offset :], w, h, self.format, stride
+            memoryview(buf)[_byte_offset(offset, stride, format) :],
+            w,
+            h,
+            format,
+            stride,
         )
 
     @classmethod
-    def from_rect(cls, x, y, w, h):
-        buf = bytearray(2 * w * h)
-        return cls(buf, x, y, w, h)
+    def from_rect(cls, x, y, w, h, format=framebuf.RGB565):
+        buf = bytearray(_buffer_size(w, h, format))
+        return cls(buf, x, y, w, h, format=format)
 
     def clip(self, x, y, w, h):
-        x1 = max(x, self.x)
-        w1 = min(x + w, self.x + self.w) - x1
-        y1 = max(y, self.y)
-        h1 = min(y + h, self.y + self.h) - y1
-        if w1 <= 0 or h1 <= 0:
+        rect = _clip_rect(self, x, y, w, h)
+        if rect is None:
             return None
+        x1, y1, w1, h1, cx, cy, cw, ch = rect
         offset = self.offset + self.stride * (y1 - self.y) + (x1 - self.x)
-        return Raster(self.buf, x1, y1, w1, h1, self.stride, offset, self.format)
+        raster = Raster(self.buf, x1, y1, w1, h1, self.stride, offset, self.format)
+        if cx != x1 or cy != y1:
+            raster.clip_rect = (cx, cy, cw, ch)
+        return raster
+
+    def save_margins(self, saved):
+        """Copy pixels outside the clip rect into an array."""
+        self._margins(saved, False)
+
+    def restore_margins(self, saved):
+        """Copy pixels outside the clip rect back from an array."""
+        self._margins(saved, True)
+
+    def _margins(self, saved, restore):
+        cx, cy, cw, ch = self.clip_rect
+        x0 = cx - self.x
+        x1 = x0 + cw
+        y0 = cy - self.y
+        y1 = y0 + ch
+        w = self.w
+        fbuf = self.fbuf
+        i = 0
+        for py in range(self.h):
+            if y0 <= py < y1:
+                # only the pixels to the left and right
+                for px in range(x0):
+                    if restore:
+                        fbuf.pixel(px, py, saved[i])
+                    else:
+                        saved[i] = fbuf.pixel(px, py)
+                    i += 1
+                start = x1
+            else:
+                start = 0
+            for px in range(start, w):
+                if restore:
+                    fbuf.pixel(px, py, saved[i])
+                else:
+                    saved[i] = fbuf.pixel(px, py)
+                i += 1
+
+    def margin_size(self):
+        """The number of pixels outside the clip rect."""
+        if self.clip_rect is None:
+            return 0
+        return self.w * self.h - self.clip_rect[2] * self.clip_rect[3]
+
+
+class RasterPool:
+    """A bounded pool of reusable Rasters which share a buffer."""
+
+    def __init__(self, size=32):
+        self.size = size
+        self.buf = None
+        self._rasters = {}
+        self._count = 0
+
+    def raster(self, buf, x, y, w, h, stride=None, offset=0, format=framebuf.RGB565):
+        stride = stride if stride is not None else _stride(w, format)
+        if buf is not self.buf:
+            self.clear()
+            self.buf = buf
+        rasters = self._rasters.get(offset)
+        if rasters is not None:
+            for raster in rasters:
+                if (
+                    raster.w == w
+                    and raster.h == h
+                    and raster.stride == stride
+                    and raster.format == format
+                ):
+                    raster.x = x
+                    raster.y = y
+                    raster.clip_rect = None
+                    return raster
+        if self._count >= self.size:
+            # pool is full, so start again
+            self.clear()
+            self.buf = buf
+            rasters = None
+        raster = Raster(buf, x, y, w, h, stride, offset, format)
+        if rasters is None:
+            self._rasters[offset] = [raster]
+        else:
+            rasters.append(raster)
+        self._count += 1
+        return raster
+
+    def clip(self, raster, x, y, w, h):
+        rect = _clip_rect(raster, x, y, w, h)
+        if rect is None:
+            return None
+        x1, y1, w1, h1, cx, cy, cw, ch = rect
+        offset = raster.offset + raster.stride * (y1 - raster.y) + (x1 - raster.x)
+        clipped = self.raster(
+            raster.buf, x1, y1, w1, h1, raster.stride, offset, raster.format
+        )
+        if cx != x1 or cy != y1:
+            clipped.clip_rect = (cx, cy, cw, ch)
+        return clipped
+
+    def clear(self):
+        self.buf = None
+        self._rasters = {}
+        self._count = 0
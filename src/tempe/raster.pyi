@@ -28,6 +28,17 @@ class Raster:
         The x-offset of the framebuffer relative to the Surface.
     y : int
         The y-offset of the framebuffer relative to the Surface.
+    format : int
+        The framebuf format of the pixels.
+    bits : int
+        The number of bits per pixel.
+    pixel_size : int
+        The number of bytes per pixel, which is 0 for formats with less
+        than a byte per pixel.  This is kept for compatibility, and new
+        code should use ``bits``.
+    clip_rect : tuple[int, int, int, int] | None
+        If the raster is larger than the region which should be drawn
+        on, the rectangle which may be drawn on, otherwise None.
     """
 
     def __init__(
@@ -39,9 +50,10 @@ class Raster:
         h: int,
         stride: int | None = None,
         offset: int = 0,
+        format: int = framebuf.RGB565,
     ): ...
     @classmethod
-    def from_rect(cls, x: int, y: int, w: int, h: int) -> Self:
+    def from_rect(cls, x: int, y: int, w: int, h: int, format: int = framebuf.RGB565) -> Self:
         """Create a Raster with a new buffer for the given rectangle."""
 
     def clip(self, x: int, y: int, w: int, h: int) -> Self | None:
@@ -49,6 +61,69 @@ class Raster:
 
         If there is no intersection between the raster and the rectangle, then
         None is returned.
+
+        For formats with more than one pixel per byte, the clipped raster has
+        to start on a byte boundary, so it may extend to the left of the
+        rectangle, or above it for MONO_VLSB, where each byte holds a column
+        of 8 pixels.  In this case ``clip_rect`` holds the exact intersection
+        and the extra pixels should be preserved using ``save_margins`` and
+        ``restore_margins``.
         """
 
-__all__ = ["Raster"]
+    def margin_size(self) -> int:
+        """The number of pixels outside the clip rect."""
+
+    def save_margins(self, saved: array[int]) -> None:
+        """Copy pixels outside the clip rect into an array."""
+
+    def restore_margins(self, saved: array[int]) -> None:
+        """Copy pixels outside the clip rect back from an array."""
+
+class RasterPool:
+    """A bounded pool of reusable Rasters which share a buffer.
+
+    Creating a Raster allocates a new FrameBuffer, which can put pressure
+    on the garbage collector if done for every clipped shape on every
+    refresh.  A RasterPool hands out previously created Rasters whenever
+    the buffer, offset, size and stride match, only updating the position.
+
+    Rasters from a pool are only valid until the next request to the pool
+    for a Raster with the same memory layout, so they should not be
+    stored.  This class is used internally by Surfaces.
+
+    Parameters
+    ----------
+    size : int
+        The maximum number of Rasters to hold.  If more are needed, the
+        pool is emptied and starts again.
+    """
+
+    #: The buffer that all Rasters in the pool share.
+    buf: array | None
+
+    def __init__(self, size: int = 32): ...
+
+    def raster(
+        self,
+        buf: array,
+        x: int,
+        y: int,
+        w: int,
+        h: int,
+        stride: int | None = None,
+        offset: int = 0,
+        format: int = framebuf.RGB565,
+    ) -> Raster:
+        """Get a Raster from the pool with the given layout and position."""
+
+    def clip(self, raster: Raster, x: int, y: int, w: int, h: int) -> Raster | None:
+        """Get a Raster from the pool sharing the raster's buffer, clipped to the rectangle.
+
+        If there is no intersection between the raster and the rectangle, then
+        None is returned.
+        """
+
+    def clear(self) -> None:
+        """Empty the pool."""
+
+__all__ = ["Raster", "RasterPool"]
@@ -0,0 +1,113 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from time import ticks_diff, ticks_ms
+import _thread
+
+
+#: Milliseconds between checks for the rendering thread finishing a frame.
+_POLL_MS = const(2)
+
+
+class ThreadedRenderer:
+    """Refresh a surface on a second thread or core."""
+
+    def __init__(self, surface, display, working_buffer):
+        self.surface = surface
+        self.display = display
+        self.working_buffer = working_buffer
+        self.running = False
+        self.error = None
+        self._frame = None
+        self._busy = False
+        self._stopped = True
+        # held while the rendering thread has no frame to render
+        self._wake = _thread.allocate_lock()
+        self._wake.acquire()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zero the frame statistics."""
+        self.frames = 0
+        self.last_ms = 0
+        self.worst_ms = 0
+
+    def start(self):
+        """Start the rendering thread."""
+        if self.running:
+            return
+        # the rendering thread owns the layer cache from now on
+        self.surface._invalidated = []
+        self.surface.threaded = True
+        self.running = True
+        self._stopped = False
+        _thread.start_new_thread(self._work, ())
+
+    async def stop(self):
+        """Finish the current frame and stop the rendering thread."""
+        if not self.running:
+            return
+        await self.idle()
+        self.running = False
+        self._frame = None
+        self._wake.release()
+        while not self._stopped:
+            await asyncio.sleep(_POLL_MS / 1000)
+        surface = self.surface
+        invalidated = surface._invalidated
+        surface._invalidated = None
+        surface.threaded = False
+        if surface._layer_cache is not None and invalidated:
+            for rect in invalidated:
+                surface._layer_cache.invalidate(rect)
+
+    async def run(self):
+        """Hand damage to the rendering thread whenever it is free, forever."""
+        self.start()
+        while True:
+            await self.surface.refresh_needed.wait()
+            await self.frame()
+
+    async def frame(self):
+        """Wait for the rendering thread to be free and hand it the damage."""
+        await self.idle()
+        if not self.running:
+            raise RuntimeError("The rendering thread is not running")
+        self._frame = self.surface._take_frame()
+        self._busy = True
+        self._wake.release()
+
+    async def idle(self):
+        """Wait until the rendering thread has finished its frame."""
+        while self._busy:
+            await asyncio.sleep(_POLL_MS / 1000)
+        error = self.error
+        if error is not None:
+            self.error = None
+            raise error
+
+    def _work(self):
+        surface = self.surface
+        try:
+            while True:
+                self._wake.acquire()
+                frame = self._frame
+                if frame is None:
+                    # asked to stop
+                    break
+                self._frame = None
+                start = ticks_ms()
+                try:
+                    surface._render_frame(self.display, self.working_buffer, frame)
+                except Exception as e:
+                    self.error = e
+                elapsed = ticks_diff(ticks_ms(), start)
+                self.frames += 1
+                self.last_ms = elapsed
+                if elapsed > self.worst_ms:
+                    self.worst_ms = elapsed
+                self._busy = False
+        finally:
+            self._stopped = True
@@ -0,0 +1,106 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""This module defines the ThreadedRenderer class.
+
+A ThreadedRenderer draws and blits a Surface on a second thread, which on
+the RP2040 runs on the second core, while the event loop keeps handling
+input and updating data on the first.
+"""
+
+from .display import Display
+from .surface import Surface
+
+
+class ThreadedRenderer:
+    """Refresh a surface on a second thread or core.
+
+    The main thread takes the surface's pending damage and a snapshot of
+    its layer lists, and hands them to the rendering thread as a frame.
+    Only one frame is in flight at a time, and damage made while it is
+    rendered is collected for the next frame.  The only lock is the one the
+    rendering thread waits on for its next frame.
+
+    Once started, the rendering thread is the only one which may use the
+    display, and refresh methods of the surface should not be called.
+    Shapes may still be updated, added and removed from the main thread
+    while a frame renders.  A shape which changes part way through may be
+    drawn inconsistently in that frame, but its damage is always redrawn
+    in the next one.  Shapes should be given new geometry, colors and other
+    data with ``update`` rather than having their arrays changed in place.
+    While the renderer is running the surface's ``threaded`` attribute is
+    set, and components allocate new arrays for each update instead of
+    refilling the ones the rendering thread may be reading.
+
+    Parameters
+    ----------
+    surface : Surface
+        The surface to refresh.
+    display : Display
+        The display to refresh it on.
+    working_buffer : bytearray | None
+        The working buffer to render strips in.
+
+    Attributes
+    ----------
+    running : bool
+        Whether the rendering thread has been started.
+    frames : int
+        The number of frames rendered.
+    last_ms : int
+        The time taken to render the last frame in milliseconds.
+    worst_ms : int
+        The longest time taken to render a frame in milliseconds.
+    """
+
+    surface: Surface
+    display: Display
+    working_buffer: bytearray | None
+    running: bool
+    error: Exception | None
+    frames: int
+    last_ms: int
+    worst_ms: int
+
+    def __init__(
+        self,
+        surface: Surface,
+        display: Display,
+        working_buffer: bytearray | None,
+    ): ...
+
+    def reset_stats(self) -> None:
+        """Zero the frame statistics."""
+
+    def start(self) -> None:
+        """Start the rendering thread."""
+
+    async def stop(self) -> None:
+        """Finish the current frame and stop the rendering thread.
+
+        After stopping, the surface can be refreshed from the main thread
+        again.
+        """
+
+    async def run(self) -> None:
+        """Hand damage to the rendering thread whenever it is free, forever.
+
+        This starts the rendering thread if needed, and is intended to be run
+        as a task alongside the tasks which update the surface's shapes.
+        """
+
+    async def frame(self) -> None:
+        """Wait for the rendering thread to be free and hand it the damage.
+
+        Raises
+        ------
+        RuntimeError
+            If the rendering thread has not been started.
+        """
+
+    async def idle(self) -> None:
+        """Wait until the rendering thread has finished its frame.
+
+        Any exception raised while rendering is re-raised here.
+        """
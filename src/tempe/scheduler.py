@@ -0,0 +1,64 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from time import ticks_add, ticks_diff, ticks_ms
+
+
+class FrameScheduler:
+    """Refresh a surface at a paced frame rate, coalescing damage."""
+
+    def __init__(self, surface, display, working_buffer, fps=30, min_interval=0):
+        self.surface = surface
+        self.display = display
+        self.working_buffer = working_buffer
+        self.frame_interval = 1000 // fps
+        self.min_interval = min_interval
+        self._next_frame = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zero the frame statistics."""
+        self.frames = 0
+        self.missed = 0
+        self.last_ms = 0
+        self.worst_ms = 0
+
+    async def run(self):
+        """Refresh the surface whenever it is damaged, forever."""
+        while True:
+            await self.surface.refresh_needed.wait()
+            await self.frame()
+
+    async def frame(self):
+        """Wait for the next frame slot and then refresh the surface."""
+        start = ticks_ms()
+        slot = self._next_frame
+        if slot is None or ticks_diff(slot, start) < -self.frame_interval:
+            # idle for more than a frame, so start a new slot now
+            slot = start
+        else:
+            delay = ticks_diff(slot, start)
+            if delay > 0:
+                # let damage from the rest of the frame window accumulate
+                await asyncio.sleep(delay / 1000)
+                start = ticks_ms()
+        deadline = ticks_add(slot, self.frame_interval)
+
+        self.surface.refresh(self.display, self.working_buffer)
+
+        end = ticks_ms()
+        elapsed = ticks_diff(end, start)
+        self.frames += 1
+        self.last_ms = elapsed
+        if elapsed > self.worst_ms:
+            self.worst_ms = elapsed
+        if ticks_diff(end, deadline) > 0:
+            self.missed += 1
+            # don't try to catch up on missed slots
+            deadline = end
+        earliest = ticks_add(end, self.min_interval)
+        if ticks_diff(earliest, deadline) > 0:
+            deadline = earliest
+        self._next_frame = deadline
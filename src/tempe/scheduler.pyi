@@ -0,0 +1,91 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""This module defines the FrameScheduler class.
+
+A FrameScheduler replaces the usual loop which waits on a Surface's
+``refresh_needed`` event and refreshes straight away.  When several tasks
+update shapes at around the same time, that loop refreshes each of their
+changes separately, while the scheduler collects all damage from a frame
+window and refreshes it together.
+"""
+
+from .display import Display
+from .surface import Surface
+
+
+class FrameScheduler:
+    """Refresh a surface at a paced frame rate, coalescing damage.
+
+    Frames start at most once every ``frame_interval`` milliseconds.  When
+    the surface is damaged, the scheduler waits until the next frame slot
+    so that any other damage made before then is refreshed in the same
+    frame.  After a surface has been idle, the first damage is refreshed
+    immediately.
+
+    Damage made with a priority using ``Surface.damage`` is refreshed
+    first within a frame.
+
+    A frame which finishes after the end of its slot counts as missed, and
+    the next frame starts when it finishes rather than trying to catch up.
+
+    Parameters
+    ----------
+    surface : Surface
+        The surface to refresh.
+    display : Display
+        The display to refresh it on.
+    working_buffer : bytearray | None
+        The working buffer to pass to ``Surface.refresh``.
+    fps : int
+        The target number of frames per second.
+    min_interval : int
+        The minimum number of milliseconds between the end of one frame and
+        the start of the next, leaving time for other tasks to run.
+
+    Attributes
+    ----------
+    frame_interval : int
+        The length of a frame slot in milliseconds.
+    frames : int
+        The number of frames refreshed.
+    missed : int
+        The number of frames which finished after the end of their slot.
+    last_ms : int
+        The time taken to refresh the last frame in milliseconds.
+    worst_ms : int
+        The longest time taken to refresh a frame in milliseconds.
+    """
+
+    surface: Surface
+    display: Display
+    working_buffer: bytearray | None
+    frame_interval: int
+    min_interval: int
+    frames: int
+    missed: int
+    last_ms: int
+    worst_ms: int
+
+    def __init__(
+        self,
+        surface: Surface,
+        display: Display,
+        working_buffer: bytearray | None,
+        fps: int = 30,
+        min_interval: int = 0,
+    ): ...
+
+    def reset_stats(self) -> None:
+        """Zero the frame statistics."""
+
+    async def run(self) -> None:
+        """Refresh the surface whenever it is damaged, forever.
+
+        This is intended to be run as a task alongside the tasks which
+        update the surface's shapes.
+        """
+
+    async def frame(self) -> None:
+        """Wait for the next frame slot and then refresh the surface."""
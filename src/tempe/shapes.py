@@ -4,12 +4,75 @@
 
 """Shape classes which efficiently draw primitives."""
 
+from array import array
 import asyncio
-from .util import intersect_poly_rect
+import framebuf
+
+from .data_view import Repeat
+from .geometry import Geometry, Transformed
+from .util import (
+    ArrayBuffer, intersect_poly_rect, fill_rects, fill_lines, fill_pixels, simplify_points
+)
 
 #: Transparent color when blitting bitmaps.
 BLIT_KEY_RGB565 = const(0b0000000000100000)
 
+# Maximum number of coordinates per row for batched drawing.
+_BATCH_COORDS = const(8)
+
+# Maximum number of rows per batch.
+_BATCH_ROWS = const(64)
+
+# Shared scratch buffers for batched drawing.
+_batch_geometry = array("h", bytearray(2 * _BATCH_COORDS * _BATCH_ROWS))
+_batch_colors = array("H", bytearray(2 * _BATCH_ROWS))
+
+# Transparent color when blitting onto palette-indexed rasters, which is
+# never a palette index, unlike BLIT_KEY_RGB565.
+_BLIT_KEY_INDEXED = const(0xFFFF)
+
+# Shared palette for blitting 1-bit bitmaps: the second entry is the color.
+_palette_buf = array("H", [BLIT_KEY_RGB565, 0x0000])
+_palette = framebuf.FrameBuffer(_palette_buf, 2, 1, framebuf.RGB565)
+
+
+def _blit_key(raster):
+    """Set and return the transparent color for blitting 1-bit bitmaps."""
+    if raster.format == framebuf.RGB565:
+        key = BLIT_KEY_RGB565
+    else:
+        key = _BLIT_KEY_INDEXED
+    _palette_buf[0] = key
+    return key
+
+
+def _transformed_bounds(geometry):
+    """Bounds of shapes drawn through the points of a Transformed geometry."""
+    min_x, min_y, max_x, max_y = geometry.bounds()
+    return (min_x - 1, min_y - 1, max_x - min_x + 2, max_y - min_y + 2)
+
+
+def _simplified_vertices(shape):
+    """The vertex arrays a shape draws, simplified if it has a tolerance."""
+    if shape.tolerance is None:
+        return shape.geometry
+    if shape._simplified is None:
+        # simplified once, until the geometry or tolerance changes
+        tolerance = shape.tolerance
+        buffers = shape._simplify_buffers
+        simplified = []
+        for i, row in enumerate(shape.geometry):
+            if i == len(buffers):
+                buffers.append(ArrayBuffer("h"))
+            simplified.append(simplify_points(row, len(row) // 2, tolerance, buffers[i]))
+        shape._simplified = simplified
+    return shape._simplified
+
+
+def _padded(min_x, min_y, max_x, max_y):
+    """Rectangle covering pixels from min to max inclusive, with a margin of 1."""
+    return (min_x - 1, min_y - 1, max_x - min_x + 3, max_y - min_y + 3)
+
 
 class Shape:
     """ABC for drawable objects."""
@@ -17,7 +80,9 @@ class Shape:
     def __init__(self, surface=None, clip=None):
         self.surface = surface
         self.clip = clip
+        self.layer = None
         self._bounds = None
+        self._opaque = None
 
     def draw(self, buffer, x=0, y=0):
         # draw nothing
@@ -31,13 +96,37 @@ class Shape:
             if self._bounds is None:
                 self._bounds = self._get_bounds()
             if self.surface:
-                self.surface.damage(self._bounds)
+                self.surface.damage(self._bounds, self.layer)
         elif self.surface:
-            self.surface.damage(self.clip)
+            self.surface.damage(self.clip, self.layer)
+        if self.surface and self.surface._spatial_index is not None:
+            # item bounds may have changed
+            self.surface._spatial_index.invalidate(self)
+        opaque = self._get_opaque()
+        if opaque is not None and self.clip is not None:
+            x, y, w, h = self.clip
+            x0 = max(opaque[0], x)
+            y0 = max(opaque[1], y)
+            x1 = min(opaque[0] + opaque[2], x + w)
+            y1 = min(opaque[1] + opaque[3], y + h)
+            if x0 < x1 and y0 < y1:
+                opaque = (x0, y0, x1 - x0, y1 - y0)
+            else:
+                opaque = None
+        self._opaque = opaque
 
     def _get_bounds(self):
         raise NotImplementedError()
 
+    def _item_bounds(self):
+        """Generate a bounding rectangle for each item, in drawing order."""
+        # no individual items by default
+        return iter(())
+
+    def _get_opaque(self):
+        # most shapes don't completely cover any rectangle
+        return None
+
 
 class ColoredGeometry(Shape):
     """ABC for geometries with colors applied."""
@@ -54,7 +143,7 @@ class ColoredGeometry(Shape):
                 if self._bounds is None:
                     self._bounds = self._get_bounds()
                 if self.surface:
-                    self.surface.damage(self._bounds)
+                    self.surface.damage(self._bounds, self.layer)
             self.geometry = geometry
             # bounds are no longer valid
             self._bounds = None
@@ -68,6 +157,40 @@ class ColoredGeometry(Shape):
     def __iter__(self):
         yield from zip(self.geometry, self.colors)
 
+    def _can_batch(self, raster):
+        # the native kernels only handle RGB565 rasters
+        geometry = self.geometry
+        return (
+            raster.format == framebuf.RGB565
+            and isinstance(geometry, Geometry)
+            and geometry.coords is not None
+            and geometry.coords <= _BATCH_COORDS
+        )
+
+    def _batches(self):
+        """Generate packed chunks of geometry and colors for native drawing.
+
+        Yields tuples of (geometry buffer, row count, color buffer, color),
+        where color is -1 unless all rows share a single color.
+        """
+        colors = self.colors
+        if isinstance(colors, Repeat):
+            color = colors.data
+            for n in self.geometry.pack(_batch_geometry, _BATCH_ROWS):
+                yield _batch_geometry, n, _batch_colors, color
+        else:
+            color_iter = iter(colors)
+            for n in self.geometry.pack(_batch_geometry, _BATCH_ROWS):
+                for i in range(n):
+                    try:
+                        _batch_colors[i] = next(color_iter)
+                    except StopIteration:
+                        # ran out of colors
+                        if i:
+                            yield _batch_geometry, i, _batch_colors, -1
+                        return
+                yield _batch_geometry, n, _batch_colors, -1
+
 
 class SizedGeometry(ColoredGeometry):
     """ABC for geometries where there is a size associated with each object."""
@@ -83,7 +206,7 @@ class SizedGeometry(ColoredGeometry):
                 if self._bounds is None:
                     self._bounds = self._get_bounds()
                 if self.surface:
-                    self.surface.damage(self._bounds)
+                    self.surface.damage(self._bounds, self.layer)
             self.sizes = sizes
             if geometry is not None:
                 # don't need to redo bounds in super call, just record changes
@@ -128,7 +251,12 @@ class Lines(ColoredGeometry):
         y = raster.y
         w = raster.w
         h = raster.h
-        for geometry, color in self:
+        colors = iter(self.colors)
+        for geometry in self.geometry:
+            try:
+                color = next(colors)
+            except StopIteration:
+                break
             if intersect_poly_rect(geometry, 4, x, y, w, h):
                 x0 = geometry[0] - x
                 y0 = geometry[1] - y
@@ -137,6 +265,8 @@ class Lines(ColoredGeometry):
                 buffer.line(x0, y0, x1, y1, color)
 
     def _get_bounds(self):
+        if isinstance(self.geometry, Transformed) and self.geometry.points is None:
+            return _transformed_bounds(self.geometry)
         max_x = -0x7FFF
         min_x = 0x7FFF
         max_y = -0x7FFF
@@ -149,6 +279,15 @@ class Lines(ColoredGeometry):
 
         return (min_x - 1, min_y - 1, max_x - min_x + 2, max_y - min_y + 2)
 
+    def _item_bounds(self):
+        for geometry in self.geometry:
+            yield _padded(
+                min(geometry[0], geometry[2]),
+                min(geometry[1], geometry[3]),
+                max(geometry[0], geometry[2]),
+                max(geometry[1], geometry[3]),
+            )
+
 
 class HLines(ColoredGeometry):
     """Render multiple colored horizontal line segments with line-width 1.
@@ -156,6 +295,13 @@ class HLines(ColoredGeometry):
     Geometry should produce x0, y0, l arrays.
     """
 
+    def draw_raster(self, raster):
+        if self._can_batch(raster):
+            for lines, n, colors, color in self._batches():
+                fill_lines(raster, lines, n, self.geometry.coords, colors, color, False)
+        else:
+            self.draw(raster.fbuf, raster.x, raster.y)
+
     def draw(self, buffer, x=0, y=0):
         for geometry, color in self:
             px = geometry[0] - x
@@ -176,6 +322,12 @@ class HLines(ColoredGeometry):
 
         return (min_x - 1, min_y - 1, max_x - min_x + 2, max_y - min_y + 2)
 
+    def _item_bounds(self):
+        for geometry in self.geometry:
+            x = geometry[0]
+            l = geometry[2]
+            yield _padded(min(x, x + l), geometry[1], max(x, x + l), geometry[1])
+
 
 class VLines(ColoredGeometry):
     """Render multiple colored vertical line segments with line-width 1.
@@ -183,6 +335,13 @@ class VLines(ColoredGeometry):
     Geometry should produce x0, y0, l arrays.
     """
 
+    def draw_raster(self, raster):
+        if self._can_batch(raster):
+            for lines, n, colors, color in self._batches():
+                fill_lines(raster, lines, n, self.geometry.coords, colors, color, True)
+        else:
+            self.draw(raster.fbuf, raster.x, raster.y)
+
     def draw(self, buffer, x=0, y=0):
         for geometry, color in self:
             px = geometry[0] - x
@@ -203,6 +362,12 @@ class VLines(ColoredGeometry):
 
         return (min_x - 1, min_y - 1, max_x - min_x + 2, max_y - min_y + 2)
 
+    def _item_bounds(self):
+        for geometry in self.geometry:
+            y = geometry[1]
+            l = geometry[2]
+            yield _padded(geometry[0], min(y, y + l), geometry[0], max(y, y + l))
+
 
 class PolyLines(ColoredGeometry):
     """Render multiple colored polylines with line-width 1.
@@ -210,13 +375,32 @@ class PolyLines(ColoredGeometry):
     Geometry should produce x0, y0, x1, y1 arrays.
     """
 
+    def __init__(self, geometry, colors, *, tolerance=None, surface=None, clip=None):
+        super().__init__(geometry, colors, surface=surface, clip=clip)
+        self.tolerance = tolerance
+        self._simplified = None
+        # storage for each row's simplified vertices, reused when they change
+        self._simplify_buffers = []
+
+    def update(self, geometry=None, colors=None, tolerance=None):
+        if geometry is not None or tolerance is not None:
+            self._simplified = None
+        if tolerance is not None:
+            self.tolerance = tolerance
+        super().update(geometry=geometry, colors=colors)
+
     def draw_raster(self, raster):
         buffer = raster.fbuf
         x = raster.x
         y = raster.y
         w = raster.w
         h = raster.h
-        for geometry, color in self:
+        colors = iter(self.colors)
+        for geometry in _simplified_vertices(self):
+            try:
+                color = next(colors)
+            except StopIteration:
+                break
             if intersect_poly_rect(geometry, len(geometry), x, y, w, h):
                 for i in range(0, len(geometry) - 2, 2):
                     x0 = geometry[i] - x
@@ -226,6 +410,8 @@ class PolyLines(ColoredGeometry):
                     buffer.line(x0, y0, x1, y1, color)
 
     def _get_bounds(self):
+        if isinstance(self.geometry, Transformed) and self.geometry.points is None:
+            return _transformed_bounds(self.geometry)
         max_x = -0x7FFF
         min_x = 0x7FFF
         max_y = -0x7FFF
@@ -239,6 +425,16 @@ class PolyLines(ColoredGeometry):
 
         return (min_x - 1, min_y - 1, max_x - min_x + 2, max_y - min_y + 2)
 
+    def _item_bounds(self):
+        for geometry in self.geometry:
+            geometry = list(geometry)
+            yield _padded(
+                min(geometry[::2]),
+                min(geometry[1::2]),
+                max(geometry[::2]),
+                max(geometry[1::2]),
+            )
+
 
 class Polygons(FillableGeometry):
     """Render multiple polygons.
@@ -246,17 +442,41 @@ class Polygons(FillableGeometry):
     Geometry should produce vertex buffers.
     """
 
+    def __init__(
+        self, geometry, colors, *, fill=True, tolerance=None, surface=None, clip=None
+    ):
+        super().__init__(geometry, colors, fill=fill, surface=surface, clip=clip)
+        self.tolerance = tolerance
+        self._simplified = None
+        # storage for each row's simplified vertices, reused when they change
+        self._simplify_buffers = []
+
+    def update(self, geometry=None, colors=None, fill=None, tolerance=None):
+        if geometry is not None or tolerance is not None:
+            self._simplified = None
+        if tolerance is not None:
+            self.tolerance = tolerance
+        super().update(geometry=geometry, colors=colors, fill=fill)
+
     def draw_raster(self, raster):
         buffer = raster.fbuf
         x = raster.x
         y = raster.y
         w = raster.w
         h = raster.h
-        for polygon, color in self:
+        fill = self.fill
+        colors = iter(self.colors)
+        for polygon in _simplified_vertices(self):
+            try:
+                color = next(colors)
+            except StopIteration:
+                break
             if intersect_poly_rect(polygon, len(polygon), x, y, w, h):
-                buffer.poly(-x, -y, polygon, color, self.fill)
+                buffer.poly(-x, -y, polygon, color, fill)
 
     def _get_bounds(self):
+        if isinstance(self.geometry, Transformed) and self.geometry.points is None:
+            return _transformed_bounds(self.geometry)
         max_x = -0x7FFF
         min_x = 0x7FFF
         max_y = -0x7FFF
@@ -270,6 +490,16 @@ class Polygons(FillableGeometry):
 
         return (min_x - 1, min_y - 1, max_x - min_x + 2, max_y - min_y + 2)
 
+    def _item_bounds(self):
+        for geometry in self.geometry:
+            geometry = list(geometry)
+            yield _padded(
+                min(geometry[::2]),
+                min(geometry[1::2]),
+                max(geometry[::2]),
+                max(geometry[1::2]),
+            )
+
 
 class Rectangles(FillableGeometry):
     """Render multiple rectangles.
@@ -277,6 +507,14 @@ class Rectangles(FillableGeometry):
     Geometry should produce x, y, w, h arrays.
     """
 
+    def draw_raster(self, raster):
+        if self._can_batch(raster):
+            fill = self.fill
+            for rects, n, colors, color in self._batches():
+                fill_rects(raster, rects, n, self.geometry.coords, colors, color, fill)
+        else:
+            self.draw(raster.fbuf, raster.x, raster.y)
+
     def draw(self, buffer, x=0, y=0):
         for rect, color in self:
             px = rect[0] - x
@@ -291,6 +529,24 @@ class Rectangles(FillableGeometry):
                 h = -h
             buffer.rect(px, py, w, h, color, self.fill)
 
+    def _get_opaque(self):
+        if not self.fill:
+            return None
+        opaque = None
+        for rect in self.geometry:
+            if opaque is not None:
+                # only single rectangles are considered
+                return None
+            x, y, w, h = rect[0], rect[1], rect[2], rect[3]
+            if w < 0:
+                x += w
+                w = -w
+            if h < 0:
+                y += h
+                h = -h
+            opaque = (x, y, w, h)
+        return opaque
+
     def _get_bounds(self):
         max_x = -0x7FFF
         min_x = 0x7FFF
@@ -304,6 +560,17 @@ class Rectangles(FillableGeometry):
 
         return (min_x, min_y, max_x - min_x, max_y - min_y)
 
+    def _item_bounds(self):
+        for rect in self.geometry:
+            x, y, w, h = rect[0], rect[1], rect[2], rect[3]
+            if w < 0:
+                x += w
+                w = -w
+            if h < 0:
+                y += h
+                h = -h
+            yield (x, y, w, h)
+
 
 class RoundedRectangles(Rectangles):
     """Render multiple rounded rectangles.
@@ -315,6 +582,13 @@ class RoundedRectangles(Rectangles):
         super().__init__(geometry, colors, fill=fill, surface=surface, clip=clip)
         self.radius = radius
 
+    def draw_raster(self, raster):
+        self.draw(raster.fbuf, raster.x, raster.y)
+
+    def _get_opaque(self):
+        # the corners are not covered
+        return None
+
     def draw(self, buffer, x=0, y=0):
         fill = self.fill
         for rect, color in self:
@@ -371,7 +645,13 @@ class Circles(FillableGeometry):
         y = raster.y
         w = raster.w
         h = raster.h
-        for geometry, color in self:
+        fill = self.fill
+        colors = iter(self.colors)
+        for geometry in self.geometry:
+            try:
+                color = next(colors)
+            except StopIteration:
+                break
             px = geometry[0] - x
             py = geometry[1] - y
             r = geometry[2]
@@ -380,7 +660,7 @@ class Circles(FillableGeometry):
             if r == 0:
                 # Avoid https://github.com/micropython/micropython/issues/16053
                 continue
-            buffer.ellipse(px, py, r, r, color, self.fill)
+            buffer.ellipse(px, py, r, r, color, fill)
 
     def _get_bounds(self):
         max_x = -0x7FFF
@@ -395,6 +675,13 @@ class Circles(FillableGeometry):
 
         return (min_x - 1, min_y - 1, max_x - min_x + 2, max_y - min_y + 2)
 
+    def _item_bounds(self):
+        for geometry in self.geometry:
+            x = geometry[0]
+            y = geometry[1]
+            r = abs(geometry[2])
+            yield _padded(x - r, y - r, x + r, y + r)
+
 
 class Ellipses(FillableGeometry):
     """Render multiple ellipses.
@@ -408,7 +695,13 @@ class Ellipses(FillableGeometry):
         y = raster.y
         w = raster.w
         h = raster.h
-        for geometry, color in self:
+        fill = self.fill
+        colors = iter(self.colors)
+        for geometry in self.geometry:
+            try:
+                color = next(colors)
+            except StopIteration:
+                break
             px = geometry[0] - x
             py = geometry[1] - y
             rx = geometry[2]
@@ -418,7 +711,7 @@ class Ellipses(FillableGeometry):
             if rx == 0 and ry == 0:
                 # Avoid https://github.com/micropython/micropython/issues/16053
                 continue
-            buffer.ellipse(px, py, rx, ry, color, self.fill)
+            buffer.ellipse(px, py, rx, ry, color, fill)
 
     def _get_bounds(self):
         max_x = -0x7FFF
@@ -432,3 +725,11 @@ class Ellipses(FillableGeometry):
             min_y = min(min_y, geometry[1] - abs(geometry[3]))
 
         return (min_x - 1, min_y - 1, max_x - min_x + 2, max_y - min_y + 2)
+
+    def _item_bounds(self):
+        for geometry in self.geometry:
+            x = geometry[0]
+            y = geometry[1]
+            rx = abs(geometry[2])
+            ry = abs(geometry[3])
+            yield _padded(x - rx, y - ry, x + rx, y + ry)
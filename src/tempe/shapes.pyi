@@ -58,7 +58,7 @@ BLIT_KEY_RGB565 : int
 
 from array import array
 import asyncio
-from collections.abc import Sequence, Iterable, Generator
+from collections.abc import Sequence, Iterable, Iterator, Generator
 from framebuf import FrameBuffer
 from typing import Any, Generic, TypeVar, TypeAlias, Final
 
@@ -92,7 +92,10 @@ class Shape:
 
     clip: rectangle | None
     surface: "tempe.surface.Surface | None"
+    #: The layer of the surface which holds the shape, if any.
+    layer: Any
     _bounds: rectangle | None
+    _opaque: rectangle | None
 
     def __init__(
         self,
@@ -133,6 +136,24 @@ class Shape:
         Subclasses need to override this.
         """
 
+    def _item_bounds(self) -> Iterator[rectangle]:
+        """Generate a bounding rectangle for each item of the Shape.
+
+        These are used for hit testing, and are generated in drawing order
+        so that the position of a rectangle is the index of its item.
+        Subclasses which draw separate items should override this; the
+        default generates nothing, and the Shape is hit tested as a whole.
+        """
+
+    def _get_opaque(self) -> rectangle | None:
+        """Compute a rectangle which the Shape completely covers, if any.
+
+        Surfaces skip drawing shapes which are hidden under a later opaque
+        rectangle.  Subclasses which draw solid regions can override this;
+        the default returns None.  The result is cached on ``update`` and
+        clipped to the Shape's clip region.
+        """
+
 class ColoredGeometry[geom](Shape):
     """ABC for geometries with colors applied.
 
@@ -335,7 +356,63 @@ class Polygons(FillableGeometry[point_array]):
     """Render multiple polygons.
 
     Geometry should produce vertex arrays of the form [x0, y0, x1, y1, ...].
+
+    If a tolerance is given, each polygon's vertices are simplified with
+    the Douglas-Peucker algorithm the first time it is drawn, dropping
+    vertices which are within the tolerance of the outline without them.
+    The simplified vertices are kept until the geometry or tolerance is
+    updated, so dense outlines are drawn with only the vertices which make
+    a visible difference.
+
+    Parameters
+    ----------
+    geometry : Iterable[point_array]
+        The sequence of polygons to render.
+    colors : Iterable[rgb565]
+        The sequence of colors for each polygon.
+    fill : bool
+        Whether to fill the shape or to draw the outline.
+    tolerance : float | None
+        The distance in pixels within which vertices may be dropped, or
+        None to draw every vertex.
+    surface : Surface | None
+        The surface which this shape is associated with.
+    clip : rectangle | None
+        An (x, y, w, h) tuple to clip drawing to - anything drawn outside
+        this region will not show on the display.
     """
+    tolerance: float | None
+
+    def __init__(
+        self,
+        geometry: Iterable[point_array],
+        colors: Iterable[rgb565],
+        *,
+        fill: bool = True,
+        tolerance: float | None = None,
+        surface: "tempe.surface.Surface | None" = None,
+        clip: rectangle | None = None,
+    ): ...
+    def update(
+        self,
+        geometry: Iterable[point_array] | None = None,
+        colors: Iterable[rgb565] | None = None,
+        fill: bool | None = None,
+        tolerance: float | None = None,
+    ):
+        """Update the state of the Shape, marking a redraw as needed.
+
+        Parameters
+        ----------
+        geometry : Geometry[point_array] | None
+            The sequence of polygons to render.
+        colors : Iterable[rgb565] | None
+            The sequence of colors for each polygon.
+        fill : bool | None
+            Whether to fill the shape or to draw the outline.
+        tolerance : float | None
+            The distance in pixels within which vertices may be dropped.
+        """
 
     def __iter__(self) -> tuple[point_array, int]: ...
 
@@ -343,7 +420,55 @@ class PolyLines(ColoredGeometry[point_array]):
     """Render multiple polylines.
 
     Geometry should produce vertex arrays of the form [x0, y0, x1, y1, ...].
+
+    If a tolerance is given, each polyline's vertices are simplified with
+    the Douglas-Peucker algorithm the first time it is drawn, and the
+    simplified vertices are kept until the geometry or tolerance is
+    updated.
+
+    Parameters
+    ----------
+    geometry : Iterable[point_array]
+        The sequence of polylines to render.
+    colors : Iterable[rgb565]
+        The sequence of colors for each polyline.
+    tolerance : float | None
+        The distance in pixels within which vertices may be dropped, or
+        None to draw every vertex.
+    surface : Surface | None
+        The surface which this shape is associated with.
+    clip : rectangle | None
+        An (x, y, w, h) tuple to clip drawing to - anything drawn outside
+        this region will not show on the display.
     """
+    tolerance: float | None
+
+    def __init__(
+        self,
+        geometry: Iterable[point_array],
+        colors: Iterable[rgb565],
+        *,
+        tolerance: float | None = None,
+        surface: "tempe.surface.Surface | None" = None,
+        clip: rectangle | None = None,
+    ): ...
+    def update(
+        self,
+        geometry: Iterable[point_array] | None = None,
+        colors: Iterable[rgb565] | None = None,
+        tolerance: float | None = None,
+    ):
+        """Update the state of the Shape, marking a redraw as needed.
+
+        Parameters
+        ----------
+        geometry : Geometry[point_array] | None
+            The sequence of polylines to render.
+        colors : Iterable[rgb565] | None
+            The sequence of colors for each polyline.
+        tolerance : float | None
+            The distance in pixels within which vertices may be dropped.
+        """
 
     def __iter__(self) -> tuple[point_array, int]: ...
 
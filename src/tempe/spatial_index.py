@@ -0,0 +1,170 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+from array import array
+
+# Maximum number of grid columns or rows for a single shape.
+_MAX_CELLS = const(64)
+
+
+class CellGrid:
+    """Item extents bucketed by the cells of a uniform grid which they overlap."""
+
+    def __init__(self, extents, x, y, cell_width, cell_height, columns, rows):
+        self.extents = extents
+        self.n_items = len(extents) // 4
+        self.x = x
+        self.y = y
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.columns = columns
+        self.rows = rows
+        self.candidates = 0
+        self._build()
+
+    def cells(self, x0, y0, x1, y1):
+        """The range of columns and rows which an extent overlaps."""
+        columns = self.columns
+        rows = self.rows
+        c0 = max(min(int((x0 - self.x) // self.cell_width), columns - 1), 0)
+        c1 = min(int((x1 - self.x) // self.cell_width) + 1, columns)
+        r0 = max(min(int((y0 - self.y) // self.cell_height), rows - 1), 0)
+        r1 = min(int((y1 - self.y) // self.cell_height) + 1, rows)
+        return c0, c1, r0, r1
+
+    def _build(self):
+        columns = self.columns
+        n_cells = columns * self.rows
+        extents = self.extents
+        # starts[cell] to starts[cell + 1] is the range of the cell's items
+        starts = array("I", bytes(4 * (n_cells + 1)))
+        for i in range(0, len(extents), 4):
+            if extents[i + 2] < extents[i] or extents[i + 3] < extents[i + 1]:
+                # empty items are never found
+                continue
+            c0, c1, r0, r1 = self.cells(extents[i], extents[i + 1], extents[i + 2], extents[i + 3])
+            for row in range(r0, r1):
+                for column in range(c0, c1):
+                    starts[row * columns + column + 1] += 1
+        for cell in range(n_cells):
+            starts[cell + 1] += starts[cell]
+        if self.n_items <= 0xFFFF:
+            items = array("H", bytes(2 * starts[n_cells]))
+        else:
+            items = array("I", bytes(4 * starts[n_cells]))
+        filled = array("I", starts)
+        for i in range(0, len(extents), 4):
+            if extents[i + 2] < extents[i] or extents[i + 3] < extents[i + 1]:
+                continue
+            c0, c1, r0, r1 = self.cells(extents[i], extents[i + 1], extents[i + 2], extents[i + 3])
+            for row in range(r0, r1):
+                for column in range(c0, c1):
+                    cell = row * columns + column
+                    items[filled[cell]] = i // 4
+                    filled[cell] += 1
+        self.starts = starts
+        self.items = items
+
+    def overlapping(self, x0, y0, x1, y1):
+        """The indices of items whose extents overlap an extent, in order."""
+        c0, c1, r0, r1 = self.cells(x0, y0, x1, y1)
+        if c0 >= c1 or r0 >= r1:
+            self.candidates = 0
+            return []
+        extents = self.extents
+        starts = self.starts
+        items = self.items
+        columns = self.columns
+        found = []
+        candidates = 0
+        for row in range(r0, r1):
+            for column in range(c0, c1):
+                cell = row * columns + column
+                start = starts[cell]
+                end = starts[cell + 1]
+                candidates += end - start
+                for k in range(start, end):
+                    i = items[k]
+                    j = 4 * i
+                    if (
+                        extents[j] <= x1
+                        and extents[j + 1] <= y1
+                        and extents[j + 2] >= x0
+                        and extents[j + 3] >= y0
+                    ):
+                        found.append(i)
+        if c1 - c0 > 1 or r1 - r0 > 1:
+            # items in several cells are found more than once
+            found = list(set(found))
+        found.sort()
+        self.candidates = candidates
+        return found
+
+
+class ItemGrid(CellGrid):
+    """The bounds of a shape's items, bucketed by the grid cells they overlap."""
+
+    def __init__(self, shape, cell_size=32):
+        # last pixel covered, so items without area have empty extents
+        extents = array("h")
+        x0 = y0 = 0x7FFF
+        x1 = y1 = -0x8000
+        for x, y, w, h in shape._item_bounds():
+            extents.append(x)
+            extents.append(y)
+            extents.append(x + w - 1)
+            extents.append(y + h - 1)
+            if w > 0 and h > 0:
+                x0 = min(x0, x)
+                y0 = min(y0, y)
+                x1 = max(x1, x + w)
+                y1 = max(y1, y + h)
+        if x1 <= x0:
+            # nothing to hit
+            x0 = y0 = x1 = y1 = 0
+        cell_width = max(cell_size, (x1 - x0 + _MAX_CELLS - 1) // _MAX_CELLS)
+        cell_height = max(cell_size, (y1 - y0 + _MAX_CELLS - 1) // _MAX_CELLS)
+        super().__init__(
+            extents,
+            x0,
+            y0,
+            cell_width,
+            cell_height,
+            (x1 - x0 + cell_width - 1) // cell_width,
+            (y1 - y0 + cell_height - 1) // cell_height,
+        )
+
+    def query(self, rect):
+        """The indices of items overlapping a rectangle, last drawn first."""
+        x, y, w, h = rect
+        if w <= 0 or h <= 0:
+            return []
+        found = self.overlapping(x, y, x + w - 1, y + h - 1)
+        found.reverse()
+        return found
+
+
+class SpatialIndex:
+    """Item grids for the shapes of a surface, rebuilt when shapes change."""
+
+    def __init__(self, cell_size=32):
+        self.cell_size = cell_size
+        self._grids = {}
+        self.builds = 0
+
+    def grid(self, shape):
+        """The item grid of a shape, building it if needed."""
+        grid = self._grids.get(shape)
+        if grid is None:
+            grid = self._grids[shape] = ItemGrid(shape, self.cell_size)
+            self.builds += 1
+        return grid
+
+    def invalidate(self, shape):
+        """Forget the item grid of a shape which has changed."""
+        self._grids.pop(shape, None)
+
+    def clear(self):
+        """Forget all item grids."""
+        self._grids = {}
@@ -0,0 +1,151 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""This module defines the SpatialIndex, ItemGrid and CellGrid classes.
+
+These are internal classes used by Surfaces to find the shapes and items
+under a point for hit testing, without checking every item.  CellGrid is
+also used by WorldGeometry to find the rows under its viewport.
+"""
+
+from array import array
+
+from .shapes import Shape
+from .surface import rectangle
+
+
+class CellGrid:
+    """Item extents bucketed by the cells of a uniform grid which they overlap.
+
+    Each cell holds the indices of the items whose extents overlap it, with
+    the items of all cells stored one after another, so that a query only
+    checks the items in the cells it touches.  Extents are the minimum x,
+    minimum y, maximum x and maximum y of each item, inclusive, and may be
+    integers or floats.  Items whose maximum is less than their minimum are
+    empty and are never found.
+
+    Parameters
+    ----------
+    extents : array
+        The x0, y0, x1, y1 extents of each item one after another.
+    x : float
+        The left edge of the grid.
+    y : float
+        The top edge of the grid.
+    cell_width : float
+        The width of each cell.
+    cell_height : float
+        The height of each cell.
+    columns : int
+        The number of columns of cells.
+    rows : int
+        The number of rows of cells.
+
+    Attributes
+    ----------
+    n_items : int
+        The number of items.
+    candidates : int
+        The number of items checked by the last call to ``overlapping``.
+    """
+
+    extents: array
+    n_items: int
+    x: float
+    y: float
+    cell_width: float
+    cell_height: float
+    columns: int
+    rows: int
+    candidates: int
+
+    def __init__(
+        self,
+        extents: array,
+        x: float,
+        y: float,
+        cell_width: float,
+        cell_height: float,
+        columns: int,
+        rows: int,
+    ): ...
+
+    def cells(self, x0: float, y0: float, x1: float, y1: float) -> tuple[int, int, int, int]:
+        """The range of columns and rows which an extent overlaps.
+
+        Returns
+        -------
+        cells : tuple[int, int, int, int]
+            The first column, the column after the last, the first row and
+            the row after the last, clamped to the grid.
+        """
+
+    def overlapping(self, x0: float, y0: float, x1: float, y1: float) -> list[int]:
+        """The indices of items whose extents overlap an extent, in order."""
+
+
+class ItemGrid(CellGrid):
+    """The bounds of a shape's items, bucketed by the grid cells they overlap.
+
+    The grid covers the union of the item bounds, and each cell holds the
+    indices of the items whose bounds overlap it, so a query only checks
+    the items in the cells it touches.  Cells grow beyond the requested
+    size for shapes with large extents, so that a grid never has more than
+    64 columns or rows.
+
+    Parameters
+    ----------
+    shape : Shape
+        The shape whose ``_item_bounds`` are indexed.
+    cell_size : int
+        The smallest width and height of the grid cells.
+
+    Attributes
+    ----------
+    n_items : int
+        The number of items of the shape.
+    extents : array[int]
+        The first and last pixels covered by each item, as x0, y0, x1, y1.
+    """
+
+    n_items: int
+    extents: array[int]
+
+    def __init__(self, shape: Shape, cell_size: int = 32): ...
+
+    def query(self, rect: rectangle) -> list[int]:
+        """The indices of items overlapping a rectangle, last drawn first."""
+
+
+class SpatialIndex:
+    """Item grids for the shapes of a surface, rebuilt when shapes change.
+
+    Grids are built lazily when a shape is first queried, and forgotten
+    when the shape is updated, so shapes which change often but are rarely
+    hit tested cost little.
+
+    Parameters
+    ----------
+    cell_size : int
+        The smallest width and height of the grid cells.
+
+    Attributes
+    ----------
+    builds : int
+        The number of grids which have been built.
+    """
+
+    cell_size: int
+    builds: int
+
+    def __init__(self, cell_size: int = 32): ...
+
+    def grid(self, shape: Shape) -> ItemGrid:
+        """The item grid of a shape, building it if needed."""
+
+    def invalidate(self, shape: Shape) -> None:
+        """Forget the item grid of a shape which has changed."""
+
+    def clear(self) -> None:
+        """Forget all item grids."""
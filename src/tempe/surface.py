@@ -5,12 +5,16 @@
 import asyncio
 from array import array
 import framebuf
+from time import ticks_diff, ticks_us
 
 from .data_view import Repeat
 from .geometry import Geometry, RowGeometry
-from .raster import Raster
+from .layer_cache import LayerCache
+from .raster import RasterPool, _FORMAT_BITS, _stride
+from .spatial_index import SpatialIndex
+from .tile_hashes import TileHashes
 from .shapes import Circles, Ellipses, Polygons, PolyLines, RoundedRectangles, Rectangles, Lines, VLines, HLines
-from .util import contains
+from .util import ArrayBuffer, contains
 
 
 BACKGROUND = const("BACKGROUND")
@@ -21,81 +25,553 @@ OVERLAY = const("OVERLAY")
 
 LAYERS = const((BACKGROUND, UNDERLAY, IMAGE, DRAWING, OVERLAY))
 
+# the maximum number of opaque rectangles considered per raster
+_MAX_OCCLUDERS = const(8)
+
+
+def _luminance(color):
+    from .colors.convert import rgb565_to_rgb24
+
+    r, g, b = rgb565_to_rgb24(color)
+    return (299 * r + 587 * g + 114 * b) // 1000
+
 
 class Surface:
     """A space for drawing shapes."""
 
-    def __init__(self):
+    def __init__(self, format=framebuf.RGB565, palette=None):
         self.layers = {layer: [] for layer in LAYERS}
         self._damage = []
+        self._scrolls = []
+        self._priorities = []
         self.refresh_needed = asyncio.Event()
-        self.format = framebuf.RGB565
-        self.pixel_size = 2
+        if format not in _FORMAT_BITS:
+            raise ValueError(f"Unsupported framebuffer format {format}")
+        self.format = format
+        if format == framebuf.RGB565:
+            self.palette = None
+        else:
+            if palette is None and _FORMAT_BITS[format] == 1:
+                palette = (0x0000, 0xFFFF)
+            if palette is None:
+                raise ValueError("A palette is needed for indexed formats")
+            if len(palette) > (1 << _FORMAT_BITS[format]):
+                raise ValueError("Palette has too many colors for the format")
+            if _FORMAT_BITS[format] == 1 and len(palette) != 2:
+                raise ValueError("1-bit formats need a palette of 2 colors")
+            from .colors import normalize_color
+
+            self.palette = array("H", [normalize_color(color) for color in palette])
+            self._palette_colors = len(palette)
+            # pad to every index the format can hold, so that stray indices
+            # are never looked up past the end of the palette
+            self.palette.extend(
+                array("H", bytearray(2 * ((1 << _FORMAT_BITS[format]) - len(palette))))
+            )
+        #: luminance at or above which colors map to the lighter 1-bit entry
+        self.threshold = 128
+        self._raster_pool = RasterPool()
+        self._margins = ArrayBuffer("H")
+        self._direct_margins = ArrayBuffer("H")
+        self._layer_cache = None
+        self._uncached_layers = LAYERS
+        self._tile_hashes = None
+        self._occluders = array("h", bytearray(8 * _MAX_OCCLUDERS))
+        self._culled = bytearray()
+        self.culled_draws = 0
+        self.solid_fills = 0
+        self.worst_stall_us = 0
+        self._refreshing = None
+        # shapes drawn by refreshes, which may be a snapshot of the layers
+        self._render_layers = self.layers
+        # layer cache invalidations waiting for the rendering thread
+        self._invalidated = None
+        self.threaded = False
+        self._spatial_index = None
+
+    def enable_layer_cache(self, width, height, layers=(BACKGROUND, UNDERLAY), budget=None):
+        """Keep a rendered copy of the back layers to draw strips from."""
+        if tuple(layers) != LAYERS[: len(layers)]:
+            raise ValueError(f"Cached layers must be the back layers, not {layers}")
+        self._layer_cache = LayerCache(
+            tuple(layers), width, height, budget, format=self.format
+        )
+        self._uncached_layers = LAYERS[len(layers) :]
+
+    def enable_tile_hashes(self, width, height, tile_width=16, tile_height=8):
+        """Skip blitting tiles whose pixels are unchanged since the last blit."""
+        if _FORMAT_BITS[self.format] < 8:
+            raise ValueError("Tile hashes need a format with whole bytes per pixel")
+        self._tile_hashes = TileHashes(width, height, tile_width, tile_height)
+
+    def disable_tile_hashes(self):
+        """Always blit damaged regions, and free the tile hashes."""
+        self._tile_hashes = None
+
+    def disable_layer_cache(self):
+        """Stop caching the back layers and free the cache memory."""
+        self._layer_cache = None
+        self._uncached_layers = LAYERS
+
+    def enable_hit_testing(self, cell_size=32):
+        """Index the bounds of shapes' items in grids of the given cell size."""
+        self._spatial_index = SpatialIndex(cell_size)
+
+    def disable_hit_testing(self):
+        """Free the spatial index used for hit testing."""
+        self._spatial_index = None
+
+    def hit_test(self, x, y, items=False):
+        """Find the shapes under a point, topmost first."""
+        return self.query((x, y, 1, 1), items)
+
+    def query(self, rect, items=False):
+        """Find the shapes overlapping a rectangle, topmost first."""
+        index = self._spatial_index
+        if index is None:
+            index = self._spatial_index = SpatialIndex()
+        x, y, w, h = rect
+        x1 = x + w
+        y1 = y + h
+        found = []
+        for k in range(len(LAYERS) - 1, -1, -1):
+            shapes = self.layers[LAYERS[k]]
+            for i in range(len(shapes) - 1, -1, -1):
+                shape = shapes[i]
+                extent = shape.clip
+                if extent is None:
+                    extent = shape._bounds
+                    if extent is None:
+                        continue
+                x0 = max(extent[0], x)
+                y0 = max(extent[1], y)
+                w0 = min(extent[0] + extent[2], x1) - x0
+                h0 = min(extent[1] + extent[3], y1) - y0
+                if w0 <= 0 or h0 <= 0:
+                    continue
+                grid = index.grid(shape)
+                if grid.n_items == 0:
+                    # the shape as a whole
+                    found.append((shape, None) if items else shape)
+                    continue
+                hits = grid.query((x0, y0, w0, h0))
+                if not hits:
+                    continue
+                if items:
+                    for item in hits:
+                        found.append((shape, item))
+                else:
+                    found.append(shape)
+        return found
 
     def draw(self, raster):
         """Draw into a raster."""
-        for layer in LAYERS:
-            for object in self.layers[layer]:
+        cache = self._layer_cache
+        if cache is not None:
+            if cache.is_valid(raster.x, raster.y, raster.w, raster.h):
+                cache.load(raster)
+            else:
+                self._draw_layers(raster, cache.layers)
+                if raster.clip_rect is None:
+                    # widened rasters hold display pixels outside the clip
+                    cache.store(raster)
+        self._draw_layers(raster, self._uncached_layers)
+
+    def _draw_layers(self, raster, layers):
+        pool = self._raster_pool
+        culled = self._occluded(raster, layers)
+        index = -1
+        for layer in layers:
+            for object in self._render_layers[layer]:
+                index += 1
+                if culled is not None and culled[index]:
+                    self.culled_draws += 1
+                    continue
                 if object.clip is None:
                     clip = raster
                 else:
-                    clip = raster.clip(*object.clip)
+                    x, y, w, h = object.clip
+                    clip = pool.clip(raster, x, y, w, h)
                     if clip is None:
                         continue
+                    if clip.clip_rect is not None:
+                        # clip was widened to a byte boundary
+                        margins = self._margins.get(clip.margin_size())
+                        clip.save_margins(margins)
+                        object.draw_raster(clip)
+                        clip.restore_margins(margins)
+                        continue
                 object.draw_raster(clip)
 
+    def _occluded(self, raster, layers):
+        """Find shapes hidden under later opaque shapes within the raster.
+
+        Returns None if no shapes are hidden, otherwise a bytearray with a
+        non-zero entry for each hidden shape in drawing order.
+        """
+        rx0 = raster.x
+        ry0 = raster.y
+        rx1 = rx0 + raster.w
+        ry1 = ry0 + raster.h
+        occluders = self._occluders
+        n = 0
+        culled = None
+        total = 0
+        for layer in layers:
+            total += len(self._render_layers[layer])
+
+        # walk backwards so that occluders are always later than the shape
+        index = total
+        for k in range(len(layers) - 1, -1, -1):
+            shapes = self._render_layers[layers[k]]
+            for i in range(len(shapes) - 1, -1, -1):
+                index -= 1
+                shape = shapes[i]
+                if n and self._is_occluded(shape, n, rx0, ry0, rx1, ry1):
+                    if culled is None:
+                        culled = self._culled
+                        if len(culled) < total:
+                            culled = self._culled = bytearray(total)
+                        else:
+                            for j in range(total):
+                                culled[j] = 0
+                    culled[index] = 1
+                    continue
+                opaque = shape._opaque
+                if opaque is not None and n < _MAX_OCCLUDERS:
+                    x0 = max(opaque[0], rx0)
+                    y0 = max(opaque[1], ry0)
+                    x1 = min(opaque[0] + opaque[2], rx1)
+                    y1 = min(opaque[1] + opaque[3], ry1)
+                    if x0 < x1 and y0 < y1:
+                        j = 4 * n
+                        occluders[j] = x0
+                        occluders[j + 1] = y0
+                        occluders[j + 2] = x1
+                        occluders[j + 3] = y1
+                        n += 1
+        return culled
+
+    def _solid_color(self, x, y, w, h, below=None, layers=None):
+        """The color of a solid rectangle which is all that shows in a region.
+
+        Returns -1 unless the topmost shape which overlaps the region is a
+        filled rectangle covering all of it.  If a shape is given for below,
+        only the shapes drawn before it are considered.
+        """
+        if layers is None:
+            layers = self.layers
+        x1 = x + w
+        y1 = y + h
+        for k in range(len(LAYERS) - 1, -1, -1):
+            shapes = layers[LAYERS[k]]
+            for i in range(len(shapes) - 1, -1, -1):
+                shape = shapes[i]
+                if below is not None:
+                    if shape is below:
+                        below = None
+                    continue
+                opaque = shape._opaque
+                if opaque is not None and isinstance(shape, Rectangles):
+                    if (
+                        opaque[0] <= x
+                        and opaque[1] <= y
+                        and opaque[0] + opaque[2] >= x1
+                        and opaque[1] + opaque[3] >= y1
+                    ):
+                        for rect, color in shape:
+                            return color
+                extent = shape.clip
+                if extent is None:
+                    extent = shape._bounds
+                    if extent is None:
+                        return -1
+                if (
+                    extent[0] < x1
+                    and extent[1] < y1
+                    and extent[0] + extent[2] > x
+                    and extent[1] + extent[3] > y
+                ):
+                    return -1
+        return -1
+
+    def _is_occluded(self, shape, n, rx0, ry0, rx1, ry1):
+        extent = shape.clip
+        if extent is None:
+            extent = shape._bounds
+            if extent is None:
+                return False
+        x0 = max(extent[0], rx0)
+        y0 = max(extent[1], ry0)
+        x1 = min(extent[0] + extent[2], rx1)
+        y1 = min(extent[1] + extent[3], ry1)
+        if x0 >= x1 or y0 >= y1:
+            # nothing to draw in the raster anyway
+            return False
+        occluders = self._occluders
+        for j in range(0, 4 * n, 4):
+            if (
+                occluders[j] <= x0
+                and occluders[j + 1] <= y0
+                and occluders[j + 2] >= x1
+                and occluders[j + 3] >= y1
+            ):
+                return True
+        return False
+
     def refresh(self, display, working_buffer):
         """Refresh the surface on the display."""
-        w_d, h_d = display.size
+        self._apply_scrolls(display)
+        self._sort_damage()
         for rect in self._damage:
-            x_r, y_r, w_r, h_r = rect
-            x = max(x_r, 0)
-            w = min(x_r + w_r, w_d) - x
-            y = max(y_r, 0)
-            h = min(y_r + h_r, h_d) - y
-            if w == 0 or h == 0:
-                continue
-
-            # handle buffer too small
-            buffer_rows = (len(working_buffer) // (w * self.pixel_size)) - 1
-            for start_row in range(0, h, buffer_rows):
-                raster_rows = min(buffer_rows, h - start_row)
-                raster = Raster(working_buffer, x, y + start_row, w, raster_rows)
-                self.draw(raster)
-                display.blit(working_buffer, x, y + start_row, w, raster_rows)
+            self._refresh_rect(display, working_buffer, rect)
         self._damage = []
         self.refresh_needed.clear()
 
-    async def arefresh(self, display, working_buffer):
+    async def arefresh(self, display, working_buffer, budget=None):
         """Refresh the surface on the display."""
-        w_d, h_d = display.size
         while True:
+            self._apply_scrolls(display)
+            self._sort_damage()
+            resumed = ticks_us()
             while self._damage:
                 rect = self._damage.pop(0)
-                x_r, y_r, w_r, h_r = rect
-                x = max(x_r, 0)
-                w = min(x_r + w_r, w_d) - x
-                y = max(y_r, 0)
-                h = min(y_r + h_r, h_d) - y
-                if w == 0 or h == 0:
-                    continue
-
-                # handle buffer too small
-                buffer_rows = (len(working_buffer) // (w * self.pixel_size)) - 1
-                for start_row in range(0, h, buffer_rows):
-                    raster_rows = min(buffer_rows, h - start_row)
-                    raster = Raster(working_buffer, x, y + start_row, w, raster_rows)
-                    self.draw(raster)
-                    display.blit(working_buffer, x, y + start_row, w, raster_rows)
-                await asyncio.sleep(0)  # note: self._damage may be modified here
+                self._refreshing = [rect]
+                for _ in self._refresh_steps(display, working_buffer, rect):
+                    if budget is not None and ticks_diff(ticks_us(), resumed) >= budget:
+                        # out of time, so let other tasks run between strips
+                        resumed = await self._pause(resumed)
+                self._refreshing = None
+                resumed = await self._pause(resumed)  # note: self._damage may be modified here
+                self._apply_scrolls(display)
+                self._sort_damage()
             self.refresh_needed.clear()
             await self.refresh_needed.wait()
 
-    def damage(self, rect):
+    async def _pause(self, resumed):
+        """Yield to the event loop, recording how long it was blocked."""
+        stall = ticks_diff(ticks_us(), resumed)
+        if stall > self.worst_stall_us:
+            self.worst_stall_us = stall
+        await asyncio.sleep(0)
+        return ticks_us()
+
+    def _take_frame(self):
+        """Take the pending damage and a snapshot of the layers to render.
+
+        This is called on the thread which updates shapes, and the frame is
+        rendered by ``_render_frame``, possibly on another thread.
+        """
+        self._sort_damage()
+        damage = self._damage
+        frame = (
+            damage,
+            self._scrolls,
+            self._invalidated,
+            {layer: tuple(shapes) for layer, shapes in self.layers.items()},
+        )
+        self._refreshing = damage
+        self._damage = []
+        self._scrolls = []
+        if self._invalidated is not None:
+            self._invalidated = []
+        self.refresh_needed.clear()
+        return frame
+
+    def _render_frame(self, display, working_buffer, frame):
+        """Render a frame from ``_take_frame`` without touching pending damage."""
+        damage, scrolls, invalidated, layers = frame
+        cache = self._layer_cache
+        if cache is not None and invalidated:
+            for rect in invalidated:
+                cache.invalidate(rect)
+        for rect, dx, dy, layer in scrolls:
+            if self._tile_hashes is not None:
+                self._tile_hashes.invalidate(rect)
+            if not display.scroll(rect, dx, dy):
+                # a new list, as the other thread may be reading the old one
+                damage = damage + [rect]
+                self._refreshing = damage
+        self._render_layers = layers
+        try:
+            for rect in damage:
+                self._refresh_rect(display, working_buffer, rect)
+        finally:
+            self._render_layers = self.layers
+            self._refreshing = None
+
+    def _sort_damage(self):
+        """Move damage overlapping higher priority regions to the front."""
+        priorities = self._priorities
+        if not priorities:
+            return
+        ranked = []
+        for index, rect in enumerate(self._damage):
+            x0, y0, w, h = rect
+            rank = 0
+            for priority, region in priorities:
+                if (
+                    priority > rank
+                    and region[0] < x0 + w
+                    and region[1] < y0 + h
+                    and region[0] + region[2] > x0
+                    and region[1] + region[3] > y0
+                ):
+                    rank = priority
+            # the index keeps equal priorities in order
+            ranked.append((-rank, index, rect))
+        ranked.sort()
+        self._damage = [rect for rank, index, rect in ranked]
+        self._priorities = []
+
+    def _apply_scrolls(self, display):
+        """Shift pixels on the display for pending scrolls, or redraw them."""
+        scrolls = self._scrolls
+        while scrolls:
+            rect, dx, dy, layer = scrolls.pop(0)
+            if self._tile_hashes is not None:
+                self._tile_hashes.invalidate(rect)
+            if not display.scroll(rect, dx, dy):
+                self.damage(rect, layer)
+
+    def _refresh_rect(self, display, working_buffer, rect):
+        for _ in self._refresh_steps(display, working_buffer, rect):
+            pass
+
+    def _refresh_steps(self, display, working_buffer, rect):
+        """Refresh a rectangle, yielding after each strip is sent."""
+        w_d, h_d = display.size
+        x_r, y_r, w_r, h_r = rect
+        x = max(x_r, 0)
+        w = min(x_r + w_r, w_d) - x
+        y = max(y_r, 0)
+        h = min(y_r + h_r, h_d) - y
+        if w <= 0 or h <= 0:
+            return
+
+        if working_buffer is None:
+            self._draw_direct(display, x, y, w, h)
+            display.flush(x, y, w, h)
+            return
+
+        hashes = self._tile_hashes
+        if display.format == framebuf.RGB565:
+            color = self._solid_color(x, y, w, h, layers=self._render_layers)
+            if color >= 0:
+                # no need to render pixels for a region of one color
+                if self.palette is not None:
+                    color = self.palette[color]
+                display.fill(x, y, w, h, color)
+                self.solid_fills += 1
+                if hashes is not None:
+                    hashes.invalidate((x, y, w, h))
+                return
+
+        if hashes is not None:
+            # strips must cover whole tiles so hashes are comparable
+            x, y, w, h = hashes.snap(x, y, w, h)
+
+        if self.format == framebuf.MONO_VLSB:
+            # damage must cover whole 8-row pages, as each byte is a column
+            y_end = min((y + h + 7) & ~7, h_d)
+            y &= ~7
+            h = y_end - y
+
+        # handle buffer too small
+        stride = _stride(w, self.format)
+        if self.format == framebuf.MONO_VLSB:
+            # whole 8-row pages, so strips line up with display pages
+            buffer_rows = len(working_buffer) // stride * 8
+        else:
+            buffer_rows = (8 * len(working_buffer) // (stride * _FORMAT_BITS[self.format])) - 1
+        if hashes is not None:
+            buffer_rows -= buffer_rows % hashes.tile_height
+            if buffer_rows <= 0:
+                raise ValueError("Working buffer too small for a row of tiles")
+        for start_row in range(0, h, buffer_rows):
+            raster_rows = min(buffer_rows, h - start_row)
+            raster = self._raster_pool.raster(
+                working_buffer, x, y + start_row, w, raster_rows, stride, 0, self.format
+            )
+            self.draw(raster)
+            if hashes is not None:
+                self._blit_changed(display, raster, hashes)
+            else:
+                self._blit_region(display, raster, 0, x, y + start_row, w, raster_rows)
+            yield
+
+    def _blit_changed(self, display, raster, hashes):
+        """Blit only the runs of tiles which differ from the last blit."""
+        tile_width = hashes.tile_width
+        tile_height = hashes.tile_height
+        changed = hashes.changed
+        n_tiles = (raster.w + tile_width - 1) // tile_width
+        y_end = raster.y + raster.h
+        for y in range(raster.y, y_end, tile_height):
+            h = min(tile_height, y_end - y)
+            n_changed = hashes.compare(raster, y, h)
+            if n_changed == n_tiles:
+                self._blit_region(display, raster, 0, raster.x, y, raster.w, h)
+                continue
+            i = 0
+            while i < n_tiles:
+                if not changed[i]:
+                    i += 1
+                    continue
+                start = i
+                while i < n_tiles and changed[i]:
+                    i += 1
+                x = raster.x + start * tile_width
+                w = min(i * tile_width, raster.w) - start * tile_width
+                self._blit_region(display, raster, x - raster.x, x, y, w, h)
+
+    def _blit_region(self, display, raster, dx, x, y, w, h):
+        """Blit part of a raster which starts dx pixels along its first row."""
+        stride = raster.stride
+        offset = raster.offset + (y - raster.y) * stride + dx
+        buffer = raster.buf
+        if self.palette is not None and display.format != self.format:
+            if offset:
+                buffer = memoryview(buffer)[offset * raster.bits // 8 :]
+            display.blit_palette(
+                buffer, x, y, w, h, stride, self.format, self.palette
+            )
+        else:
+            if offset:
+                buffer = memoryview(buffer)[offset * raster.bits // 8 :]
+            if stride == _stride(w, self.format) or h == 1:
+                display.blit(buffer, x, y, w, h)
+            else:
+                # the region isn't contiguous, so the display steps over rows
+                display.blit(buffer, x, y, w, h, stride)
+
+    def _draw_direct(self, display, x, y, w, h):
+        """Draw straight into a view of the display's own buffer."""
+        target = display.raster
+        if target is None:
+            raise ValueError("Display does not expose a buffer to draw into")
+        if target.format != self.format:
+            raise ValueError("Display buffer format does not match the surface")
+        raster = self._raster_pool.clip(target, x, y, w, h)
+        if raster.clip_rect is not None:
+            # clip was widened to a byte boundary
+            margins = self._direct_margins.get(raster.margin_size())
+            raster.save_margins(margins)
+            self.draw(raster)
+            raster.restore_margins(margins)
+        else:
+            self.draw(raster)
+
+    def damage(self, rect, layer=None, priority=0):
         """Mark a rectangle as needing to be refreshed."""
         if rect[2] == 0 or rect[3] == 0:
             # degenerate rectangle, no damage
             return
+        if priority:
+            self._priorities.append((priority, rect))
+        cache = self._layer_cache
+        if cache is not None and (layer is None or layer in cache.layers):
+            self._invalidate_cache(cache, rect)
         if not any(contains(rect, rect2) for rect2 in self._damage):
             self._damage = [
                 rect2 for rect2 in self._damage if not contains(rect2, rect)
@@ -103,14 +579,106 @@ class Surface:
             self._damage.append(rect)
             self.refresh_needed.set()
 
+    def scroll(self, shape, dx, dy):
+        """Shift a clipped shape's pixels on the display instead of redrawing them."""
+        rect = shape.clip
+        layer = shape.layer
+        x, y, w, h = rect
+        if dx == 0 and dy == 0:
+            return
+        overlaps = None
+        if abs(dx) < w and abs(dy) < h:
+            overlaps = self._scroll_overlaps(shape, rect)
+        if overlaps is None:
+            self.damage(rect, layer)
+            return
+
+        # pixels still waiting to be redrawn move with the scroll
+        refreshing = self._refreshing
+        if refreshing is not None:
+            # partly refreshed, possibly with the old positions
+            for partial in refreshing:
+                self.damage(partial)
+        for pending in self._damage[:]:
+            self._damage_shifted(pending, rect, dx, dy)
+        # shapes drawn over the scrolled shape are redrawn where they were
+        for other, extent in overlaps:
+            self.damage(extent, other.layer)
+            self._damage_shifted(extent, rect, dx, dy, other.layer)
+        cache = self._layer_cache
+        if cache is not None and layer in cache.layers:
+            self._invalidate_cache(cache, rect)
+        self._scrolls.append((rect, dx, dy, layer))
+
+        # bands uncovered by the shift
+        if dy > 0:
+            self.damage((x, y, w, dy), layer)
+        elif dy < 0:
+            self.damage((x, y + h + dy, w, -dy), layer)
+        if dx > 0:
+            self.damage((x, y, dx, h), layer)
+        elif dx < 0:
+            self.damage((x + w + dx, y, -dx, h), layer)
+        self.refresh_needed.set()
+
+    def _invalidate_cache(self, cache, rect):
+        if self._invalidated is not None:
+            # the rendering thread may be using the cache
+            self._invalidated.append(rect)
+        else:
+            cache.invalidate(rect)
+
+    def _scroll_overlaps(self, shape, rect):
+        """Shapes drawn over a shape within a rectangle, with their extents.
+
+        Returns None if the shape can't be scrolled by shifting pixels: if a
+        shape with unknown extent is drawn over it, or if what shows through
+        it isn't a single solid color, as that wouldn't move with it.
+        """
+        x, y, w, h = rect
+        overlaps = []
+        for k in range(len(LAYERS) - 1, -1, -1):
+            shapes = self.layers[LAYERS[k]]
+            for i in range(len(shapes) - 1, -1, -1):
+                other = shapes[i]
+                if other is shape:
+                    if self._solid_color(x, y, w, h, shape) < 0:
+                        return None
+                    return overlaps
+                extent = other.clip
+                if extent is None:
+                    extent = other._bounds
+                    if extent is None:
+                        return None
+                if (
+                    extent[0] < x + w
+                    and extent[1] < y + h
+                    and extent[0] + extent[2] > x
+                    and extent[1] + extent[3] > y
+                ):
+                    overlaps.append((other, extent))
+        return None
+
+    def _damage_shifted(self, extent, rect, dx, dy, layer=None):
+        """Damage an extent moved by a scroll, within the scrolled rectangle."""
+        x0 = max(extent[0] + dx, rect[0])
+        y0 = max(extent[1] + dy, rect[1])
+        x1 = min(extent[0] + extent[2] + dx, rect[0] + rect[2])
+        y1 = min(extent[1] + extent[3] + dy, rect[1] + rect[3])
+        if x0 < x1 and y0 < y1:
+            self.damage((x0, y0, x1 - x0, y1 - y0), layer)
+
     def clear(self, layer):
         """Clear all shapes from a layer."""
         for shape in self.layers[layer]:
             if shape.clip is not None:
-                self.damage(shape.clip)
+                self.damage(shape.clip, layer)
             elif shape._bounds is not None:
-                self.damage(shape._bounds)
+                self.damage(shape._bounds, layer)
+            if self._spatial_index is not None:
+                self._spatial_index.invalidate(shape)
             shape.surface = None
+            shape.layer = None
         self.layers[layer] = []
 
     def add_shape(self, layer, shape):
@@ -119,6 +687,7 @@ class Surface:
             shape.surface = self
         elif shape.surface is not self:
             raise RuntimeError("Shape {shape} is already on a surface: {shape.surface}")
+        shape.layer = layer
         self.layers[layer].append(shape)
         shape.update()
 
@@ -127,22 +696,23 @@ class Surface:
         self.layers[layer].remove(shape)
         shape.update()
         if shape.clip is not None:
-            self.damage(shape.clip)
+            self.damage(shape.clip, layer)
         elif shape._bounds is not None:
-            self.damage(shape._bounds)
+            self.damage(shape._bounds, layer)
         shape.surface = None
+        shape.layer = None
 
-    def polygons(self, layer, geometry, colors, fill=True, clip=None):
+    def polygons(self, layer, geometry, colors, fill=True, clip=None, tolerance=None):
         geometry = self._check_geometry(geometry, None)
         colors = self._check_colors(colors)
-        shape = Polygons(geometry, colors, fill=fill, clip=clip)
+        shape = Polygons(geometry, colors, fill=fill, tolerance=tolerance, clip=clip)
         self.add_shape(layer, shape)
         return shape
 
-    def poly_lines(self, layer, geometry, colors, clip=None):
+    def poly_lines(self, layer, geometry, colors, clip=None, tolerance=None):
         geometry = self._check_geometry(geometry, None)
         colors = self._check_colors(colors)
-        shape = PolyLines(geometry, colors, clip=clip)
+        shape = PolyLines(geometry, colors, tolerance=tolerance, clip=clip)
         self.add_shape(layer, shape)
         return shape
 
@@ -256,6 +826,19 @@ class Surface:
             self.add_shape(layer, bitmaps)
             return bitmaps
 
+    def heatmap(
+        self, layer, rect, values, width, height, colormap, value_range=(0, 255), clip=None
+    ):
+        from .heatmap import Heatmap
+
+        if self.palette is not None:
+            colormap = self._palette_colormap(colormap)
+        heatmap = Heatmap(
+            rect, values, width, height, colormap, value_range, clip=clip
+        )
+        self.add_shape(layer, heatmap)
+        return heatmap
+
     def _check_geometry(self, geometry, coords):
         if isinstance(geometry, array) or (
             isinstance(geometry, (tuple, list))
@@ -275,12 +858,69 @@ class Surface:
 
     def _check_colors(self, colors):
         if isinstance(colors, (str, int, tuple)):
+            if self.palette is not None:
+                # integers are already palette indices
+                if isinstance(colors, int):
+                    return Repeat(colors)
+                return Repeat(self.palette_index(colors))
             from .colors import normalize_color
 
             return Repeat(normalize_color(colors))
+        elif self.palette is not None and isinstance(colors, (list, array)):
+            # check indices and map other colors, so that raw RGB565 values
+            # aren't silently drawn as stray indices
+            n_colors = self._palette_colors
+            indices = []
+            mapped = False
+            for color in colors:
+                if not isinstance(color, int):
+                    color = self.palette_index(color)
+                    mapped = True
+                elif not 0 <= color < n_colors:
+                    raise ValueError(
+                        f"Color {color} is not an index into a palette of {n_colors} colors"
+                    )
+                indices.append(color)
+            if mapped:
+                return indices
+            # keep the caller's sequence, so changes to it are still drawn
+            return colors
         else:
             return colors
 
+    def palette_index(self, color):
+        """Find the index of the palette entry closest to a color."""
+        from .colors import normalize_color
+        from .colors.convert import rgb565_to_rgb24
+
+        color = normalize_color(color)
+        palette = self.palette
+        n_colors = self._palette_colors
+        for i in range(n_colors):
+            if palette[i] == color:
+                return i
+        if _FORMAT_BITS[self.format] == 1:
+            # threshold on luminance rather than nearest color
+            lighter = int(_luminance(palette[1]) > _luminance(palette[0]))
+            if _luminance(color) >= self.threshold:
+                return lighter
+            else:
+                return 1 - lighter
+        r, g, b = rgb565_to_rgb24(color)
+        best = 0
+        best_distance = 0x7FFFFFFF
+        for i in range(n_colors):
+            r1, g1, b1 = rgb565_to_rgb24(palette[i])
+            distance = (r - r1) ** 2 + (g - g1) ** 2 + (b - b1) ** 2
+            if distance < best_distance:
+                best = i
+                best_distance = distance
+        return best
+
+    def _palette_colormap(self, colormap):
+        """Map the RGB565 colors of a colormap to palette indices."""
+        return array("H", [self.palette_index(color) for color in colormap])
+
     def _check_sizes(self, sizes):
         if isinstance(sizes, int):
             return Repeat(sizes)
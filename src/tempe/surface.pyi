@@ -33,7 +33,9 @@ import tempe
 from .display import Display
 from .font import AbstractFont
 from .geometry import Geometry
+from .layer_cache import LayerCache
 from .raster import Raster
+from .tile_hashes import TileHashes
 from .shapes import (
     Shape,
     Polygons,
@@ -48,6 +50,7 @@ from .shapes import (
 )
 from .markers import Marker, Markers, Points
 from .bitmaps import Bitmaps, ColoredBitmaps
+from .heatmap import Heatmap
 from .text import Text, HALIGN, VALIGN, LEFT, TOP
 from .util import contains
 from .colors import color, rgb565
@@ -78,8 +81,52 @@ class Surface:
     Actual drawing is carried out by the ``draw`` method, but most users of
     Surface objects should call ``refresh``, which handles managing damaged
     regions and clipping to minimise the actual work that's needed.
+
+    By default Surfaces render RGB565 pixels, but they can instead render
+    palette-indexed GS8 or GS4_HMSB pixels, which lets the same working
+    buffer hold two or four times as many rows.  Palette indices are
+    expanded to RGB565 by the Display when blitting, so changing palette
+    entries does not require re-rendering.  When using a palette, integer
+    colors given to shapes are palette indices, while other color values
+    are mapped to the closest palette entry.  Lists and arrays of colors
+    are checked, so that integers which aren't indices, such as RGB565
+    colors, raise a ValueError.  Bitmaps must also be in the Surface's
+    format.
+
+    Surfaces can also render 1-bit MONO_VLSB, MONO_HLSB or MONO_HMSB
+    pixels for monochrome panels.  The palette defaults to black and
+    white, and colors are resolved by thresholding their luminance against
+    ``threshold``.  If the Display has the same ``format`` as the Surface,
+    the packed pixels are blitted directly, so a 128x64 MONO_VLSB frame
+    can be rendered from a 1 KB working buffer in a single blit.
+
+    Parameters
+    ----------
+    format : int
+        The framebuf format to render in: RGB565, GS8, GS4_HMSB, MONO_VLSB,
+        MONO_HLSB or MONO_HMSB.
+    palette : Sequence[color] | None
+        The colors for each palette index.  This is required for GS8 and
+        GS4_HMSB, and must have 2 entries for 1-bit formats.
+
+    Raises
+    ------
+    ValueError
+        If the format is not supported, or the palette is missing or too
+        large for the format.
     """
 
+    #: The framebuf format that the surface renders in.
+    format: int
+
+    #: The RGB565 colors of each palette index, or None for RGB565 surfaces.
+    #: This is padded with black to every index the format can hold.
+    palette: array[int] | None
+
+    #: The luminance from 0 to 255 at or above which colors are mapped to
+    #: the lighter entry of a 1-bit palette.
+    threshold: int
+
     #: An Event that is set when the surface is damaged, and cleared
     #: at the end of a ``refresh`` call.
     refresh_needed: asyncio.Event
@@ -87,11 +134,46 @@ class Surface:
     #: The layers and the shapes they contain.
     layers: dict[str, list[Shape]]
 
+    #: The number of shape draws skipped because the shape was completely
+    #: hidden under a later opaque shape.
+    culled_draws: int
+
+    #: The number of damaged regions sent to ``Display.fill`` because they
+    #: were entirely covered by a single filled rectangle.
+    solid_fills: int
+
+    #: The longest time in microseconds that ``arefresh`` has run without
+    #: yielding to the event loop.
+    worst_stall_us: int
+
+    #: Whether a ThreadedRenderer is drawing the surface on another thread.
+    #: While this is set, shape data must be replaced rather than changed
+    #: in place, as the rendering thread may be reading it.
+    threaded: bool
+
     # Internal attributes
     _damage: list[rectangle]
+    _layer_cache: LayerCache | None
+    _tile_hashes: TileHashes | None
+
+    def __init__(
+        self, format: int = framebuf.RGB565, palette: Sequence[color] | None = None
+    ): ...
+
+    def palette_index(self, color: color) -> int:
+        """Find the index of the palette entry closest to a color.
+
+        This is only available for Surfaces with a palette.  For 1-bit
+        formats the color's luminance is compared with ``threshold``
+        instead.
 
-    def __init__(self): ...
-    def refresh(self, display: Display, working_buffer: bytearray) -> None:
+        Parameters
+        ----------
+        color : color
+            The color to find, in any form understood by ``normalize_color``.
+        """
+
+    def refresh(self, display: Display, working_buffer: bytearray | None) -> None:
         """Refresh the surface's appearance in the display.
 
         Calling this updates all damaged regions on the display device.
@@ -100,13 +182,205 @@ class Surface:
         rendering.  The larger this memory is (up to the size of the
         display), the faster the display will be updated.
 
+        If the working buffer is None, each damaged region is instead drawn
+        straight into the display's ``raster`` and then the display's
+        ``flush`` method is called for it.
+
+        Any scrolls requested by ``scroll`` are sent to the display before
+        damaged regions are drawn.
+
         Parameters
         ----------
         display : Display
             The actual physical display that the surface will be drawn on.
-        working_buffer : bytearray
+        working_buffer : bytearray | None
             An empty bytearray that the Surface will use as memory for temporary
-            drawing buffers.
+            drawing buffers, or None to draw directly into the display.
+
+        Raises
+        ------
+        ValueError
+            If drawing directly and the display has no raster or its format
+            does not match the surface.
+        """
+
+    async def arefresh(
+        self,
+        display: Display,
+        working_buffer: bytearray | None,
+        budget: int | None = None,
+    ) -> None:
+        """Refresh the surface's appearance in the display whenever it changes.
+
+        This runs forever, refreshing damaged regions as for ``refresh``
+        and then waiting for the ``refresh_needed`` event.  It yields to
+        the event loop after each damaged region, and if a budget is given,
+        also between the strips of a region whenever that much time has
+        passed since it last yielded.  Smaller working buffers give shorter
+        strips, and so finer time slices.
+
+        Shapes may be changed while a region is partly refreshed.  Their
+        damage is refreshed afterwards, so the display ends up consistent.
+
+        The longest time between yields is recorded in ``worst_stall_us``.
+
+        To render on a second thread or core instead, use a
+        ``tempe.renderer.ThreadedRenderer``.
+
+        Parameters
+        ----------
+        display : Display
+            The actual physical display that the surface will be drawn on.
+        working_buffer : bytearray | None
+            An empty bytearray that the Surface will use as memory for temporary
+            drawing buffers, or None to draw directly into the display.
+        budget : int | None
+            The number of microseconds to run for before yielding, or None
+            to only yield between damaged regions.
+        """
+
+    def enable_layer_cache(
+        self,
+        width: int,
+        height: int,
+        layers: Sequence[str] = (BACKGROUND, UNDERLAY),
+        budget: int | None = None,
+    ) -> None:
+        """Keep a rendered copy of the back layers to draw strips from.
+
+        Shapes in the cached layers are only re-drawn when they are damaged;
+        otherwise each strip starts by copying pixels from the cache and
+        only the remaining layers are drawn.  This is worthwhile when the
+        back layers hold many shapes which rarely change, such as component
+        backgrounds, grids and axes.
+
+        Parameters
+        ----------
+        width : int
+            The width of the region to cache, usually the display width.
+        height : int
+            The height of the region to cache, usually the display height.
+        layers : Sequence[str]
+            The layers to cache.  These must be the first layers of the
+            surface, since other layers are drawn on top of the cache.
+        budget : int | None
+            The maximum number of bytes to use for the cache.  If the full
+            region does not fit, only as many rows as fit are cached.
+
+        Raises
+        ------
+        ValueError
+            If the layers are not the back layers, or the budget is too
+            small to cache a single row.
+        """
+
+    def disable_layer_cache(self) -> None:
+        """Stop caching the back layers and free the cache memory."""
+
+    def enable_tile_hashes(
+        self, width: int, height: int, tile_width: int = 16, tile_height: int = 8
+    ) -> None:
+        """Skip blitting tiles whose pixels are unchanged since the last blit.
+
+        Damaged regions often re-render to the same pixels, such as when a
+        label is updated with the same text, and sending them to the
+        display again wastes bus bandwidth.  With tile hashes enabled,
+        damaged regions are expanded to whole tiles, each rendered tile is
+        hashed and compared with the hash from the last time it was sent,
+        and only runs of changed tiles are blitted.  The ``hits`` and
+        ``misses`` counts of the ``TileHashes`` object record how many
+        tiles were skipped and sent.
+
+        This is only used when refreshing with a working buffer.
+
+        Parameters
+        ----------
+        width : int
+            The width of the display.
+        height : int
+            The height of the display.
+        tile_width : int
+            The width of each tile.
+        tile_height : int
+            The height of each tile.  The working buffer must hold at least
+            this many rows of the damaged regions.
+
+        Raises
+        ------
+        ValueError
+            If the surface has fewer than 8 bits per pixel.
+        """
+
+    def disable_tile_hashes(self) -> None:
+        """Always blit damaged regions, and free the tile hashes."""
+
+    def enable_hit_testing(self, cell_size: int = 32) -> None:
+        """Index the bounds of shapes' items in grids of the given cell size.
+
+        Hit testing builds the index the first time it is used, so this is
+        only needed to choose a cell size other than the default.  Smaller
+        cells make queries faster for dense items, at the cost of memory.
+
+        Parameters
+        ----------
+        cell_size : int
+            The smallest width and height of the grid cells.
+        """
+
+    def disable_hit_testing(self) -> None:
+        """Free the spatial index used for hit testing."""
+
+    def hit_test(
+        self, x: int, y: int, items: bool = False
+    ) -> list[Shape] | list[tuple[Shape, int | None]]:
+        """Find the shapes under a point, topmost first.
+
+        A point hits a shape if it is within its clip, and within the
+        bounding rectangle of one of its items.  Shapes without separate
+        items, such as Windows, are hit anywhere in their clip.
+
+        The item bounds of each shape are kept in a ``SpatialIndex`` grid,
+        which is built when the shape is first hit tested and rebuilt after
+        the shape's ``update`` method is called.  Changing geometry in place
+        without calling ``update`` will not be noticed.
+
+        Parameters
+        ----------
+        x : int
+            The x-coordinate of the point.
+        y : int
+            The y-coordinate of the point.
+        items : bool
+            Whether to return the indices of the items hit.
+
+        Returns
+        -------
+        hits : list[Shape] | list[tuple[Shape, int | None]]
+            The shapes hit, or if items is True, a pair of shape and item
+            index for each item hit, with None as the index for shapes
+            without separate items.  Later items of a shape come first, as
+            they are drawn on top.
+        """
+
+    def query(
+        self, rect: rectangle, items: bool = False
+    ) -> list[Shape] | list[tuple[Shape, int | None]]:
+        """Find the shapes overlapping a rectangle, topmost first.
+
+        This is the same as ``hit_test``, but for a rectangular region.
+
+        Parameters
+        ----------
+        rect : rectangle
+            The region to query.
+        items : bool
+            Whether to return the indices of the items overlapping.
+
+        Returns
+        -------
+        hits : list[Shape] | list[tuple[Shape, int | None]]
+            The shapes found, or if items is True, a pair of shape and item
+            index for each item found.
         """
 
     def add_shape(self, layer: Any, shape: Shape) -> None:
@@ -116,18 +390,54 @@ class Surface:
     def clear(self, layer: Any) -> None:
         """Clear all shapes from a layer."""
 
-    def damage(self, rect: rectangle) -> None:
+    def damage(self, rect: rectangle, layer: Any = None, priority: int = 0) -> None:
         """Add a rectangle to the regions which need updating.
 
         This also sets the ``refresh_needed`` event.
 
         This should be called by Shape classes when they are changed.
+        Application code can also damage a region with a priority, such as
+        a button which was just touched, so that damaged regions which
+        overlap it are refreshed before others at the next refresh.
 
         Parameters
         ----------
         rect : tempe.shapes.rectangle
             A rectangle in the form of a tuple (x, y, w, h) which contains
             a region where the shapes being displayed have changed.
+        layer : Any
+            The layer which holds the changed shapes.  If this is a cached
+            layer, or None, the corresponding region of the layer cache is
+            invalidated.
+        priority : int
+            Damaged regions overlapping regions with higher priorities are
+            refreshed first.  The priorities are forgotten once the damage
+            has been ordered by a refresh.
+        """
+
+    def scroll(self, shape: Shape, dx: int, dy: int) -> None:
+        """Shift a clipped shape's pixels on the display instead of redrawing them.
+
+        This is called by shapes such as Window when their contents move
+        within their clip rectangle.  At the next refresh the display's
+        ``scroll`` method is asked to move the pixels within the clip, and
+        only the newly exposed bands, plus any shapes drawn over the clip,
+        are redrawn.  If the display can't scroll that rectangle the whole
+        clip is redrawn instead.
+
+        Pixels can only be shifted if whatever shows through the shape is
+        a single filled rectangle, such as a background, and if the extents
+        of all shapes drawn over it are known.  Otherwise, and for shifts as
+        large as the clip, the clip is simply damaged.
+
+        Parameters
+        ----------
+        shape : Shape
+            A shape with a clip rectangle whose contents have moved.
+        dx : int
+            The distance the contents moved to the right.
+        dy : int
+            The distance the contents moved down.
         """
 
     def draw(self, raster: Raster) -> None:
@@ -135,6 +445,9 @@ class Surface:
 
         Most end-user code should call ``refresh`` instead.
 
+        Shapes which are completely covered within the raster by a later
+        opaque shape, such as a single filled rectangle, are skipped.
+
         Parameters
         ----------
         raster : Raster
@@ -148,6 +461,7 @@ class Surface:
         colors: Iterable[rgb565] | color,
         fill: bool = True,
         clip: tuple[int, int, int, int] | None = None,
+        tolerance: float | None = None,
     ) -> Polygons:
         """Create a new Polygons object and add it to the layer.
 
@@ -163,6 +477,9 @@ class Surface:
             Whether to fill the polygon or draw a one-pixel-wide outline.
         clip :  tuple[int, int, int, int] | None
             A clipping rectangle for the polygons.
+        tolerance : float | None
+            A distance in pixels within which vertices may be dropped when
+            the polygons are simplified, or None to draw every vertex.
         """
 
     def poly_lines(
@@ -171,6 +488,7 @@ class Surface:
         geometry: Geometry[array] | Sequence[int],
         colors: Iterable[rgb565] | color,
         clip: tuple[int, int, int, int] | None = None,
+        tolerance: float | None = None,
     ) -> PolyLines:
         """Create a new PolyLines object and add it to the layer.
 
@@ -184,6 +502,9 @@ class Surface:
             The colors of each polyline, or a color to use for all polylines.
         clip :  tuple[int, int, int, int] | None
             A clipping rectangle for the polylines.
+        tolerance : float | None
+            A distance in pixels within which vertices may be dropped when
+            the polylines are simplified, or None to draw every vertex.
         """
 
     def rectangles(
@@ -475,6 +796,47 @@ class Surface:
             A clipping rectangle for the bitmaps.
         """
 
+    def heatmap(
+        self,
+        layer: Any,
+        rect: tuple[int, int, int, int],
+        values: Sequence[float],
+        width: int,
+        height: int,
+        colormap: array[rgb565],
+        value_range: tuple[float, float] = (0, 255),
+        clip: tuple[int, int, int, int] | None = None,
+    ) -> Heatmap:
+        """Create a new Heatmap object and add it to the layer.
+
+        Parameters
+        ----------
+        layer : Any
+            The layer that the Heatmap object is added to.
+        rect : tuple[int, int, int, int]
+            The x, y, w, h rectangle which the cells are scaled to fill.
+        values : Sequence[float]
+            The values of the cells, one row after another.
+        width : int
+            The number of columns of cells.
+        height : int
+            The number of rows of cells.
+        colormap : array[rgb565]
+            The colors which the value range is mapped onto, such as one of
+            the ``tempe.colormaps``.  On Surfaces with a palette the colors
+            are mapped to their closest palette entries.
+        value_range : tuple[float, float]
+            The values which map to the first and last colors of the colormap.
+        clip :  tuple[int, int, int, int] | None
+            A clipping rectangle for the heatmap.
+
+        Raises
+        ------
+        ValueError
+            If the colormap has more than 256 colors, or the value range
+            is empty.
+        """
+
     def _check_geometry[T](
         self,
         geometry: Geometry[T] | array | list[int] | tuple[int, ...],
@@ -2,12 +2,11 @@
 #
 # SPDX-License-Identifier: MIT
 
-from array import array
 import framebuf
 
 from .data_view import Repeat
 from .font import BitmapFont
-from .shapes import ColoredGeometry, BLIT_KEY_RGB565
+from .shapes import ColoredGeometry, _blit_key, _palette, _palette_buf
 
 LEFT = 0
 RIGHT = 1
@@ -15,6 +14,9 @@ CENTER = 2
 TOP = 3
 BOTTOM = 4
 
+# Reusable blit source descriptor for font characters.
+_char_buf = [None, None, None, framebuf.MONO_HLSB]
+
 class Text(ColoredGeometry):
     def __init__(
         self,
@@ -76,9 +78,10 @@ class Text(ColoredGeometry):
                         buffer.text(line, lx + 1, ly, color)
         elif isinstance(self.font, BitmapFont):
             line_height = self.font.height + self.line_spacing
-            palette_buf = array("H", [BLIT_KEY_RGB565, 0xFFFF])
-            palette = framebuf.FrameBuffer(palette_buf, 2, 1, framebuf.RGB565)
-            char_buf = [None, None, None, framebuf.MONO_HLSB]
+            palette_buf = _palette_buf
+            palette = _palette
+            key = _blit_key(raster)
+            char_buf = _char_buf
             for geometry, color, text, alignments in self:
                 palette_buf[1] = color
                 py = geometry[1] - y
@@ -107,7 +110,7 @@ class Text(ColoredGeometry):
                                 break
                             if lx + width >= 0:
                                 char_buf[0], char_buf[2], _ = self.font.bitmap(char)
-                                buffer.blit(char_buf, lx, py, BLIT_KEY_RGB565, palette)
+                                buffer.blit(char_buf, lx, py, key, palette)
                             lx += width
                     py += line_height
                     if py > h:
@@ -120,7 +123,7 @@ class Text(ColoredGeometry):
                 if self._bounds is None:
                     self._bounds = self._get_bounds()
                 if self.surface:
-                    self.surface.damage(self._bounds)
+                    self.surface.damage(self._bounds, self.layer)
             if texts is not None:
                 self.texts = texts
             if alignments is not None:
@@ -136,58 +139,48 @@ class Text(ColoredGeometry):
         min_x = 0x7FFF
         max_y = -0x7FFF
         min_y = 0x7FFF
-        if self.font is None:
-            line_height = 10 + self.line_spacing
-            for geometry, text, alignments in zip(self.geometry, self.texts, self.alignments):
-                if not text:
-                    continue
-                width = 8 * max(len(line) for line in text.splitlines())
-                height = line_height * len(text.splitlines()) - self.line_spacing
-                halign, valign = alignments
-                if halign == RIGHT:
-                    max_x = max(max_x, geometry[0])
-                    min_x = min(min_x, geometry[0] - width)
-                elif halign == CENTER:
-                    max_x = max(max_x, geometry[0] + width // 2)
-                    min_x = min(min_x, geometry[0] - width // 2)
-                else:
-                    max_x = max(max_x, geometry[0] + width)
-                    min_x = min(min_x, geometry[0])
-                if valign == BOTTOM:
-                    max_y = max(max_y, geometry[1])
-                    min_y = min(min_y, geometry[1] - height)
-                elif valign == CENTER:
-                    max_y = max(max_y, geometry[1] + height // 2)
-                    min_y = min(min_y, geometry[1] - height // 2)
-                else:
-                    max_y = max(max_y, geometry[1] + height)
-                    min_y = min(min_y, geometry[1])
-        else:
-            line_height = self.font.height + self.line_spacing
-            for geometry, text, alignments in zip(self.geometry, self.texts, self.alignments):
-                if not text:
-                    continue
-                width = max(self.font.measure(line)[2] for line in text.splitlines())
-                height = line_height * len(text.splitlines()) - self.line_spacing
-                halign, valign = alignments
-                if halign == RIGHT:
-                    max_x = max(max_x, geometry[0])
-                    min_x = min(min_x, geometry[0] - width)
-                elif halign == CENTER:
-                    max_x = max(max_x, geometry[0] + width // 2 + 1)
-                    min_x = min(min_x, geometry[0] - width // 2 - 1)
-                else:
-                    max_x = max(max_x, geometry[0] + width)
-                    min_x = min(min_x, geometry[0])
-                if valign == BOTTOM:
-                    max_y = max(max_y, geometry[1])
-                    min_y = min(min_y, geometry[1] - height)
-                elif valign == CENTER:
-                    max_y = max(max_y, geometry[1] + height // 2 + 1)
-                    min_y = min(min_y, geometry[1] - height // 2 - 1)
-                else:
-                    max_y = max(max_y, geometry[1] + height)
-                    min_y = min(min_y, geometry[1])
+        for x, y, w, h in self._item_bounds():
+            if w == 0 and h == 0:
+                # empty text
+                continue
+            max_x = max(max_x, x + w)
+            min_x = min(min_x, x)
+            max_y = max(max_y, y + h)
+            min_y = min(min_y, y)
         if max_x < min_x or max_y < min_y:
             return (0, 0, 0, 0)
         return (min_x, min_y, max_x - min_x, max_y - min_y)
+
+    def _item_bounds(self):
+        font = self.font
+        if font is None:
+            line_height = 10 + self.line_spacing
+            slack = 0
+        else:
+            line_height = font.height + self.line_spacing
+            # centered text may be a pixel off either way
+            slack = 1
+        for geometry, text, alignments in zip(self.geometry, self.texts, self.alignments):
+            x = geometry[0]
+            y = geometry[1]
+            if not text:
+                yield (x, y, 0, 0)
+                continue
+            lines = text.splitlines()
+            if font is None:
+                width = 8 * max(len(line) for line in lines)
+            else:
+                width = max(font.measure(line)[2] for line in lines)
+            height = line_height * len(lines) - self.line_spacing
+            halign, valign = alignments
+            if halign == RIGHT:
+                x -= width
+            elif halign == CENTER:
+                x -= width // 2 + slack
+                width = 2 * (width // 2 + slack)
+            if valign == BOTTOM:
+                y -= height
+            elif valign == CENTER:
+                y -= height // 2 + slack
+                height = 2 * (height // 2 + slack)
+            yield (x, y, width, height)
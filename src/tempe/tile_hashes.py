@@ -0,0 +1,90 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+from array import array
+
+from .util import hash_tile
+
+
+class TileHashes:
+    """Hashes of the pixels last sent to each tile of a display."""
+
+    def __init__(self, width, height, tile_width=16, tile_height=8):
+        self.width = width
+        self.height = height
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.columns = (width + tile_width - 1) // tile_width
+        self.rows = (height + tile_height - 1) // tile_height
+        self._hashes = array("I", bytes(4 * self.columns * self.rows))
+        self._known = bytearray(self.columns * self.rows)
+        self.changed = bytearray(self.columns)
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate_all(self):
+        """Forget all hashes, so every tile is sent again."""
+        known = self._known
+        for i in range(len(known)):
+            known[i] = 0
+
+    def invalidate(self, rect):
+        """Forget the hashes of tiles which overlap a rectangle."""
+        x, y, w, h = rect
+        tile_width = self.tile_width
+        tile_height = self.tile_height
+        columns = self.columns
+        c0 = max(x // tile_width, 0)
+        c1 = min((x + w + tile_width - 1) // tile_width, columns)
+        r0 = max(y // tile_height, 0)
+        r1 = min((y + h + tile_height - 1) // tile_height, self.rows)
+        known = self._known
+        for row in range(r0, r1):
+            i = row * columns
+            for column in range(c0, c1):
+                known[i + column] = 0
+
+    def snap(self, x, y, w, h):
+        """Expand a rectangle to tile boundaries, clipped to the display."""
+        tile_width = self.tile_width
+        tile_height = self.tile_height
+        x1 = x // tile_width * tile_width
+        y1 = y // tile_height * tile_height
+        x2 = min((x + w + tile_width - 1) // tile_width * tile_width, self.width)
+        y2 = min((y + h + tile_height - 1) // tile_height * tile_height, self.height)
+        return x1, y1, x2 - x1, y2 - y1
+
+    def compare(self, raster, y, h):
+        """Hash a tile-aligned band of a raster and flag the changed tiles.
+
+        The raster must be aligned to tile boundaries horizontally.  On
+        return ``changed`` holds a flag for each tile of the band, starting
+        with the tile at the left edge of the raster, and the number of
+        changed tiles is returned.
+        """
+        tile_width = self.tile_width
+        pixel_bytes = raster.bits // 8
+        row_bytes = raster.stride * pixel_bytes
+        start = (raster.offset + (y - raster.y) * raster.stride) * pixel_bytes
+        c0 = raster.x // tile_width
+        index = (y // self.tile_height) * self.columns + c0
+        hashes = self._hashes
+        known = self._known
+        changed = self.changed
+        n_changed = 0
+        for i in range((raster.w + tile_width - 1) // tile_width):
+            w = min(tile_width, raster.w - i * tile_width)
+            value = hash_tile(
+                raster.buf, start + i * tile_width * pixel_bytes, w * pixel_bytes, h, row_bytes
+            )
+            if known[index + i] and hashes[index + i] == value:
+                changed[i] = 0
+                self.hits += 1
+            else:
+                hashes[index + i] = value
+                known[index + i] = 1
+                changed[i] = 1
+                n_changed += 1
+                self.misses += 1
+        return n_changed
@@ -0,0 +1,94 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""This module defines the TileHashes class.
+
+This is an internal class used by Surfaces to avoid sending pixels to the
+display which are the same as those already there, such as when a value
+is updated to the same text.
+"""
+
+from array import array
+
+from .raster import Raster
+
+class TileHashes:
+    """Hashes of the pixels last sent to each tile of a display.
+
+    The display is divided into a grid of tiles, and a 32-bit FNV-1a hash
+    of the pixels of each tile is kept from the last time that the tile
+    was blitted.  When a Surface has rendered a strip, the tiles are hashed
+    again and only the tiles whose hashes differ need to be blitted.
+
+    Hashes only record what the Surface sent, so if the display is changed
+    by other means, ``invalidate_all`` should be called.
+
+    Parameters
+    ----------
+    width : int
+        The width of the display.
+    height : int
+        The height of the display.
+    tile_width : int
+        The width of each tile.
+    tile_height : int
+        The height of each tile.  Strips are rendered in whole rows of
+        tiles, so the working buffer must hold at least this many rows.
+
+    Attributes
+    ----------
+    hits : int
+        The number of tiles which were unchanged, and so not blitted.
+    misses : int
+        The number of tiles which were changed, and so blitted.
+    changed : bytearray
+        Flags for each tile of the last band compared.
+    """
+
+    width: int
+    height: int
+    tile_width: int
+    tile_height: int
+    columns: int
+    rows: int
+    changed: bytearray
+    hits: int
+    misses: int
+
+    def __init__(
+        self, width: int, height: int, tile_width: int = 16, tile_height: int = 8
+    ): ...
+
+    def invalidate_all(self) -> None:
+        """Forget all hashes, so every tile is sent again."""
+
+    def invalidate(self, rect: tuple[int, int, int, int]) -> None:
+        """Forget the hashes of tiles which overlap a rectangle.
+
+        This is needed when part of the display is changed without
+        comparing tiles, such as by a solid fill.
+        """
+
+    def snap(self, x: int, y: int, w: int, h: int) -> tuple[int, int, int, int]:
+        """Expand a rectangle to tile boundaries, clipped to the display."""
+
+    def compare(self, raster: Raster, y: int, h: int) -> int:
+        """Hash a tile-aligned band of a raster and flag the changed tiles.
+
+        The raster must be aligned to tile boundaries horizontally.  On
+        return ``changed`` holds a flag for each tile of the band, starting
+        with the tile at the left edge of the raster, and the number of
+        changed tiles is returned.
+
+        Parameters
+        ----------
+        raster : Raster
+            The rendered raster.
+        y : int
+            The y-coordinate of the band, which should be the top of a row
+            of tiles.
+        h : int
+            The height of the band, which should be the tile height unless
+            the band is at the bottom of the display.
+        """
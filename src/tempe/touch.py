@@ -0,0 +1,63 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+
+
+class TouchDispatcher:
+    """Send touches to the handlers of the topmost touched shape."""
+
+    def __init__(self, surface):
+        self.surface = surface
+        self._handlers = {}
+        self._pressed = None
+
+    def add_handler(self, shape, on_press=None, on_release=None):
+        """Call functions when a shape is pressed and released."""
+        self._handlers[shape] = (on_press, on_release)
+
+    def remove_handler(self, shape):
+        """Stop sending touches to a shape."""
+        self._handlers.pop(shape, None)
+        pressed = self._pressed
+        if pressed is not None and pressed[0] is shape:
+            self._pressed = None
+
+    def press(self, x, y):
+        """Send the start of a touch to the topmost shape with a handler."""
+        self._pressed = None
+        for shape, index in self.surface.hit_test(x, y, items=True):
+            handlers = self._handlers.get(shape)
+            if handlers is None:
+                # touches pass through shapes without handlers
+                continue
+            on_press, on_release = handlers
+            self._pressed = (shape, index, on_release)
+            if on_press is not None:
+                on_press(shape, index, x, y)
+            return shape
+        return None
+
+    def release(self, x, y):
+        """Send the end of a touch to the shape which received its start."""
+        pressed = self._pressed
+        if pressed is None:
+            return None
+        self._pressed = None
+        shape, index, on_release = pressed
+        if on_release is not None:
+            on_release(shape, index, x, y)
+        return shape
+
+    async def run(self, read_touch, interval=0.02):
+        """Poll a touch panel forever, sending presses and releases."""
+        last = None
+        while True:
+            point = read_touch()
+            if point is not None and last is None:
+                self.press(*point)
+            elif point is None and last is not None:
+                self.release(*last)
+            last = point
+            await asyncio.sleep(interval)
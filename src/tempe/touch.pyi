@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""This module defines the TouchDispatcher class.
+
+A TouchDispatcher uses ``Surface.hit_test`` to send touches on a
+touchscreen to functions registered for the shapes which were touched,
+so buttons and other controls don't need to check coordinates by hand.
+"""
+
+from collections.abc import Callable
+
+from .shapes import Shape
+from .surface import Surface
+
+#: A function called with the shape, the item index (or None) and the
+#: coordinates of the touch.
+handler = Callable[[Shape, int | None, int, int], None]
+
+
+class TouchDispatcher:
+    """Send touches to the handlers of the topmost touched shape.
+
+    Touches pass through shapes without handlers, so that a label drawn
+    over a button doesn't stop the button from being pressed.
+
+    Parameters
+    ----------
+    surface : Surface
+        The surface whose shapes are touched.
+    """
+
+    surface: Surface
+
+    def __init__(self, surface: Surface): ...
+
+    def add_handler(
+        self,
+        shape: Shape,
+        on_press: handler | None = None,
+        on_release: handler | None = None,
+    ) -> None:
+        """Call functions when a shape is pressed and released.
+
+        Parameters
+        ----------
+        shape : Shape
+            The shape to handle touches for.
+        on_press : handler | None
+            Called when a touch starts on the shape.
+        on_release : handler | None
+            Called when a touch which started on the shape ends, with the
+            last coordinates of the touch.
+        """
+
+    def remove_handler(self, shape: Shape) -> None:
+        """Stop sending touches to a shape."""
+
+    def press(self, x: int, y: int) -> Shape | None:
+        """Send the start of a touch to the topmost shape with a handler.
+
+        Returns
+        -------
+        shape : Shape | None
+            The shape which received the touch, if any.
+        """
+
+    def release(self, x: int, y: int) -> Shape | None:
+        """Send the end of a touch to the shape which received its start.
+
+        Returns
+        -------
+        shape : Shape | None
+            The shape which received the touch, if any.
+        """
+
+    async def run(
+        self,
+        read_touch: Callable[[], tuple[int, int] | None],
+        interval: float = 0.02,
+    ) -> None:
+        """Poll a touch panel forever, sending presses and releases.
+
+        Parameters
+        ----------
+        read_touch : Callable[[], tuple[int, int] | None]
+            A function which returns the coordinates of the current touch in
+            surface coordinates, or None if the panel isn't being touched.
+        interval : float
+            The number of seconds between polls.
+        """
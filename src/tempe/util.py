@@ -2,6 +2,50 @@
 #
 # SPDX-License-Identifier: MIT
 
+from array import array
+import framebuf
+
+_ITEM_SIZES = {"b": 1, "B": 1, "h": 2, "H": 2, "i": 4, "I": 4, "l": 4, "L": 4, "f": 4}
+
+
+class ArrayBuffer:
+    """Reusable array storage which grows geometrically.
+
+    Repeatedly requesting arrays of the same length returns the same
+    object, so it can be refilled in place.  When a different length is
+    requested, the underlying storage is reused if it is large enough,
+    otherwise it is replaced with one that is at least 50% larger, so that
+    the number of large allocations stays small as data grows.
+    """
+
+    def __init__(self, typecode="h", capacity=0):
+        self.typecode = typecode
+        self._array = array(typecode, bytearray(_ITEM_SIZES[typecode] * capacity))
+        self._view = None
+
+    @property
+    def capacity(self):
+        return len(self._array)
+
+    def get(self, n):
+        """Get a writable sequence of n values, reusing storage if possible."""
+        view = self._view
+        if view is not None and len(view) == n:
+            return view
+        storage = self._array
+        if len(storage) < n:
+            capacity = max(n, len(storage) * 3 // 2)
+            storage = array(
+                self.typecode, bytearray(_ITEM_SIZES[self.typecode] * capacity)
+            )
+            self._array = storage
+        if len(storage) == n:
+            view = storage
+        else:
+            view = memoryview(storage)[:n]
+        self._view = view
+        return view
+
 
 def contains(rect_1, rect_2):
     return (
@@ -69,8 +113,234 @@ def intersect_poly_rect(polygon, n, x, y, w, h):
     )
 
 
+def fill_rects(raster, rects, n, k, colors, color, fill):
+    buffer = raster.fbuf
+    x = raster.x
+    y = raster.y
+    c = color
+    for i in range(n):
+        j = i * k
+        px = rects[j] - x
+        py = rects[j + 1] - y
+        w = rects[j + 2]
+        h = rects[j + 3]
+        if w < 0:
+            px += w
+            w = -w
+        if h < 0:
+            py += h
+            h = -h
+        if color < 0:
+            c = colors[i]
+        buffer.rect(px, py, w, h, c, fill)
+
+
+def fill_lines(raster, lines, n, k, colors, color, vertical):
+    buffer = raster.fbuf
+    x = raster.x
+    y = raster.y
+    c = color
+    for i in range(n):
+        j = i * k
+        if color < 0:
+            c = colors[i]
+        if vertical:
+            buffer.vline(lines[j] - x, lines[j + 1] - y, lines[j + 2], c)
+        else:
+            buffer.hline(lines[j] - x, lines[j + 1] - y, lines[j + 2], c)
+
+
+def fill_pixels(raster, points, n, k, colors, color):
+    buffer = raster.fbuf
+    x = raster.x
+    y = raster.y
+    c = color
+    for i in range(n):
+        j = i * k
+        if color < 0:
+            c = colors[i]
+        buffer.pixel(points[j] - x, points[j + 1] - y, c)
+
+
+def pack_column(buffer, column, start, n, k, j):
+    p = j
+    for i in range(start, start + n):
+        buffer[p] = column[i]
+        p += k
+
+
+def pack_value(buffer, value, n, k, j):
+    for p in range(j, j + n * k, k):
+        buffer[p] = value
+
+
+def expand_palette(dest, src, row, n, stride, palette, format):
+    if format == framebuf.GS8:
+        p = row * stride
+        for i in range(n):
+            dest[i] = palette[src[p + i]]
+    elif format == framebuf.GS4_HMSB:
+        for p in range(row * stride, row * stride + n):
+            v = src[p >> 1]
+            if p & 1:
+                v &= 0xF
+            else:
+                v >>= 4
+            dest[p - row * stride] = palette[v]
+    elif format == framebuf.MONO_VLSB:
+        p = (row >> 3) * stride
+        shift = row & 7
+        for i in range(n):
+            dest[i] = palette[(src[p + i] >> shift) & 1]
+    elif format == framebuf.MONO_HLSB:
+        for p in range(row * stride, row * stride + n):
+            dest[p - row * stride] = palette[(src[p >> 3] >> (7 - (p & 7))) & 1]
+    else:
+        for p in range(row * stride, row * stride + n):
+            dest[p - row * stride] = palette[(src[p >> 3] >> (p & 7)) & 1]
+
+
+def hash_tile(buf, start, w, h, stride):
+    # 32-bit FNV-1a hash of w bytes from each of h rows
+    result = 0x811C9DC5
+    p = start
+    for i in range(h):
+        for j in range(p, p + w):
+            result = ((result ^ buf[j]) * 0x01000193) & 0xFFFFFFFF
+        p += stride
+    return result
+
+
+def copy_rows(dest, src, start, row_bytes, stride, rows):
+    dest = memoryview(dest)
+    src = memoryview(src)
+    q = 0
+    p = start
+    for i in range(rows):
+        dest[q : q + row_bytes] = src[p : p + row_bytes]
+        q += row_bytes
+        p += stride
+
+
+def shift_rect(buf, start, row_bytes, rows, stride, dx, dy):
+    buf = memoryview(buf)
+    n = row_bytes - abs(dx)
+    m = rows - abs(dy)
+    if n <= 0 or m <= 0:
+        return
+    if dy > 0:
+        row = start + (rows - 1) * stride
+        step = -stride
+    else:
+        row = start
+        step = stride
+    d = max(dx, 0)
+    s = d - dx - dy * stride
+    for i in range(m):
+        # copy the source first, as it may overlap the destination
+        buf[row + d : row + d + n] = bytes(buf[row + s : row + s + n])
+        row += step
+
+
+def transform_points(buf, n, k, points, matrix):
+    a, b, c, d, tx, ty = matrix
+    for i in range(n):
+        p = i * k
+        for j in range(points):
+            x = buf[p]
+            y = buf[p + 1]
+            # matrix entries have 10 fractional bits, rounded to nearest
+            buf[p] = ((a * x + b * y + 512) >> 10) + tx
+            buf[p + 1] = ((c * x + d * y + 512) >> 10) + ty
+            p += 2
+
+
+def fill_heatmap(raster, indices, width, height, x, y, w, h, colormap):
+    buffer = raster.fbuf
+    rx = raster.x
+    ry = raster.y
+    # range of cells overlapping the raster
+    c0 = max((rx - x) * width // w, 0)
+    c1 = min((rx + raster.w - 1 - x) * width // w + 1, width)
+    r0 = max((ry - y) * height // h, 0)
+    r1 = min((ry + raster.h - 1 - y) * height // h + 1, height)
+    for row in range(r0, r1):
+        # first pixel of each cell, rounding up
+        py0 = y - ry + (row * h + height - 1) // height
+        py1 = y - ry + ((row + 1) * h + height - 1) // height
+        for column in range(c0, c1):
+            px0 = x - rx + (column * w + width - 1) // width
+            px1 = x - rx + ((column + 1) * w + width - 1) // width
+            color = colormap[indices[row * width + column]]
+            buffer.fill_rect(px0, py0, px1 - px0, py1 - py0, color)
+
+
+def simplify_points(points, n, tolerance, out):
+    """Douglas-Peucker simplify the first n x, y points into an ArrayBuffer."""
+    if n <= 2:
+        simplified = out.get(2 * n)
+        for i in range(2 * n):
+            simplified[i] = points[i]
+        return simplified
+    keep = bytearray(n)
+    keep[0] = 1
+    keep[n - 1] = 1
+    tolerance_sq = tolerance * tolerance
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        ax = points[2 * first]
+        ay = points[2 * first + 1]
+        dx = points[2 * last] - ax
+        dy = points[2 * last + 1] - ay
+        length_sq = dx * dx + dy * dy
+        worst = -1
+        index = first
+        for i in range(first + 1, last):
+            px = points[2 * i] - ax
+            py = points[2 * i + 1] - ay
+            if length_sq:
+                # squared distance from the line, scaled by the squared length
+                cross = dx * py - dy * px
+                d = cross * cross
+            else:
+                d = px * px + py * py
+            if d > worst:
+                worst = d
+                index = i
+        if worst > (tolerance_sq * length_sq if length_sq else tolerance_sq):
+            keep[index] = 1
+            stack.append((first, index))
+            stack.append((index, last))
+    simplified = out.get(2 * sum(keep))
+    j = 0
+    for i in range(n):
+        if keep[i]:
+            simplified[j] = points[2 * i]
+            simplified[j + 1] = points[2 * i + 1]
+            j += 2
+    return simplified
+
+
 # replace with faster viper versions where available
 try:
-    from ._speedups import bisect16, line_points, intersect_poly_rect
+    from ._speedups import (
+        bisect16,
+        line_points,
+        intersect_poly_rect,
+        fill_rects,
+        fill_lines,
+        fill_pixels,
+        pack_column,
+        pack_value,
+        expand_palette,
+        hash_tile,
+        copy_rows,
+        shift_rect,
+        transform_points,
+        fill_heatmap,
+    )
 except SyntaxError:
     pass
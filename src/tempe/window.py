@@ -2,7 +2,9 @@
 #
 # SPDX-License-Identifier: MIT
 
-from .raster import Raster
+import framebuf
+
+from .raster import RasterPool
 from .surface import Surface
 from .shapes import Shape
 
@@ -10,7 +12,9 @@ from .shapes import Shape
 class Window(Shape):
     """A Shape which displays a surface."""
 
-    def __init__(self, offset=None, *, surface=None, clip=None):
+    def __init__(
+        self, offset=None, *, surface=None, clip=None, format=framebuf.RGB565, palette=None
+    ):
         super().__init__(surface, clip)
         if offset is None:
             if clip is not None:
@@ -18,29 +22,52 @@ class Window(Shape):
             else:
                 offset = (0, 0)
         self.offset = offset
-        self.subsurface = Surface()
+        self.subsurface = Surface(format, palette)
+        self._raster_pool = RasterPool()
 
     def draw_raster(self, raster):
         x, y = self.offset
-        # new raster translated to subsurface coordinates
-        if self.clip is None:
-            raster = raster.clip(self.clip)
-            raster.x -= x
-            raster.y -= y
-        else:
-            raster = Raster(
-                raster.buf,
-                raster.x - x,
-                raster.y - y,
-                raster.w,
-                raster.h,
-                raster.stride,
-                raster.offset,
-            )
+        # raster translated to subsurface coordinates
+        raster = self._raster_pool.raster(
+            raster.buf,
+            raster.x - x,
+            raster.y - y,
+            raster.w,
+            raster.h,
+            raster.stride,
+            raster.offset,
+            raster.format,
+        )
         self.subsurface.draw(raster)
 
+    def _get_bounds(self):
+        if self.clip is not None:
+            return self.clip
+        x0 = y0 = 0x7FFF
+        x1 = y1 = -0x8000
+        for layer_shapes in self.subsurface.layers.values():
+            for shape in layer_shapes:
+                extent = shape.clip
+                if extent is None:
+                    if shape._bounds is None:
+                        shape._bounds = shape._get_bounds()
+                    extent = shape._bounds
+                x, y, w, h = extent
+                x0 = min(x0, x)
+                y0 = min(y0, y)
+                x1 = max(x1, x + w)
+                y1 = max(y1, y + h)
+        x, y = self.offset
+        if x1 <= x0 or y1 <= y0:
+            return (x, y, 0, 0)
+        return (x0 + x, y0 + y, x1 - x0, y1 - y0)
+
     def update(self, offset=None):
         if offset is None:
+            # scrolls inside the subsurface can't shift display pixels
+            for rect, dx, dy, layer in self.subsurface._scrolls:
+                self.subsurface.damage(rect, layer)
+            self.subsurface._scrolls = []
             if self.surface:
                 for rect in self.subsurface._damage:
                     x, y, w, h = rect
@@ -50,24 +77,25 @@ class Window(Shape):
                             (y + self.offset[1]),
                             w,
                             h,
-                        )
+                        ),
+                        self.layer,
                     )
             self.subsurface._damage = []
             self.subsurface.refresh_needed.clear()
         elif self.clip is None:
-            # invalidate old drawing areas
-            for layer_shapes in self.subsurface.layers.values:
-                for shape in layer_shapes:
-                    shape.update()
+            # send pending damage, then redraw the contents where they were
+            # and where they are now
             self.update()
-            # shift
+            if self.surface:
+                self.surface.damage(self._get_bounds(), self.layer)
             self.offset = offset
-            # invalidate new drawing areas
-            for layer_shapes in self.subsurface.layers.values:
-                for shape in layer_shapes:
-                    shape.update()
-            self.update()
+            if self.surface:
+                self.surface.damage(self._get_bounds(), self.layer)
         else:
+            # pending damage belongs to the old offset
+            self.update()
+            dx = offset[0] - self.offset[0]
+            dy = offset[1] - self.offset[1]
             self.offset = offset
             if self.surface:
-                self.surface.damage(self.clip)
+                self.surface.scroll(self, dx, dy)
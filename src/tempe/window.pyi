@@ -2,13 +2,27 @@
 #
 # SPDX-License-Identifier: MIT
 
+from collections.abc import Sequence
+import framebuf
+
+from .colors.types import color
 from .raster import Raster
 from .surface import Surface, rectangle
 from .shapes import Shape
 
 
 class Window(Shape):
-    """A Shape which displays a surface."""
+    """A Shape which displays a surface.
+
+    The format and palette of the subsurface must match the Surface that
+    the Window is drawn on.
+
+    Changing the offset of a Window with a clip uses ``Surface.scroll``, so
+    on displays which can shift pixels, such as hardware scrolling panels
+    or a FrameBufferDisplay with its buffer, only the newly exposed part of
+    the window is redrawn.  Without a clip, the bounds of the contents are
+    redrawn at the old and new offsets.
+    """
 
     def __init__(
         self,
@@ -16,9 +30,18 @@ class Window(Shape):
         *,
         surface: Surface | None = None,
         clip: rectangle | None = None,
+        format: int = framebuf.RGB565,
+        palette: Sequence[color] | None = None,
     ): ...
 
     def draw_raster(self, raster: Raster):
         """Draw the Window's contents in the Raster"""
 
-    def update(self, offset: tuple[int, int] | None = None, **kwargs): ...
+    def update(self, offset: tuple[int, int] | None = None, **kwargs):
+        """Send damage from the subsurface to the surface, or move the contents.
+
+        Parameters
+        ----------
+        offset : tuple[int, int] | None
+            The new position of the subsurface's origin in the surface.
+        """
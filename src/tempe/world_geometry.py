@@ -0,0 +1,246 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+from array import array
+
+from .data_view import DataView
+from .geometry import Geometry
+from .spatial_index import CellGrid
+
+# Maximum number of grid columns or rows.
+_MAX_CELLS = const(64)
+
+# Projected coordinates are clamped to this range so differences fit in 16 bits.
+_MIN_COORD = const(-0x4000)
+_MAX_COORD = const(0x3FFF)
+
+
+class Viewport:
+    """A pan and zoom transform from world coordinates to screen coordinates."""
+
+    def __init__(self, rect, x=0, y=0, scale=1):
+        self.rect = rect
+        self.x = x
+        self.y = y
+        self.scale = scale
+        self.version = 0
+
+    def set(self, x=None, y=None, scale=None):
+        """Set the world point at the top-left of the view, and the scale."""
+        if x is not None:
+            self.x = x
+        if y is not None:
+            self.y = y
+        if scale is not None:
+            self.scale = scale
+        self.version += 1
+
+    def pan(self, dx, dy):
+        """Move the contents of the view by a number of screen pixels."""
+        scale = self.scale
+        self.x -= dx / scale
+        self.y -= dy / scale
+        self.version += 1
+
+    def zoom(self, factor, cx=None, cy=None):
+        """Scale the view about a screen point, by default its center."""
+        x, y, w, h = self.rect
+        if cx is None:
+            cx = x + w // 2
+        if cy is None:
+            cy = y + h // 2
+        scale = self.scale
+        new_scale = scale * factor
+        # keep the world point under the screen point fixed
+        self.x += (cx - x) * (1 / scale - 1 / new_scale)
+        self.y += (cy - y) * (1 / scale - 1 / new_scale)
+        self.scale = new_scale
+        self.version += 1
+
+    def to_screen(self, wx, wy):
+        """Convert a world point to a screen point."""
+        scale = self.scale
+        return (
+            round(self.rect[0] + (wx - self.x) * scale),
+            round(self.rect[1] + (wy - self.y) * scale),
+        )
+
+    def to_world(self, sx, sy):
+        """Convert a screen point to a world point."""
+        scale = self.scale
+        return (
+            self.x + (sx - self.rect[0]) / scale,
+            self.y + (sy - self.rect[1]) / scale,
+        )
+
+    def world_rect(self):
+        """The minimum and maximum world coordinates in the view."""
+        scale = self.scale
+        return (
+            self.x,
+            self.y,
+            self.x + self.rect[2] / scale,
+            self.y + self.rect[3] / scale,
+        )
+
+
+class WorldGeometry(Geometry):
+    """Rows of world coordinates, projected through a viewport when iterated."""
+
+    def __init__(self, data, coords, viewport, *, points=None, margin=0, cells=32):
+        super().__init__(data, coords)
+        self.viewport = viewport
+        self.points = coords // 2 if points is None else points
+        self.margin = margin
+        self.cells = min(cells, _MAX_CELLS)
+        self.n_rows = len(data) // coords
+        self.candidates = 0
+        self._buf = array("h", bytearray(2 * coords))
+        self._grid = None
+        self._visible = None
+        self._version = None
+
+    def invalidate(self):
+        """Forget the spatial index after the data changes in place."""
+        self._grid = None
+        self._visible = None
+
+    def visible(self):
+        """The indices of the rows which overlap the viewport, in order."""
+        viewport = self.viewport
+        if self._visible is not None and self._version == viewport.version:
+            return self._visible
+        if self._grid is None:
+            self._build()
+        x0, y0, x1, y1 = viewport.world_rect()
+        # an extra pixel allows for rounding
+        pad = (self.margin + 1) / viewport.scale
+        x0 -= pad
+        y0 -= pad
+        x1 += pad
+        y1 += pad
+        grid = self._grid
+        found = grid.overlapping(x0, y0, x1, y1)
+        self.candidates = grid.candidates
+        self._visible = found
+        self._version = viewport.version
+        return found
+
+    def visible_data(self, data):
+        """A view of per-row data, such as colors, for the visible rows."""
+        return VisibleData(self, data)
+
+    def _build(self):
+        data = self.geometry
+        k = self.coords
+        n_coords = 2 * self.points
+        n = self.n_rows
+        if n and isinstance(data[0], float):
+            bounds = array("f", bytes(16 * n))
+        else:
+            bounds = array("i", bytes(16 * n))
+        gx0 = gy0 = gx1 = gy1 = None
+        for i in range(n):
+            start = i * k
+            min_x = max_x = data[start]
+            min_y = max_y = data[start + 1]
+            for j in range(start + 2, start + n_coords, 2):
+                x = data[j]
+                y = data[j + 1]
+                if x < min_x:
+                    min_x = x
+                elif x > max_x:
+                    max_x = x
+                if y < min_y:
+                    min_y = y
+                elif y > max_y:
+                    max_y = y
+            bounds[4 * i] = min_x
+            bounds[4 * i + 1] = min_y
+            bounds[4 * i + 2] = max_x
+            bounds[4 * i + 3] = max_y
+            if gx0 is None:
+                gx0, gy0, gx1, gy1 = min_x, min_y, max_x, max_y
+            else:
+                gx0 = min(gx0, min_x)
+                gy0 = min(gy0, min_y)
+                gx1 = max(gx1, max_x)
+                gy1 = max(gy1, max_y)
+        if gx0 is None:
+            gx0 = gy0 = gx1 = gy1 = 0
+        columns = rows = self.cells
+        self._grid = CellGrid(
+            bounds,
+            gx0,
+            gy0,
+            (gx1 - gx0) / columns or 1,
+            (gy1 - gy0) / rows or 1,
+            columns,
+            rows,
+        )
+
+    def _project(self, buffer, index, i):
+        data = self.geometry
+        k = self.coords
+        start = i * k
+        viewport = self.viewport
+        scale = viewport.scale
+        ox = viewport.rect[0] - viewport.x * scale
+        oy = viewport.rect[1] - viewport.y * scale
+        n_coords = 2 * self.points
+        for j in range(0, n_coords, 2):
+            x = round(data[start + j] * scale + ox)
+            y = round(data[start + j + 1] * scale + oy)
+            buffer[index + j] = min(max(x, _MIN_COORD), _MAX_COORD)
+            buffer[index + j + 1] = min(max(y, _MIN_COORD), _MAX_COORD)
+        for j in range(n_coords, k):
+            # sizes and other values are passed through
+            buffer[index + j] = int(data[start + j])
+
+    def __iter__(self):
+        buf = self._buf
+        for i in self.visible():
+            self._project(buf, 0, i)
+            yield buf
+
+    def __len__(self):
+        return len(self.visible())
+
+    def pack(self, buffer, rows=None):
+        """Pack rows into a flat buffer, yielding the number of rows packed.
+
+        Only the visible rows are projected, directly into the buffer.
+        """
+        k = self.coords
+        n = len(buffer) // k
+        if rows is not None:
+            n = min(n, rows)
+        count = 0
+        for i in self.visible():
+            self._project(buffer, count * k, i)
+            count += 1
+            if count == n:
+                yield n
+                count = 0
+        if count:
+            yield count
+
+
+class VisibleData(DataView):
+    """The entries of per-row data for the visible rows of a WorldGeometry."""
+
+    def __init__(self, geometry, data):
+        super().__init__(data)
+        self.geometry = geometry
+
+    def __len__(self):
+        return len(self.geometry.visible())
+
+    def __iter__(self):
+        data = self.data
+        for i in self.geometry.visible():
+            yield data[i]
+
+    def __getitem__(self, index):
+        return self.data[self.geometry.visible()[index]]
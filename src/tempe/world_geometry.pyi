@@ -0,0 +1,182 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""Geometry in world coordinates, viewed through a pannable and zoomable viewport.
+
+Other geometries hold 16-bit screen coordinates, so a large map or a long
+time series has to be rebuilt in screen space whenever the view moves, and
+can't hold values beyond ±32k.  A WorldGeometry instead holds its rows in
+32-bit integer or float arrays, and a Viewport maps them to the screen as
+the rows are iterated or packed.
+
+A coarse grid index over the rows is built the first time they are needed,
+so that when the view changes only the rows in the grid cells under the
+view are checked, and only the rows which overlap it are projected.
+"""
+
+from array import array
+from typing import Iterator, Sequence
+
+from .data_view import DataView
+from .geometry import Geometry
+from .surface import rectangle
+
+
+class Viewport:
+    """A pan and zoom transform from world coordinates to screen coordinates.
+
+    The world point (x, y) is drawn at the top-left corner of the view
+    rectangle, and one world unit is ``scale`` pixels.  Each change
+    increments the version, which geometries use to know when to find
+    their visible rows again.
+
+    Parameters
+    ----------
+    rect : rectangle
+        The x, y, w, h rectangle on the screen which the view covers.
+    x : float
+        The world x-coordinate at the left of the view.
+    y : float
+        The world y-coordinate at the top of the view.
+    scale : float
+        The number of pixels per world unit.
+    """
+
+    rect: rectangle
+    x: float
+    y: float
+    scale: float
+    version: int
+
+    def __init__(self, rect: rectangle, x: float = 0, y: float = 0, scale: float = 1): ...
+
+    def set(self, x: float | None = None, y: float | None = None, scale: float | None = None) -> None:
+        """Set the world point at the top-left of the view, and the scale."""
+
+    def pan(self, dx: float, dy: float) -> None:
+        """Move the contents of the view by a number of screen pixels.
+
+        This is the motion of a finger dragging the view.
+        """
+
+    def zoom(self, factor: float, cx: int | None = None, cy: int | None = None) -> None:
+        """Scale the view about a screen point, by default its center.
+
+        The world point under the screen point stays where it is.
+        """
+
+    def to_screen(self, wx: float, wy: float) -> tuple[int, int]:
+        """Convert a world point to a screen point."""
+
+    def to_world(self, sx: int, sy: int) -> tuple[float, float]:
+        """Convert a screen point to a world point."""
+
+    def world_rect(self) -> tuple[float, float, float, float]:
+        """The minimum and maximum world coordinates in the view.
+
+        Returns
+        -------
+        extent : tuple[float, float, float, float]
+            The minimum x, minimum y, maximum x and maximum y.
+        """
+
+
+class WorldGeometry(Geometry[array[int]]):
+    """Rows of world coordinates, projected through a viewport when iterated.
+
+    Only the rows which overlap the viewport are produced, in their
+    original order, so any per-row data used alongside the geometry, such
+    as colors or sizes, should be wrapped with ``visible_data`` unless it
+    is a Repeat.  Projected points are rounded and clamped to ±16k so that
+    their differences still fit in 16 bits.
+
+    Shapes using the geometry should be clipped to the view rectangle, and
+    updated with the geometry after the viewport changes so that the old
+    and new positions are redrawn.
+
+    Parameters
+    ----------
+    data : array
+        The coordinates of each row one after another, as a 32-bit integer
+        or float array.
+    coords : int
+        The number of coordinates in each row.
+    viewport : Viewport
+        The viewport to project rows through.
+    points : int | None
+        The number of x, y pairs at the start of each row which are points
+        in world coordinates.  Any further coordinates, such as sizes, are
+        passed through unchanged.  If None, every pair of coordinates is a
+        point.
+    margin : int
+        A number of pixels by which rows may draw beyond their points, such
+        as a marker size or radius, so that rows just outside the view are
+        still produced.
+    cells : int
+        The number of grid columns and rows of the index, at most 64.
+
+    Attributes
+    ----------
+    n_rows : int
+        The total number of rows.
+    candidates : int
+        The number of rows checked against the view by the last call to
+        ``visible``.
+    """
+
+    viewport: Viewport
+    points: int
+    margin: int
+    cells: int
+    n_rows: int
+    candidates: int
+
+    def __init__(
+        self,
+        data: array,
+        coords: int,
+        viewport: Viewport,
+        *,
+        points: int | None = None,
+        margin: int = 0,
+        cells: int = 32,
+    ): ...
+
+    def invalidate(self) -> None:
+        """Forget the spatial index after the data changes in place."""
+
+    def visible(self) -> list[int]:
+        """The indices of the rows which overlap the viewport, in order.
+
+        The result is cached until the viewport changes.
+        """
+
+    def visible_data(self, data: Sequence) -> "VisibleData":
+        """A view of per-row data, such as colors, for the visible rows."""
+
+    def __iter__(self) -> Iterator[array[int]]: ...
+
+    def __len__(self) -> int: ...
+
+    def pack(self, buffer: array[int], rows: int | None = None) -> Iterator[int]:
+        """Pack rows into a flat buffer, yielding the number of rows packed.
+
+        Only the visible rows are projected, directly into the buffer.
+        """
+
+
+class VisibleData(DataView):
+    """The entries of per-row data for the visible rows of a WorldGeometry.
+
+    Parameters
+    ----------
+    geometry : WorldGeometry
+        The geometry whose visible rows are selected.
+    data : Sequence
+        The data with one entry per row of the geometry.
+    """
+
+    geometry: WorldGeometry
+
+    def __init__(self, geometry: WorldGeometry, data: Sequence): ...
@@ -22,8 +22,10 @@ class PicoGraphicsDisplay(Display):
         self.size = display.get_bounds()
         self.framebuf = FrameBuffer(display, self.size[0], self.size[1], RGB565)
 
-    def blit(self, buffer, x, y, w, h):
-        self.framebuf.blit((buffer, w, h, RGB565), x, y)
+    def blit(self, buffer, x, y, w, h, stride=None):
+        if stride is None:
+            stride = w
+        self.framebuf.blit((buffer, w, h, RGB565, stride), x, y)
         self.display.update()
 
 
@@ -34,6 +36,6 @@ class PrestoDisplay(PicoGraphicsDisplay):
         super().__init__(presto.display)
         self.presto = presto
 
-    def blit(self, buffer, x, y, w, h):
-        super().blit(buffer, x, y, w, h)
+    def blit(self, buffer, x, y, w, h, stride=None):
+        super().blit(buffer, x, y, w, h, stride)
         self.presto.update()
@@ -23,7 +23,9 @@ class PicoGraphicsDisplay(Display):
 
     def __init__(self, display: PicoGraphics): ...
 
-    def blit(self, buffer: array, x: int, y: int, w: int, h: int): ...
+    def blit(
+        self, buffer: array, x: int, y: int, w: int, h: int, stride: int | None = None
+    ): ...
 
 
 class PrestoDisplay(PicoGraphicsDisplay):
@@ -31,4 +33,6 @@ class PrestoDisplay(PicoGraphicsDisplay):
 
     def __init__(self, presto: Presto): ...
 
-    def blit(self, buffer: array, x: int, y: int, w: int, h: int): ...
+    def blit(
+        self, buffer: array, x: int, y: int, w: int, h: int, stride: int | None = None
+    ): ...
@@ -6,7 +6,10 @@
 
 from machine import Pin
 import asyncio
-from struct import pack
+from struct import pack, pack_into
+
+from tempe.display import Display
+from tempe.util import ArrayBuffer, copy_rows, expand_palette
 
 
 _NOP = const(b"\x00")
@@ -97,11 +100,19 @@ MADCTL_MH = const(0x04)
 MADCTL_RGB = const(0x00)
 
 
-class ST7789:
+class ST7789(Display):
     """Base class for ST7789-based displays"""
 
     reset_pin: Pin | None
 
+    #: The maximum number of bytes gathered from a strided buffer or
+    #: streamed from the fill pattern per write.
+    chunk_size = 4096
+
+    #: The number of lines of display memory, which hardware scrolling
+    #: wraps around.
+    memory_rows = 320
+
     def __init__(self, size, reset_pin=None):
         self.size = size
         if isinstance(reset_pin, int):
@@ -109,6 +120,20 @@ class ST7789:
         self.reset_pin = reset_pin
         self.x_offset = 0
         self.y_offset = 0
+        self._row_buffer = ArrayBuffer("H")
+        self._bounce = ArrayBuffer("B")
+        # repeated fill color, reused until the color or chunk size changes
+        self._pattern = bytearray()
+        self._pattern_color = -1
+        # current address window, so unchanged CASET/RASET can be skipped
+        self._columns = -1
+        self._rows = -1
+        self._params = bytearray(4)
+        self._madctl = 0
+        # hardware scroll area in screen rows, and the current shift of it
+        self._scroll_top = 0
+        self._scroll_rows = 0
+        self._scroll_shift = 0
 
     def send(self, dc, buf):
         """Send to the display."""
@@ -118,6 +143,17 @@ class ST7789:
         """Send to the display."""
         raise NotImplementedError()
 
+    def send_command(self, command, data=b""):
+        """Send a command and its parameters to the display."""
+        self.send(0, command)
+        self.send(1, data)
+
+    def write_window(self, x, y, w, h, buf_iter):
+        """Write data to a window of display memory."""
+        self.window(x, y, w, h)
+        self.write_to_memory(b"")
+        self.send_iterator(1, buf_iter)
+
     def command(self, command):
         """Send a command to the display."""
         self.send(0, command)
@@ -129,6 +165,8 @@ class ST7789:
     async def reset(self):
         """Perform a hard reset of the screen, if available."""
         if self.reset_pin is not None:
+            self.invalidate_window()
+            self._forget_scroll()
             self.reset_pin(False)
             await asyncio.sleep(0.500)
             self.reset_pin(True)
@@ -136,6 +174,8 @@ class ST7789:
 
     async def soft_reset(self):
         """Perform a soft reset of the screen."""
+        self.invalidate_window()
+        self._forget_scroll()
         self.command(_SWRESET)
         await asyncio.sleep(0.150)
 
@@ -181,28 +221,34 @@ class ST7789:
 
     def set_column_address(self, start, end):
         """Set the column range for writing."""
-        self.command(_CASET)
-        self.data(pack(">HH", start & 0xFFFF, end & 0xFFFF))
+        pack_into(">HH", self._params, 0, start & 0xFFFF, end & 0xFFFF)
+        self.send_command(_CASET, self._params)
+        self._columns = (start << 16) | end
 
     def set_row_address(self, start, end):
         """Set the row range for writing."""
-        self.command(_RASET)
-        self.data(pack(">HH", start & 0xFFFF, end & 0xFFFF))
+        pack_into(">HH", self._params, 0, start & 0xFFFF, end & 0xFFFF)
+        self.send_command(_RASET, self._params)
+        self._rows = (start << 16) | end
+
+    def invalidate_window(self):
+        """Forget the current address window, so it is always re-sent."""
+        self._columns = -1
+        self._rows = -1
 
     def write_to_memory(self, buf):
         """Write data to memory."""
-        self.command(_RAMWR)
-        self.data(buf)
+        self.send_command(_RAMWR, buf)
 
     def partial_area(self, start, end):
         """Define partial mode's area."""
-        self.command(_PTLAR)
-        self.data(pack(">HH", start & 0xFFFF, end & 0xFFFF))
+        self.send_command(_PTLAR, pack(">HH", start & 0xFFFF, end & 0xFFFF))
 
     def vertical_scroll_area(self, top, height, bottom):
         """Define vertical scroll area."""
-        self.command(_VSCRDEF)
-        self.data(pack(">HHH", top & 0xFFFF, height & 0xFFFF, bottom & 0xFFFF))
+        self.send_command(
+            _VSCRDEF, pack(">HHH", top & 0xFFFF, height & 0xFFFF, bottom & 0xFFFF)
+        )
 
     def tearing_effect_off(self):
         """Turn tearing effect line off."""
@@ -210,18 +256,18 @@ class ST7789:
 
     def tearing_effect_on(self, horizontal_blanking=False):
         """Turn tearing effect line on."""
-        self.command(_TEON)
-        self.data(bytes([horizontal_blanking]))
+        self.send_command(_TEON, bytes([horizontal_blanking]))
 
     def memory_data_access_control(self, parameter):
         """Set memory data access parameters."""
-        self.command(_MADCTL)
-        self.data(bytes([parameter]))
+        self.reset_scroll()
+        self.send_command(_MADCTL, bytes([parameter]))
+        self._madctl = parameter
+        self.invalidate_window()
 
     def vertical_scroll_start_address(self, start):
         """Set the start address of the vertical scroll area."""
-        self.command(_VSCSAD)
-        self.data(pack(">H", start & 0xFFFF))
+        self.send_command(_VSCSAD, pack(">H", start & 0xFFFF))
 
     def idle_mode_off(self):
         """Turn idle mode off."""
@@ -233,98 +279,79 @@ class ST7789:
 
     def set_color_mode(self, parameter):
         """Set the color mode."""
-        self.command(_COLMOD)
-        self.data(bytes([parameter]))
+        self.send_command(_COLMOD, bytes([parameter]))
 
     def write_to_memory_continue(self, buf):
         """Continue writing data to memory from last pixel location."""
-        self.command(_WRMEMC)
-        self.data(buf)
+        self.send_command(_WRMEMC, buf)
 
     def set_tear_scanline(self, start):
         """Set the tear scanline start."""
-        self.command(_STE)
-        self.data(pack(">H", start & 0xFFFF))
+        self.send_command(_STE, pack(">H", start & 0xFFFF))
 
     def write_display_brightness(self, parameter):
-        self.command(_WRDISBV)
-        self.data(bytes([parameter]))
+        self.send_command(_WRDISBV, bytes([parameter]))
 
     def write_ctrl_display(self, parameter):
-        self.command(_WRCTRLD)
-        self.data(bytes([parameter]))
+        self.send_command(_WRCTRLD, bytes([parameter]))
 
     def write_adaptive_enhancement(self, parameter):
-        self.command(_WRCACE)
-        self.data(bytes([parameter]))
+        self.send_command(_WRCACE, bytes([parameter]))
 
     def write_adaptive_minimum_brightness(self, parameter):
-        self.command(_WRCABCMB)
-        self.data(bytes([parameter]))
+        self.send_command(_WRCABCMB, bytes([parameter]))
 
     def set_ram_control(self, parameter_1, parameter_2):
-        self.command(_RAMCTRL)
-        self.data(bytes([parameter_1, parameter_2]))
+        self.send_command(_RAMCTRL, bytes([parameter_1, parameter_2]))
 
     def set_rgb_control(self, parameter_1, parameter_2, parameter_3):
-        self.command(_RGBCTRL)
-        self.data(bytes([parameter_1, parameter_2, parameter_3]))
+        self.send_command(_RGBCTRL, bytes([parameter_1, parameter_2, parameter_3]))
 
     def set_porch_control(
         self, parameter_1, parameter_2, parameter_3, parameter_4, parameter_5
     ):
-        self.command(_PORCTRL)
-        self.data(
-            bytes([parameter_1, parameter_2, parameter_3, parameter_4, parameter_5])
+        self.send_command(
+            _PORCTRL,
+            bytes([parameter_1, parameter_2, parameter_3, parameter_4, parameter_5]),
         )
 
     def set_lcm_control(self, parameter_1):
-        self.command(_LCMCTRL)
-        self.data(bytes([parameter_1]))
+        self.send_command(_LCMCTRL, bytes([parameter_1]))
 
     def set_vdv_vrh_enable(self, parameter_1):
-        self.command(_VDVVRHEN)
-        self.data(bytes([parameter_1, 0xFF]))
+        self.send_command(_VDVVRHEN, bytes([parameter_1, 0xFF]))
 
     def set_vrh(self, parameter_1):
-        self.command(_VRHS)
-        self.data(bytes([parameter_1]))
+        self.send_command(_VRHS, bytes([parameter_1]))
 
     def set_vdv(self, parameter_1):
-        self.command(_VDVS)
-        self.data(bytes([parameter_1]))
+        self.send_command(_VDVS, bytes([parameter_1]))
 
     def set_frame_control_1(self, parameter_1, parameter_2, parameter_3):
-        self.command(_FRMCTR1)
-        self.data(bytes([parameter_1, parameter_2, parameter_3]))
+        self.send_command(_FRMCTR1, bytes([parameter_1, parameter_2, parameter_3]))
 
     def set_frame_rate_control(self, parameter_1):
-        self.command(_FRCTRL2)
-        self.data(bytes([parameter_1]))
+        self.send_command(_FRCTRL2, bytes([parameter_1]))
 
     def set_power_control_1(self, parameter_1, parameter_2):
-        self.command(_PWCTRL1)
-        self.data(bytes([parameter_1, parameter_2]))
+        self.send_command(_PWCTRL1, bytes([parameter_1, parameter_2]))
 
     def set_gate_control(self, parameter_1):
-        self.command(_GCTRL)
-        self.data(bytes([parameter_1]))
+        self.send_command(_GCTRL, bytes([parameter_1]))
 
     def set_vcom(self, parameter_1):
-        self.command(_VCOMS)
-        self.data(bytes([parameter_1]))
+        self.send_command(_VCOMS, bytes([parameter_1]))
 
     def set_gate_adjustment(self, parameter_1, parameter_2, parameter_3, parameter_4):
-        self.command(_GTADJ)
-        self.data(bytes([parameter_1, parameter_2, parameter_3, parameter_4]))
+        self.send_command(
+            _GTADJ, bytes([parameter_1, parameter_2, parameter_3, parameter_4])
+        )
 
     def set_positive_gamma(self, curve):
-        self.command(_PVGAMCTRL)
-        self.data(curve)
+        self.send_command(_PVGAMCTRL, curve)
 
     def set_negative_gamma(self, curve):
-        self.command(_NVGAMCTRL)
-        self.data(curve)
+        self.send_command(_NVGAMCTRL, curve)
 
     async def sleep(self, value):
         if value:
@@ -339,18 +366,127 @@ class ST7789:
             await self.inverse_off()
 
     def window(self, x, y, w, h):
-        self.set_column_address(self.x_offset + x, self.x_offset + x + w - 1)
-        self.set_row_address(self.y_offset + y, self.y_offset + y + h - 1)
+        """Set the address window, skipping commands for unchanged ranges."""
+        x0 = self.x_offset + x
+        y0 = self.y_offset + y
+        if (x0 << 16) | (x0 + w - 1) != self._columns:
+            self.set_column_address(x0, x0 + w - 1)
+        if (y0 << 16) | (y0 + h - 1) != self._rows:
+            self.set_row_address(y0, y0 + h - 1)
+
+    def scroll(self, rect, dx, dy):
+        """Shift the pixels of a full-width band of rows using hardware scrolling."""
+        x, y, w, h = rect
+        if (
+            dx
+            or self._madctl & MADCTL_MV
+            or x > 0
+            or x + w < self.size[0]
+            or y < 0
+            or y + h > self.size[1]
+        ):
+            # hardware scrolling only moves whole lines of memory
+            return False
+        if y != self._scroll_top or h != self._scroll_rows:
+            if self._scroll_shift:
+                # memory is already shifted within another area
+                return False
+            self._scroll_top = y
+            self._scroll_rows = h
+            first = self.y_offset + y
+            bottom = self.memory_rows - first - h
+            if self._madctl & MADCTL_MY:
+                first, bottom = bottom, first
+            self.vertical_scroll_area(first, h, bottom)
+        self._scroll_shift = (self._scroll_shift - dy) % h
+        self._send_scroll_start()
+        return True
+
+    def reset_scroll(self):
+        """Undo any hardware scrolling, so memory rows match screen rows."""
+        if self._scroll_shift:
+            self._scroll_shift = 0
+            self._send_scroll_start()
+
+    def _forget_scroll(self):
+        self._scroll_top = 0
+        self._scroll_rows = 0
+        self._scroll_shift = 0
+
+    def _send_scroll_start(self):
+        first = self.y_offset + self._scroll_top
+        n = self._scroll_rows
+        shift = self._scroll_shift
+        if self._madctl & MADCTL_MY:
+            # memory rows run upwards, so the shift is reversed
+            first = self.memory_rows - first - n
+            shift = -shift % n
+        self.vertical_scroll_start_address(first + shift)
+
+    def _spans(self, y, h):
+        """Split rows into runs which are contiguous in scrolled memory.
+
+        Yields the memory row, the first row of the run relative to y, and
+        the number of rows in the run.
+        """
+        top = self._scroll_top
+        n = self._scroll_rows
+        end = y + h
+        if end <= top or y >= top + n:
+            yield y, 0, h
+            return
+        start = y
+        if start < top:
+            yield start, 0, top - start
+            start = top
+        stop = min(end, top + n)
+        shift = self._scroll_shift
+        while start < stop:
+            row = top + (start - top + shift) % n
+            rows = min(stop - start, top + n - row)
+            yield row, start - y, rows
+            start += rows
+        if end > stop:
+            yield stop, stop - y, end - stop
 
     def clear(self):
         self.fill(0, 0, self.size[0], self.size[1], b"\x00\x00")
 
     def fill(self, x, y, w, h, color=b"\xff\xff"):
-        self.window(x, y, w, h)
-        row_bytes = color * w
-        write = self.spi.write
-        self.write_to_memory(b"")
-        self.send_iterator(1, (row_bytes for _ in range(h)))
+        if not isinstance(color, int):
+            color = color[0] | (color[1] << 8)
+        if self._scroll_shift:
+            for row_y, start, rows in self._spans(y, h):
+                self.write_window(x, row_y, w, rows, self._fill_chunks(2 * w * rows, color))
+            return
+        self.write_window(x, y, w, h, self._fill_chunks(2 * w * h, color))
+
+    def _fill_pattern(self, color):
+        """Get a chunk-sized buffer of the color, rebuilding it only if needed."""
+        pattern = self._pattern
+        size = self.chunk_size & ~1
+        if color != self._pattern_color or len(pattern) != size:
+            pattern = bytearray(size)
+            pattern[0] = color & 0xFF
+            pattern[1] = color >> 8
+            # double the filled region until the buffer is full
+            n = 2
+            while n < size:
+                m = min(n, size - n)
+                pattern[n : n + m] = pattern[:m]
+                n += m
+            self._pattern = pattern
+            self._pattern_color = color
+        return pattern
+
+    def _fill_chunks(self, n, color):
+        """Stream n bytes of the color from the pattern buffer."""
+        pattern = self._fill_pattern(color)
+        size = len(pattern)
+        while n > size:
+            yield pattern
+            n -= size
+        yield memoryview(pattern)[:n]
 
     async def init(self):
         await self.soft_reset()
@@ -365,21 +501,61 @@ class ST7789:
     def blit(self, buf, x, y, w, h, stride=None):
         self._blit565(buf, x, y, w, h, stride)
 
+    def blit_palette(self, buf, x, y, w, h, stride, format, palette):
+        self._blit_palette(buf, x, y, w, h, stride, format, palette)
+
+    def _blit_palette(self, buf, x, y, w, h, stride, format, palette):
+        """Expand a palette-indexed buffer to 565 and transfer it to the display."""
+        row = self._row_buffer.get(w)
+        if self._scroll_shift:
+            for row_y, start, rows in self._spans(y, h):
+                self.write_window(
+                    x,
+                    row_y,
+                    w,
+                    rows,
+                    self._expand_rows(buf, w, start, rows, stride, format, palette, row),
+                )
+            return
+        self.write_window(
+            x, y, w, h, self._expand_rows(buf, w, 0, h, stride, format, palette, row)
+        )
+
+    def _expand_rows(self, buf, w, start, h, stride, format, palette, row):
+        for i in range(start, start + h):
+            expand_palette(row, buf, i, w, stride, palette, format)
+            yield row
+
     def _blit565(self, buf, x, y, w, h, stride=None):
         """Transfer a 565 buffer to the display."""
         buf = memoryview(buf)
-        self.window(x, y, w, h)
-        if stride is None:
+        if self._scroll_shift:
+            if stride is None:
+                stride = w
+            for row_y, start, rows in self._spans(y, h):
+                self._write565(buf[2 * stride * start :], x, row_y, w, rows, stride)
+            return
+        self._write565(buf, x, y, w, h, stride)
+
+    def _write565(self, buf, x, y, w, h, stride):
+        if stride is None or stride == w:
             # fast path for contiguous memory
-            self.write_to_memory(buf[: 2 * w * h])
+            self.write_window(x, y, w, h, (buf[: 2 * w * h],))
         else:
-            buf = memoryview(buf)
-            self.window(x, y, w, h)
-            self.write_to_memory(b"")
-            self.send_iterator(
-                1,
-                (
-                    buf[offset : offset + 2 * w]
-                    for offset in range(0, 2 * stride * h, 2 * stride)
-                ),
-            )
+            self.write_window(x, y, w, h, self._gather_rows(buf, w, h, stride))
+
+    def _gather_rows(self, buf, w, h, stride):
+        """Copy rows of a strided buffer into contiguous chunks."""
+        row_bytes = 2 * w
+        rows = self.chunk_size // row_bytes
+        if rows <= 1:
+            # a chunk can't hold more than a row, so send rows in place
+            for offset in range(0, 2 * stride * h, 2 * stride):
+                yield buf[offset : offset + row_bytes]
+            return
+        bounce = self._bounce
+        for start in range(0, h, rows):
+            n = min(rows, h - start)
+            chunk = bounce.get(n * row_bytes)
+            copy_rows(chunk, buf, 2 * stride * start, row_bytes, 2 * stride, n)
+            yield chunk
@@ -11,6 +11,8 @@ import asyncio
 from struct import pack
 from typing import Literal
 
+from tempe.display import Display
+
 # COLMOD Flags
 COLMOD_65K = const(0x05)
 COLMOD_262K = const(0x06)
@@ -29,11 +31,35 @@ MADCTL_MH = const(0x04)
 MADCTL_RGB = const(0x00)
 
 
-class ST7789:
-    """Base class for ST7789-based displays"""
+class ST7789(Display):
+    """Base class for ST7789-based displays
+
+    The driver remembers the current column and row address window, and
+    only sends CASET and RASET commands when they change, since many small
+    updates to the same region would otherwise spend as much time on
+    commands as on pixel data.  If the display's memory addressing is
+    changed other than through this class, call ``invalidate_window``.
+
+    Full-width bands of rows can be scrolled using the controller's
+    vertical scrolling, which moves the displayed image without sending any
+    pixels.  Display memory is then shifted within the band, and the driver
+    remaps the rows of later writes to match.  Hardware scrolling is only
+    used when memory rows run along the screen's y-axis, so not when the
+    MADCTL_MV flag is set.
+    """
 
     reset_pin: Pin
 
+    #: The maximum number of bytes gathered from a strided buffer into each
+    #: write when blitting, and the size of the pattern buffer used by
+    #: ``fill``.  Larger values mean fewer, longer bus writes at the cost of
+    #: larger buffers.
+    chunk_size: int = 4096
+
+    #: The number of lines of display memory, which hardware scrolling
+    #: wraps around.
+    memory_rows: int = 320
+
     def __init__(self, size:tuple[int, int], reset_pin: Pin | int | None = None): ...
 
     def send(self, dc: int, buf: Iterable[int]) -> None:
@@ -42,6 +68,33 @@ class ST7789:
     def send_iterator(self, dc, buf_iter: Iterator[int]) -> None:
         """Send to the display."""
 
+    def send_command(self, command: bytes, data: Iterable[int] = b"") -> None:
+        """Send a command and its parameters to the display.
+
+        Subclasses may override this to send the command and parameters as
+        a single transaction.
+        """
+
+    def write_window(
+        self, x: int, y: int, w: int, h: int, buf_iter: Iterable[Iterable[int]]
+    ) -> None:
+        """Write data to a window of display memory.
+
+        The address window is only sent if it has changed, followed by a
+        RAMWR command and the data from each buffer in turn.  Subclasses
+        may override this to send everything as a single transaction.
+
+        Parameters
+        ----------
+        x, y, w, h : int
+            The window of the display to write to.
+        buf_iter : Iterable[Iterable[int]]
+            The buffers of RGB565 pixel data to write.
+        """
+
+    def invalidate_window(self) -> None:
+        """Forget the current address window, so it is always re-sent."""
+
     def command(self, command: int) -> None:
         """Send a command to the display."""
 
@@ -164,12 +217,62 @@ class ST7789:
 
     async def inversion(self, value: bool) -> None: ...
 
-    def window(self, x: int, y: int, w: int, h: int) -> None: ...
+    def window(self, x: int, y: int, w: int, h: int) -> None:
+        """Set the address window, skipping commands for unchanged ranges."""
+
+    def scroll(self, rect: tuple[int, int, int, int], dx: int, dy: int) -> bool:
+        """Shift the pixels of a full-width band of rows using hardware scrolling.
+
+        The band becomes the hardware scroll area, and the scroll start
+        address is moved so that the contents appear ``dy`` rows lower,
+        wrapping around within the band.  Returns False without changing
+        anything if the rectangle isn't a band of whole rows of the screen,
+        if ``dx`` is non-zero, if the display is rotated so that memory rows
+        are vertical, or if a different band is currently scrolled.
+
+        Changing the scroll area with ``vertical_scroll_area`` or
+        ``vertical_scroll_start_address`` directly will break the remapping
+        of rows, so use ``reset_scroll`` first.
+        """
+
+    def reset_scroll(self) -> None:
+        """Undo any hardware scrolling, so memory rows match screen rows.
+
+        The contents of the scrolled band will appear to jump, so it should
+        be redrawn afterwards.  This is called automatically when the memory
+        access mode is changed.
+        """
 
     def clear(self) -> None: ...
 
-    def fill(self, x: int, y: int, w: int, h: int, color=b"\xff\xff") -> None: ...
+    def fill(self, x: int, y: int, w: int, h: int, color: int | bytes = b"\xff\xff") -> None:
+        """Fill a window of the display with a single color.
+
+        The color is either an RGB565 int, as used by Surfaces, or the 2
+        bytes to send for each pixel.  A buffer of ``chunk_size`` bytes of
+        the color is built once and re-sent as many times as needed, so a
+        full-screen clear takes a handful of writes.
+        """
 
     async def init(self, rotation: Literal[0, 90, 180, 270] = 0) -> None: ...
 
-    def blit(self, buf: Sequence[int], x: int, y: int, w: int, h: int, stride: int | None = None) -> None: ...
+    def blit(self, buf: Sequence[int], x: int, y: int, w: int, h: int, stride: int | None = None) -> None:
+        """Send RGB565 pixels to a window of the display.
+
+        If a stride is given, the rows of the buffer are that many pixels
+        apart, and are gathered into chunks of at most ``chunk_size`` bytes
+        which are each sent with a single write.
+        """
+
+    def blit_palette(
+        self,
+        buf: Sequence[int],
+        x: int,
+        y: int,
+        w: int,
+        h: int,
+        stride: int,
+        format: int,
+        palette: Sequence[int],
+    ) -> None:
+        """Expand palette-indexed pixels to RGB565 a row at a time and send them."""
@@ -23,6 +23,8 @@ class ST7789_SPI(ST7789):
         self.spi = spi
         self.cs_pin = cs_pin
         self.dc_pin = dc_pin
+        # whether CS is being held low for a whole window write
+        self._selected = False
 
     def send(self, dc, buf):
         """Send bytes to the device via SPI"""
@@ -30,7 +32,8 @@ class ST7789_SPI(ST7789):
             self.cs_pin(0)
             self.dc_pin(dc)
             self.spi.write(buf)
-            self.cs_pin(1)
+            if not self._selected:
+                self.cs_pin(1)
 
     def send_iterator(self, dc, buf_iter):
         """Send to the display."""
@@ -40,4 +43,28 @@ class ST7789_SPI(ST7789):
         for buf in buf_iter:
             if buf:
                 write(buf)
-        self.cs_pin(1)
+        if not self._selected:
+            self.cs_pin(1)
+
+    def send_command(self, command, data=b""):
+        """Send a command and its parameters in a single transaction."""
+        write = self.spi.write
+        dc = self.dc_pin
+        self.cs_pin(0)
+        dc(0)
+        write(command)
+        if data:
+            dc(1)
+            write(data)
+        if not self._selected:
+            self.cs_pin(1)
+
+    def write_window(self, x, y, w, h, buf_iter):
+        """Set the window if changed and write data to memory in one transaction."""
+        self.cs_pin(0)
+        self._selected = True
+        try:
+            super().write_window(x, y, w, h, buf_iter)
+        finally:
+            self._selected = False
+            self.cs_pin(1)
@@ -11,7 +11,12 @@ from .base import ST7789
 
 
 class ST7789_SPI(ST7789):
-    """Generic support for SPI-based ST7789 screens."""
+    """Generic support for SPI-based ST7789 screens.
+
+    Commands are sent together with their parameters while CS is held
+    low, and writes to display memory send any changed address window,
+    the RAMWR command and the pixel data in a single transaction.
+    """
 
     spi: SPI
 
@@ -33,3 +38,15 @@ class ST7789_SPI(ST7789):
 
     def send_iterator(self, dc, buf_iter: Iterator[int]) -> None:
         """Send iterated bytes to the device via SPI"""
+
+    def send_command(self, command: bytes, data: Iterable[int] = b"") -> None:
+        """Send a command and its parameters in a single transaction."""
+
+    def write_window(
+        self, x: int, y: int, w: int, h: int, buf_iter: Iterable[Iterable[int]]
+    ) -> None:
+        """Set the window if changed and write data to memory in one transaction.
+
+        This holds CS low while the base class sends any changed address
+        window, the RAMWR command and the data.
+        """
@@ -0,0 +1,139 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""Soak test of heap fragmentation under repeated Component updates.
+
+This is too slow to be part of the regular test suite.  Run it in
+micropython from the root of the repository, eg.::
+
+    MICROPYPATH=src micropython tests/tempe/soak_updates.py 100000
+
+It repeatedly changes the data of a collection of plots and labels, moves
+them around and periodically refreshes the surface into a framebuffer.
+The largest allocatable block and the free memory are sampled as it runs;
+the test fails if the largest free block shrinks or the retained heap
+grows by more than a small tolerance.
+"""
+
+from array import array
+import framebuf
+import gc
+import sys
+
+from tempe.component import BarPlot, Label, LinePlot, ScatterPlot
+from tempe.data_view import DataView
+from tempe.display import FrameBufferDisplay
+from tempe.surface import Surface
+
+WIDTH = 160
+HEIGHT = 120
+N_VALUES = 64
+REFRESH_EVERY = 50
+SAMPLE_EVERY = 5000
+
+#: Allowed loss of largest free block, as a fraction of the initial size.
+FRAGMENTATION_TOLERANCE = 0.05
+
+#: Allowed growth of retained memory in bytes.
+RETAINED_TOLERANCE = 2048
+
+
+def largest_block(limit):
+    """Find the size of the largest bytearray which can be allocated."""
+    low = 0
+    high = limit
+    while low < high:
+        mid = (low + high + 1) // 2
+        gc.collect()
+        try:
+            block = bytearray(mid)
+        except MemoryError:
+            high = mid - 1
+        else:
+            del block
+            low = mid
+    gc.collect()
+    return low
+
+
+def sample():
+    gc.collect()
+    return gc.mem_alloc(), largest_block(gc.mem_free())
+
+
+def build():
+    surface = Surface()
+    values = array("h", bytearray(2 * N_VALUES))
+    components = [
+        LinePlot(surface, (0, 0, 80, 60), DataView(values), value_range=(0, 255)),
+        ScatterPlot(surface, (80, 0, 80, 60), DataView(values), value_range=(0, 255)),
+        BarPlot(surface, (0, 60, 80, 60), DataView(values), value_range=(0, 255)),
+        Label(surface, (80, 60, 80, 20), 0),
+    ]
+    for component in components:
+        component.draw()
+    return surface, values, components
+
+
+def update(step, values, components):
+    for i in range(len(values)):
+        values[i] = (step * 7 + i * 13) & 0xFF
+    for component in components[:-1]:
+        component.update()
+    label = components[-1]
+    label.value = step
+    if step & 1:
+        label.move((80, 60 + (step & 31), 80, 20))
+    else:
+        label.update()
+
+
+def soak(iterations):
+    buf = bytearray(2 * WIDTH * HEIGHT)
+    fbuf = framebuf.FrameBuffer(buf, WIDTH, HEIGHT, framebuf.RGB565)
+    display = FrameBufferDisplay(fbuf, (WIDTH, HEIGHT))
+    working_buffer = bytearray(2 * WIDTH * 21)
+
+    surface, values, components = build()
+
+    # warm up so caches and buffers reach their working size
+    for step in range(REFRESH_EVERY):
+        update(step, values, components)
+    surface.refresh(display, working_buffer)
+
+    initial_alloc, initial_block = sample()
+    print("initial", initial_alloc, initial_block)
+    worst_block = initial_block
+    final_alloc = initial_alloc
+    for step in range(iterations):
+        update(step, values, components)
+        if step % REFRESH_EVERY == 0:
+            surface.refresh(display, working_buffer)
+        if step % SAMPLE_EVERY == 0 and step:
+            final_alloc, block = sample()
+            worst_block = min(worst_block, block)
+            print(step, final_alloc, block)
+
+    surface.refresh(display, working_buffer)
+    final_alloc, block = sample()
+    worst_block = min(worst_block, block)
+    print("final", final_alloc, block)
+
+    ok = True
+    if worst_block < initial_block * (1 - FRAGMENTATION_TOLERANCE):
+        print("FAIL: largest free block fell from", initial_block, "to", worst_block)
+        ok = False
+    if final_alloc - initial_alloc > RETAINED_TOLERANCE:
+        print("FAIL: retained memory grew from", initial_alloc, "to", final_alloc)
+        ok = False
+    return ok
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        iterations = int(sys.argv[1])
+    else:
+        iterations = 100000
+    if not soak(iterations):
+        sys.exit(1)
@@ -9,6 +9,11 @@ from tempe.display import FileDisplay
 
 working_buffer = bytearray(320 * 61 * 2)
 
+# Once pools and scratch buffers are warm, a refresh of an example only
+# allocates a few small iterator objects.  Anything allocated per item,
+# such as rasters, buffers or tuples, exceeds this.
+ALLOWED_BYTES_PER_REFRESH = 8192
+
 
 class TestExamples(unittest.TestCase):
     def test_examples(self):
@@ -36,6 +41,50 @@ class TestExamples(unittest.TestCase):
 
                 self.assert_files_equal(output, result)
 
+    def test_steady_state_allocation(self):
+        """Repeated refreshes of examples allocate only iterator objects."""
+
+        examples = [
+            "examples/polar_example.py",
+            "examples/lines_example.py",
+            "examples/rounded_rect_example.py",
+            "examples/shapes_example.py",
+            "examples/line_plot_example.py",
+            "examples/scatter_plot_example.py",
+            "examples/polar_plot_example.py",
+            "examples/hello_world.py",
+        ]
+        for file in examples:
+            with self.subTest(example=file):
+                gc.collect()
+                code = open(file, "r").read()
+                locals = {"__name__": "__test__"}
+                exec(code, locals)
+                surface = locals["surface"]
+
+                display = FileDisplay("example.rgb565", (320, 240))
+                allocated = []
+                retained = []
+                with display:
+                    for i in range(3):
+                        surface.damage((0, 0, 320, 240))
+                        gc.collect()
+                        start = gc.mem_alloc()
+                        gc.disable()
+                        try:
+                            surface.refresh(display, working_buffer)
+                            allocated.append(gc.mem_alloc() - start)
+                        finally:
+                            gc.enable()
+                        gc.collect()
+                        retained.append(gc.mem_alloc())
+
+                # after the first refresh, caches and pools are warm
+                self.assertLessEqual(allocated[1], ALLOWED_BYTES_PER_REFRESH)
+                self.assertEqual(allocated[1], allocated[2])
+                self.assertEqual(retained[1], retained[2])
+                del surface, locals
+
     def display_output(self, surface, name="example.rgb565"):
         display = FileDisplay(name, (320, 240))
 
@@ -0,0 +1,158 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+from array import array
+import unittest
+
+from tempe.data_view import DataView, Repeat
+from tempe.geometry import (
+    ColumnGeometry, Extend, ProductGeometry, RowGeometry, Select, Transformed
+)
+
+
+class TestCompositeGeometry(unittest.TestCase):
+    def assert_rows(self, geometry, expected):
+        result = []
+        buffers = []
+        for row in geometry:
+            result.append(list(row))
+            if not any(row is buffer for buffer in buffers):
+                buffers.append(row)
+        self.assertEqual(result, expected)
+        # all rows of the same size are yielded in a single buffer
+        self.assertEqual(len(buffers), 1)
+
+    def test_column_geometry(self):
+        geometry = ColumnGeometry([array("h", [1, 2, 3]), Repeat(5), [7, 8, 9, 10]])
+        self.assert_rows(geometry, [[1, 5, 7], [2, 5, 8], [3, 5, 9]])
+
+    def test_column_geometry_pack(self):
+        xs = array("h", range(10))
+        ys = DataView(array("h", range(-10, 0)))
+        geometry = ColumnGeometry([xs, ys, Repeat(3)])
+        buffer = array("h", bytearray(2 * 3 * 4))
+
+        packed = []
+        for n in geometry.pack(buffer):
+            packed.extend(buffer[: 3 * n])
+
+        self.assertEqual(packed, [v for row in geometry for v in row])
+
+    def test_column_geometry_pack_fallback(self):
+        geometry = ColumnGeometry([[1, 2, 3], Repeat(5)])
+        buffer = array("h", bytearray(2 * 2 * 2))
+
+        counts = []
+        packed = []
+        for n in geometry.pack(buffer):
+            counts.append(n)
+            packed.extend(buffer[: 2 * n])
+
+        self.assertEqual(counts, [2, 1])
+        self.assertEqual(packed, [1, 5, 2, 5, 3, 5])
+
+    def test_column_geometry_pack_other_item_sizes(self):
+        xs = array("i", [1, -2, 30000, 4])
+        ys = array("b", [-1, 2, -3, 4])
+        zs = memoryview(array("i", [0, 1, 2, 3]))
+        geometry = ColumnGeometry([xs, ys, Repeat(3), array("h", [5, 6, 7, 8])])
+        buffer = array("h", bytearray(2 * 4 * 3))
+
+        packed = []
+        for n in geometry.pack(buffer):
+            packed.extend(buffer[: 4 * n])
+
+        # 32-bit and 8-bit columns are copied row by row, not as 16-bit
+        self.assertEqual(packed[:8], [1, -1, 3, 5, -2, 2, 3, 6])
+        self.assertEqual(packed, [v for row in geometry for v in row])
+
+        geometry = ColumnGeometry([zs, array("B", [1, 2, 3, 4])])
+        buffer = array("h", bytearray(2 * 2 * 4))
+        packed = []
+        for n in geometry.pack(buffer):
+            packed.extend(buffer[: 2 * n])
+        self.assertEqual(packed, [0, 1, 1, 2, 2, 3, 3, 4])
+
+    def test_extend(self):
+        geometry = Extend([
+            RowGeometry.from_lists([(1, 2), (3, 4)]),
+            ColumnGeometry([array("h", [5, 6]), Repeat(7)]),
+        ])
+        self.assertEqual(geometry.coords, 4)
+        self.assert_rows(geometry, [[1, 2, 5, 7], [3, 4, 6, 7]])
+
+    def test_product(self):
+        geometry = ProductGeometry((
+            RowGeometry.from_lists([(1,), (2,)]),
+            RowGeometry.from_lists([(3, 4), (5, 6)]),
+        ))
+        self.assertEqual(geometry.coords, 3)
+        self.assert_rows(geometry, [[1, 3, 4], [1, 5, 6], [2, 3, 4], [2, 5, 6]])
+
+    def test_rows_are_shared(self):
+        geometry = ColumnGeometry([array("h", [1, 2]), Repeat(5)])
+
+        # collecting rows gives the one buffer, holding the last row
+        rows = list(geometry)
+        self.assertIs(rows[0], rows[1])
+        self.assertEqual(list(rows[0]), [2, 5])
+
+        # rows must be copied to keep them
+        rows = [array("h", row) for row in geometry]
+        self.assertEqual([list(row) for row in rows], [[1, 5], [2, 5]])
+
+    def test_select(self):
+        geometry = Select(RowGeometry.from_lists([(1, 2, 3), (4, 5, 6)]), [2, 0])
+        self.assertEqual(len(geometry), 2)
+        self.assert_rows(geometry, [[3, 1], [6, 4]])
+
+
+class TestTransformed(unittest.TestCase):
+    def test_translate(self):
+        geometry = Transformed(RowGeometry.from_lists([(1, 2, 3, 4), (-5, 6, 7, -8)]))
+        geometry.set_matrix(1, 0, 0, 1, 10, 20)
+        result = [list(row) for row in geometry]
+        self.assertEqual(result, [[11, 22, 13, 24], [5, 26, 17, 12]])
+
+    def test_rotate(self):
+        geometry = Transformed(RowGeometry.from_lists([(10, 0, 0, 10)]))
+        geometry.set_rotation(90, tx=100, ty=50)
+        result = [list(row) for row in geometry]
+        self.assertEqual(result, [[100, 60, 90, 50]])
+
+    def test_points(self):
+        # only the centers of circles are transformed
+        geometry = Transformed(RowGeometry.from_lists([(1, 2, 5), (3, 4, 6)]), points=1)
+        geometry.set_matrix(2, 0, 0, 2, 1, 1)
+        result = [list(row) for row in geometry]
+        self.assertEqual(result, [[3, 5, 5], [7, 9, 6]])
+
+    def test_pack(self):
+        geometry = Transformed(RowGeometry.from_lists([(i, -i) for i in range(5)]))
+        geometry.set_rotation(180, tx=3, ty=4)
+        buffer = array("h", bytearray(2 * 2 * 2))
+
+        packed = []
+        for n in geometry.pack(buffer):
+            packed.extend(buffer[: 2 * n])
+
+        self.assertEqual(packed, [v for row in geometry for v in row])
+        self.assertEqual(packed[:4], [3, 4, 2, 5])
+
+    def test_bounds(self):
+        geometry = Transformed(RowGeometry.from_lists([(0, 0, 10, 0), (0, 5, 10, 5)]))
+        geometry.set_matrix(1, 0, 0, 1, 10, 20)
+        self.assertEqual(geometry.bounds(), (10, 20, 20, 25))
+
+        # source extent is cached until invalidated
+        geometry.set_rotation(90)
+        self.assertEqual(geometry.bounds(), (-5, 0, 0, 10))
+
+
+if __name__ == "__main__":
+    result = unittest.main()
+    if not result.wasSuccessful():
+        import sys
+
+        sys.exit(1)
@@ -0,0 +1,171 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+import framebuf
+import unittest
+
+from tempe.display import FrameBufferDisplay
+from tempe.group import Group
+from tempe.shapes import HLines, Rectangles, VLines
+from tempe.surface import Surface, BACKGROUND, DRAWING
+from tempe.data_view import Repeat
+from tempe.window import Window
+
+
+class CountingRectangles(Rectangles):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.draws = 0
+
+    def draw_raster(self, raster):
+        self.draws += 1
+        super().draw_raster(raster)
+
+
+class TestGroup(unittest.TestCase):
+
+    def setUp(self):
+        self.display_buffer = bytearray(2 * 60 * 40)
+        self.display = FrameBufferDisplay(
+            framebuf.FrameBuffer(self.display_buffer, 60, 40, framebuf.RGB565),
+            (60, 40),
+        )
+
+    def render(self, surface, display_buffer=None):
+        if display_buffer is None:
+            display_buffer = bytearray(2 * 60 * 40)
+        display = FrameBufferDisplay(
+            framebuf.FrameBuffer(display_buffer, 60, 40, framebuf.RGB565),
+            (60, 40),
+        )
+        surface.damage((0, 0, 60, 40))
+        surface.refresh(display, bytearray(2 * 60 * 10))
+        return display_buffer
+
+    def make_children(self):
+        return [
+            Rectangles([(0, 0, 20, 10)], Repeat(0xFFFF)),
+            HLines([(0, 12, 30)], Repeat(0x001F)),
+            VLines([(5 * i, 0, 30) for i in range(8)], Repeat(0xF800), clip=(0, 0, 25, 15)),
+        ]
+
+    def expected(self, dx, dy, clip=None):
+        surface = Surface()
+        surface.rectangles(BACKGROUND, (0, 0, 60, 40), "#000000")
+        surface.rectangles(DRAWING, (dx, dy, 20, 10), 0xFFFF, clip=clip)
+        surface.hlines(DRAWING, (dx, dy + 12, 30), 0x001F, clip=clip)
+        x, y, w, h = dx, dy, 25, 15
+        if clip is not None:
+            x0 = max(x, clip[0])
+            y0 = max(y, clip[1])
+            x, y, w, h = x0, y0, min(x + w, clip[0] + clip[2]) - x0, min(y + h, clip[1] + clip[3]) - y0
+        surface.vlines(DRAWING, [(dx + 5 * i, dy, 30) for i in range(8)], 0xF800, clip=(x, y, w, h))
+        return self.render(surface)
+
+    def test_draw(self):
+        surface = Surface()
+        surface.rectangles(BACKGROUND, (0, 0, 60, 40), "#000000")
+        group = Group(self.make_children(), offset=(10, 5))
+        surface.add_shape(DRAWING, group)
+
+        self.assertEqual(group._bounds, (9, 5, 32, 15))
+        self.assertEqual(self.render(surface), self.expected(10, 5))
+
+    def test_move(self):
+        surface = Surface()
+        surface.rectangles(BACKGROUND, (0, 0, 60, 40), "#000000")
+        group = Group(self.make_children(), offset=(10, 5))
+        surface.add_shape(DRAWING, group)
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        group.update(offset=(20, 10))
+
+        self.assertEqual(surface._damage, [(9, 5, 32, 15), (19, 10, 32, 15)])
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+        self.assertEqual(self.display_buffer, self.expected(20, 10))
+
+    def test_clip(self):
+        surface = Surface()
+        surface.rectangles(BACKGROUND, (0, 0, 60, 40), "#000000")
+        group = Group(self.make_children(), offset=(10, 5), clip=(12, 6, 20, 20))
+        surface.add_shape(DRAWING, group)
+
+        self.assertEqual(self.render(surface), self.expected(10, 5, (12, 6, 20, 20)))
+
+        group.update(offset=(15, 10))
+
+        self.assertEqual(group.clip, (17, 11, 20, 20))
+        self.assertEqual(self.render(surface), self.expected(15, 10, (17, 11, 20, 20)))
+
+    def test_child_update(self):
+        surface = Surface()
+        surface.rectangles(BACKGROUND, (0, 0, 60, 40), "#000000")
+        rectangle = Rectangles([(0, 0, 5, 5)], Repeat(0xFFFF))
+        group = Group([rectangle], offset=(10, 5))
+        surface.add_shape(DRAWING, group)
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        rectangle.update(geometry=[(20, 20, 5, 5)])
+
+        self.assertEqual(surface._damage, [(10, 5, 5, 5), (30, 25, 5, 5)])
+        # bounds grow to cover the moved child
+        self.assertEqual(group._bounds, (10, 5, 25, 25))
+
+    def test_culled(self):
+        surface = Surface()
+        surface.rectangles(BACKGROUND, (0, 0, 60, 40), "#000000")
+        inside = CountingRectangles([(0, 0, 10, 5)], Repeat(0xFFFF))
+        outside = CountingRectangles([(0, 30, 10, 5)], Repeat(0xFFFF))
+        group = Group([inside, outside])
+        surface.add_shape(DRAWING, group)
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        # five strips of 9 rows: the last misses the whole group
+        self.assertEqual((inside.draws, outside.draws), (1, 1))
+        self.assertEqual(group.culled_draws, 8)
+
+    def test_remove(self):
+        surface = Surface()
+        rectangle = Rectangles([(0, 0, 5, 5)], Repeat(0xFFFF))
+        group = Group([rectangle], offset=(10, 5))
+        surface.add_shape(DRAWING, group)
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        group.remove_shape(rectangle)
+
+        self.assertIsNone(rectangle.surface)
+        self.assertEqual(surface._damage, [(10, 5, 5, 5)])
+
+    def make_window_surface(self, offset, clip=None):
+        surface = Surface()
+        surface.rectangles(BACKGROUND, (0, 0, 60, 40), "#000000")
+        window = Window(offset=offset, clip=clip)
+        window.subsurface.hlines(DRAWING, [(i % 7, i, 20 + i % 13) for i in range(40)], "white")
+        window.update()
+        return surface, window
+
+    def test_window_scroll(self):
+        surface, window = self.make_window_surface((0, 0), (0, 0, 30, 20))
+        group = Group([window], offset=(10, 5), clip=(10, 5, 25, 30))
+        surface.add_shape(DRAWING, group)
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        window.update(offset=(0, -5))
+
+        # the window's clip, moved by the group offset and clipped by its clip
+        self.assertEqual(surface._damage, [(10, 5, 25, 20)])
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        expected_surface, expected_window = self.make_window_surface((10, 0), (10, 5, 25, 20))
+        expected_surface.add_shape(DRAWING, expected_window)
+        self.assertEqual(self.display_buffer, self.render(expected_surface))
+
+
+if __name__ == "__main__":
+    result = unittest.main()
+    if not result.wasSuccessful():
+        import sys
+
+        sys.exit(1)
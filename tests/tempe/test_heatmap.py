@@ -0,0 +1,149 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+from array import array
+import framebuf
+import unittest
+
+from tempe.heatmap import Heatmap
+from tempe.raster import Raster
+from tempe.surface import Surface, DRAWING
+
+
+COLORMAP = array("H", range(0, 0x10000, 256))
+
+
+class TestHeatmap(unittest.TestCase):
+
+    def expected(self, heatmap, rect):
+        """Pixels sampled from the nearest cell, one at a time."""
+        raster = Raster.from_rect(*rect)
+        x, y, w, h = heatmap.rect
+        low, high = heatmap.value_range
+        for py in range(max(y, rect[1]), min(y + h, rect[1] + rect[3])):
+            row = (py - y) * heatmap.height // h
+            for px in range(max(x, rect[0]), min(x + w, rect[0] + rect[2])):
+                column = (px - x) * heatmap.width // w
+                value = heatmap.values[row * heatmap.width + column]
+                index = min(max(int((value - low) * 255 / (high - low)), 0), 255)
+                raster.fbuf.pixel(px - rect[0], py - rect[1], COLORMAP[index])
+        return raster
+
+    def assert_draws(self, heatmap, rect):
+        raster = Raster.from_rect(*rect)
+        heatmap.draw_raster(raster)
+        expected = self.expected(heatmap, rect)
+        self.assertTrue(any(raster.buf))
+        self.assertEqual(bytes(raster.buf), bytes(expected.buf))
+
+    def test_upscale(self):
+        values = array("h", [10 * i for i in range(1, 13)])
+        heatmap = Heatmap((3, 2, 30, 20), values, 4, 3, COLORMAP, (0, 120))
+        self.assert_draws(heatmap, (0, 0, 40, 30))
+
+    def test_uneven_upscale(self):
+        values = array("f", [0.5 * i for i in range(15)])
+        heatmap = Heatmap((5, 5, 17, 11), values, 5, 3, COLORMAP, (0.0, 7.0))
+        self.assert_draws(heatmap, (0, 0, 30, 20))
+
+    def test_partial_raster(self):
+        values = array("h", range(64))
+        heatmap = Heatmap((0, 0, 64, 64), values, 8, 8, COLORMAP, (0, 63))
+        self.assert_draws(heatmap, (13, 21, 30, 9))
+
+    def test_downscale(self):
+        values = array("h", range(100))
+        heatmap = Heatmap((0, 0, 7, 6), values, 10, 10, COLORMAP, (0, 100))
+        self.assert_draws(heatmap, (0, 0, 10, 10))
+
+    def test_out_of_range(self):
+        values = array("h", [-100, 0, 50, 200])
+        heatmap = Heatmap((0, 0, 4, 4), values, 2, 2, COLORMAP, (0, 100))
+        raster = Raster.from_rect(0, 0, 4, 4)
+        heatmap.draw_raster(raster)
+        self.assertEqual(raster.fbuf.pixel(0, 0), COLORMAP[0])
+        self.assertEqual(raster.fbuf.pixel(3, 3), COLORMAP[255])
+
+    def test_draw(self):
+        values = array("h", [10 * i for i in range(1, 13)])
+        heatmap = Heatmap((3, 2, 30, 20), values, 4, 3, COLORMAP, (0, 120))
+        raster = Raster.from_rect(0, 0, 40, 30)
+        heatmap.draw(raster.fbuf, raster.x, raster.y)
+        self.assertEqual(bytes(raster.buf), bytes(self.expected(heatmap, (0, 0, 40, 30)).buf))
+
+    def test_colormap_too_large(self):
+        with self.assertRaises(ValueError):
+            Heatmap((0, 0, 10, 10), [0], 1, 1, array("H", range(300)))
+
+    def test_empty_value_range(self):
+        with self.assertRaises(ValueError):
+            Heatmap((0, 0, 10, 10), [0], 1, 1, COLORMAP, (5, 5))
+        heatmap = Heatmap((0, 0, 10, 10), [0], 1, 1, COLORMAP, (0, 5))
+        with self.assertRaises(ValueError):
+            heatmap.update(value_range=(1, 1))
+
+    def test_palette_surface(self):
+        palette = ["#000000", "#ff0000", "#00ff00", "#0000ff"]
+        colormap = array("H", [0x0000, 0x00F8, 0xE007, 0x1F00])
+        surface = Surface(framebuf.GS8, palette)
+        values = array("h", [0, 1, 2, 3])
+        heatmap = surface.heatmap(DRAWING, (0, 0, 4, 4), values, 2, 2, colormap, (0, 3))
+
+        self.assertEqual(list(heatmap.colormap), [0, 1, 2, 3])
+        raster = Raster.from_rect(0, 0, 4, 4, framebuf.GS8)
+        heatmap.draw_raster(raster)
+        self.assertEqual(
+            [raster.fbuf.pixel(x, y) for y in (0, 3) for x in (0, 3)], [0, 1, 2, 3]
+        )
+
+        heatmap.update(colormap=array("H", reversed(colormap)))
+        self.assertEqual(list(heatmap.colormap), [3, 2, 1, 0])
+
+    def test_damage_changed_cells(self):
+        values = array("h", range(16))
+        surface = Surface()
+        heatmap = surface.heatmap(DRAWING, (10, 10, 40, 40), values, 4, 4, COLORMAP, (0, 16))
+        self.assertEqual(surface._damage, [(10, 10, 40, 40)])
+        self.assertEqual(heatmap._get_opaque(), (10, 10, 40, 40))
+
+        surface._damage = []
+        values[5] = 15
+        values[6] = 0
+        values[15] = 0
+        heatmap.update(values=values)
+        # one rectangle per row of cells, spanning its changed cells
+        self.assertEqual(surface._damage, [(20, 20, 20, 10), (40, 40, 10, 10)])
+
+        surface._damage = []
+        heatmap.update(values=array("h", values))
+        self.assertEqual(surface._damage, [])
+
+    def test_damage_changed_cells_clipped(self):
+        values = array("h", range(16))
+        surface = Surface()
+        heatmap = surface.heatmap(
+            DRAWING, (10, 10, 40, 40), values, 4, 4, COLORMAP, (0, 16), clip=(0, 0, 35, 60)
+        )
+        surface._damage = []
+        values[1] = 15
+        values[3] = 0
+        values[7] = 0
+        heatmap.update(values=values)
+        self.assertEqual(surface._damage, [(20, 10, 15, 10)])
+
+    def test_update_colormap(self):
+        values = array("h", range(16))
+        surface = Surface()
+        heatmap = surface.heatmap(DRAWING, (10, 10, 40, 40), values, 4, 4, COLORMAP, (0, 16))
+        surface._damage = []
+        heatmap.update(colormap=array("H", reversed(COLORMAP)))
+        self.assertEqual(surface._damage, [(10, 10, 40, 40)])
+
+
+if __name__ == "__main__":
+    result = unittest.main()
+    if not result.wasSuccessful():
+        import sys
+
+        sys.exit(1)
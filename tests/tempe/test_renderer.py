@@ -0,0 +1,163 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+from array import array
+import asyncio
+import framebuf
+import time
+import unittest
+
+from tempe.component import Label, LinePlot
+from tempe.display import FrameBufferDisplay
+from tempe.renderer import ThreadedRenderer
+from tempe.surface import Surface, BACKGROUND, UNDERLAY, DRAWING
+
+
+class SlowDisplay(FrameBufferDisplay):
+
+    def __init__(self, *args, delay=0.002, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delay = delay
+        self.strips = 0
+        self.fail = False
+
+    def blit(self, buffer, x, y, w, h, stride=None):
+        if self.fail:
+            raise OSError("bus error")
+        self.strips += 1
+        time.sleep(self.delay)
+        super().blit(buffer, x, y, w, h, stride)
+
+
+class TestThreadedRenderer(unittest.TestCase):
+
+    def setUp(self):
+        self.display_buffer = bytearray(2 * 40 * 40)
+        self.display = SlowDisplay(
+            framebuf.FrameBuffer(self.display_buffer, 40, 40, framebuf.RGB565),
+            (40, 40),
+        )
+        self.surface = Surface()
+        self.surface.rectangles(BACKGROUND, (0, 0, 40, 40), "#000000")
+        self.surface.vlines(UNDERLAY, [(x, 0, 40) for x in range(0, 40, 3)], "blue")
+        self.drawing = self.surface.rectangles(DRAWING, (5, 5, 10, 10), "white")
+        self.renderer = ThreadedRenderer(self.surface, self.display, bytearray(2 * 40 * 5))
+
+    def expected(self):
+        display_buffer = bytearray(2 * 40 * 40)
+        display = FrameBufferDisplay(
+            framebuf.FrameBuffer(display_buffer, 40, 40, framebuf.RGB565),
+            (40, 40),
+        )
+        self.surface.damage((0, 0, 40, 40))
+        self.surface.refresh(display, bytearray(2 * 40 * 41))
+        return display_buffer
+
+    def run_renderer(self, during=None):
+        renderer = self.renderer
+        ticks = []
+
+        async def run():
+            renderer.start()
+            await renderer.frame()
+            while renderer._busy:
+                ticks.append(self.display.strips)
+                if during is not None:
+                    during(self.display.strips)
+                await asyncio.sleep(0.001)
+            while self.surface._damage:
+                await renderer.frame()
+                await renderer.idle()
+            await renderer.stop()
+
+        asyncio.run(run())
+        return ticks
+
+    def test_render(self):
+        ticks = self.run_renderer()
+
+        # the event loop kept running while strips were blitted
+        self.assertGreater(len(set(ticks)), 2)
+        self.assertEqual(self.renderer.frames, 1)
+        self.assertFalse(self.renderer.running)
+        self.assertEqual(self.display_buffer, self.expected())
+
+    def test_update_while_rendering(self):
+        def during(strips):
+            if strips == 3:
+                self.drawing.update(geometry=[(20, 20, 10, 10)])
+            elif strips == 5:
+                self.surface.rectangles(DRAWING, (0, 30, 40, 5), "red")
+
+        self.run_renderer(during)
+
+        self.assertGreaterEqual(self.renderer.frames, 2)
+        self.assertEqual(self.display_buffer, self.expected())
+
+    def test_layer_cache(self):
+        self.surface.enable_layer_cache(40, 40)
+        background = self.surface.layers[UNDERLAY][0]
+
+        def during(strips):
+            if strips == 3:
+                background.update(geometry=[(x, 0, 40) for x in range(1, 40, 3)])
+
+        self.run_renderer(during)
+
+        self.assertIsNone(self.surface._invalidated)
+        self.assertEqual(self.display_buffer, self.expected())
+
+    def test_component_update_between_frames(self):
+        plot = LinePlot(self.surface, (0, 20, 40, 20), [0, 5, 2, 8])
+        plot.draw()
+        label = Label(self.surface, (0, 0, 40, 16), 1)
+        label.draw()
+        self.surface.threaded = True
+        lines = plot.shapes["lines"].geometry.geometry
+        vertices = array("h", lines)
+        texts = label.shapes["text"].texts
+
+        frame = self.surface._take_frame()
+        plot.values = [8, 2, 5, 0]
+        plot.update()
+        label.value = 2
+        label.update()
+        label.move((0, 2, 40, 16))
+
+        # the arrays and lists the frame may be drawing are untouched
+        self.assertEqual(lines, vertices)
+        self.assertEqual(texts, ["1"])
+        self.assertIsNot(plot.shapes["lines"].geometry.geometry, lines)
+
+        working_buffer = bytearray(2 * 40 * 5)
+        self.surface._render_frame(self.display, working_buffer, frame)
+        self.surface._render_frame(self.display, working_buffer, self.surface._take_frame())
+        self.surface.threaded = False
+        self.assertEqual(self.display_buffer, self.expected())
+
+    def test_error(self):
+        self.display.fail = True
+
+        async def run():
+            self.renderer.start()
+            await self.renderer.frame()
+            try:
+                await self.renderer.idle()
+            finally:
+                await self.renderer.stop()
+
+        with self.assertRaises(OSError):
+            asyncio.run(run())
+
+    def test_not_started(self):
+        with self.assertRaises(RuntimeError):
+            asyncio.run(self.renderer.frame())
+
+
+if __name__ == "__main__":
+    result = unittest.main()
+    if not result.wasSuccessful():
+        import sys
+
+        sys.exit(1)
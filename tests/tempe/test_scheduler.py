@@ -0,0 +1,126 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import framebuf
+import time
+import unittest
+
+from tempe.display import FrameBufferDisplay
+from tempe.scheduler import FrameScheduler
+from tempe.surface import Surface, BACKGROUND, UNDERLAY
+
+
+class RecordingDisplay(FrameBufferDisplay):
+
+    def __init__(self, *args, delay=0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delay = delay
+        self.rows = []
+
+    def blit(self, buffer, x, y, w, h, stride=None):
+        self.rows.append(y)
+        if self.delay:
+            time.sleep(self.delay)
+        super().blit(buffer, x, y, w, h, stride)
+
+
+class TestFrameScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.display = RecordingDisplay(
+            framebuf.FrameBuffer(bytearray(2 * 40 * 30), 40, 30, framebuf.RGB565),
+            (40, 30),
+        )
+        self.surface = Surface()
+        self.surface.rectangles(BACKGROUND, (0, 0, 40, 30), "#000000")
+        self.surface.vlines(UNDERLAY, [(x, 0, 30) for x in range(0, 40, 4)], "white")
+
+    def test_coalesced(self):
+        scheduler = FrameScheduler(self.surface, self.display, bytearray(2 * 40 * 31), fps=20)
+
+        async def run():
+            await scheduler.frame()
+            for y in (0, 10, 20):
+                self.surface.damage((0, y, 40, 5))
+                await asyncio.sleep(0.005)
+            await scheduler.frame()
+
+        asyncio.run(run())
+
+        self.assertEqual(scheduler.frames, 2)
+        self.assertEqual(self.display.rows[-3:], [0, 10, 20])
+        self.assertFalse(self.surface._damage)
+
+    def test_paced(self):
+        scheduler = FrameScheduler(self.surface, self.display, bytearray(2 * 40 * 31), fps=20)
+
+        async def run():
+            await scheduler.frame()
+            start = time.ticks_ms()
+            self.surface.damage((0, 0, 40, 5))
+            await scheduler.frame()
+            return time.ticks_diff(time.ticks_ms(), start)
+
+        elapsed = asyncio.run(run())
+
+        # the second frame waits for the next frame slot
+        self.assertGreaterEqual(elapsed, 40)
+
+    def test_missed(self):
+        self.display.delay = 0.03
+        scheduler = FrameScheduler(self.surface, self.display, bytearray(2 * 40 * 31), fps=50)
+
+        asyncio.run(scheduler.frame())
+
+        self.assertEqual(scheduler.missed, 1)
+        self.assertGreaterEqual(scheduler.worst_ms, 30)
+
+        scheduler.reset_stats()
+        self.assertEqual((scheduler.frames, scheduler.missed, scheduler.worst_ms), (0, 0, 0))
+
+    def test_min_interval(self):
+        scheduler = FrameScheduler(
+            self.surface, self.display, bytearray(2 * 40 * 31), fps=100, min_interval=50
+        )
+
+        async def run():
+            await scheduler.frame()
+            start = time.ticks_ms()
+            self.surface.damage((0, 0, 40, 5))
+            await scheduler.frame()
+            return time.ticks_diff(time.ticks_ms(), start)
+
+        self.assertGreaterEqual(asyncio.run(run()), 40)
+
+
+class TestDamagePriority(unittest.TestCase):
+
+    def test_priority_first(self):
+        display = RecordingDisplay(
+            framebuf.FrameBuffer(bytearray(2 * 40 * 30), 40, 30, framebuf.RGB565),
+            (40, 30),
+        )
+        surface = Surface()
+        surface.rectangles(BACKGROUND, (0, 0, 40, 30), "#000000")
+        surface.vlines(UNDERLAY, [(x, 0, 30) for x in range(0, 40, 4)], "white")
+        surface.refresh(display, bytearray(2 * 40 * 31))
+        display.rows = []
+
+        surface.damage((0, 0, 40, 5))
+        surface.damage((0, 10, 40, 5))
+        surface.damage((0, 20, 40, 5), priority=1)
+        surface.damage((0, 11, 10, 2), priority=2)
+        surface.refresh(display, bytearray(2 * 40 * 31))
+
+        self.assertEqual(display.rows, [10, 20, 0])
+        self.assertEqual(surface._priorities, [])
+
+
+if __name__ == "__main__":
+    result = unittest.main()
+    if not result.wasSuccessful():
+        import sys
+
+        sys.exit(1)
@@ -0,0 +1,172 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+from array import array
+import unittest
+
+from tempe.data_view import Repeat
+from tempe.geometry import ColumnGeometry, RowGeometry
+from tempe.markers import Marker, Markers, Points, clear_stamp_cache
+from tempe.raster import Raster
+from tempe.lines import WidePolyLines
+from tempe.shapes import HLines, Polygons, PolyLines, Rectangles, VLines
+
+
+class TestBatchedShapes(unittest.TestCase):
+    """Batched drawing should match drawing via FrameBuffer methods."""
+
+    def assert_draws_same(self, shape, rect=(5, 5, 30, 20)):
+        batched = Raster.from_rect(*rect)
+        shape.draw_raster(batched)
+
+        expected = Raster.from_rect(*rect)
+        if isinstance(shape, Points):
+            for geometry, color, marker in shape:
+                expected.fbuf.pixel(geometry[0] - rect[0], geometry[1] - rect[1], color)
+        else:
+            shape.draw(expected.fbuf, rect[0], rect[1])
+
+        self.assertTrue(any(batched.buf))
+        self.assertEqual(bytes(batched.buf), bytes(expected.buf))
+
+    def test_rectangles(self):
+        geometry = RowGeometry.from_lists(
+            [(0, 0, 10, 10), (20, 10, -8, 6), (30, 20, 10, 10), (12, 3, 0, 5)]
+        )
+        shape = Rectangles(geometry, [0xFFFF, 0x1234, 0xF800, 0x07E0])
+        self.assert_draws_same(shape)
+
+    def test_rectangles_outline(self):
+        geometry = RowGeometry.from_lists(
+            [(0, 0, 10, 10), (20, 10, -8, 6), (30, 20, 10, 10), (12, 3, 1, 5)]
+        )
+        shape = Rectangles(geometry, Repeat(0xFFFF), fill=False)
+        self.assert_draws_same(shape)
+
+    def test_rectangles_many(self):
+        # more rectangles than fit in a single batch
+        xs = array("h", range(0, 200, 2))
+        geometry = ColumnGeometry([xs, Repeat(10), Repeat(1), xs])
+        shape = Rectangles(geometry, Repeat(0x00FF))
+        self.assert_draws_same(shape, (0, 0, 100, 100))
+
+    def test_hlines(self):
+        geometry = RowGeometry.from_lists([(0, 6, 20), (10, 24, 40), (8, 10, -3)])
+        shape = HLines(geometry, [0xFFFF, 0x1234, 0xF800])
+        self.assert_draws_same(shape)
+
+    def test_vlines(self):
+        geometry = RowGeometry.from_lists([(6, 0, 20), (34, 10, 40), (8, 10, -3)])
+        shape = VLines(geometry, Repeat(0x1234))
+        self.assert_draws_same(shape)
+
+    def test_pixels(self):
+        geometry = RowGeometry.from_lists([(4, 4), (5, 5), (6, 6), (34, 24), (35, 25)])
+        shape = Points(geometry, [0xFFFF, 0x1234, 0xF800, 0x07E0, 0x001F], Repeat(Marker.PIXEL))
+        self.assert_draws_same(shape)
+
+
+class TestSimplifiedShapes(unittest.TestCase):
+    """Simplified shapes should draw the same as their simplified geometry."""
+
+    def wave(self, n):
+        # a dense straight trace with a corner at the end
+        points = []
+        for i in range(n):
+            points.append(i)
+            points.append(10)
+        points.extend([n, 30])
+        return RowGeometry.from_lists([points])
+
+    def assert_draws_same(self, shape, expected_shape, rect=(0, 0, 60, 40)):
+        simplified = Raster.from_rect(*rect)
+        shape.draw_raster(simplified)
+        expected = Raster.from_rect(*rect)
+        expected_shape.draw_raster(expected)
+        self.assertTrue(any(simplified.buf))
+        self.assertEqual(bytes(simplified.buf), bytes(expected.buf))
+
+    def test_poly_lines(self):
+        shape = PolyLines(self.wave(50), Repeat(0xFFFF), tolerance=1)
+        expected = PolyLines([array("h", [0, 10, 49, 10, 50, 30])], Repeat(0xFFFF))
+        self.assert_draws_same(shape, expected)
+        self.assertEqual([list(row) for row in shape._simplified], [[0, 10, 49, 10, 50, 30]])
+
+    def test_wide_poly_lines(self):
+        shape = WidePolyLines(self.wave(50), Repeat(0xFFFF), Repeat(3), tolerance=1)
+        expected = WidePolyLines(
+            [array("h", [0, 10, 49, 10, 50, 30])], Repeat(0xFFFF), Repeat(3)
+        )
+        self.assert_draws_same(shape, expected)
+
+    def test_polygons(self):
+        shape = Polygons(self.wave(50), Repeat(0xFFFF), tolerance=1)
+        expected = Polygons([array("h", [0, 10, 49, 10, 50, 30])], Repeat(0xFFFF))
+        self.assert_draws_same(shape, expected)
+
+    def test_cache(self):
+        shape = PolyLines(self.wave(50), Repeat(0xFFFF), tolerance=1)
+        shape.draw_raster(Raster.from_rect(0, 0, 60, 40))
+        simplified = shape._simplified
+        shape.draw_raster(Raster.from_rect(0, 20, 60, 20))
+        self.assertIs(shape._simplified, simplified)
+
+        shape.update(colors=Repeat(0x001F))
+        self.assertIs(shape._simplified, simplified)
+
+        shape.update(geometry=self.wave(20))
+        self.assertIsNone(shape._simplified)
+        shape.draw_raster(Raster.from_rect(0, 0, 60, 40))
+        self.assertEqual([list(row) for row in shape._simplified], [[0, 10, 19, 10, 20, 30]])
+
+        shape.update(tolerance=0.1)
+        self.assertIsNone(shape._simplified)
+
+    def test_no_tolerance(self):
+        geometry = self.wave(10)
+        shape = PolyLines(geometry, Repeat(0xFFFF))
+        shape.draw_raster(Raster.from_rect(0, 0, 60, 40))
+        self.assertIsNone(shape._simplified)
+
+
+class TestMarkerStamps(unittest.TestCase):
+    """Stamped markers should match drawing via FrameBuffer methods."""
+
+    def tearDown(self):
+        clear_stamp_cache()
+
+    def test_stamps(self):
+        geometry = RowGeometry.from_lists([(5, 5), (20, 12), (32, 20), (40, 3)])
+        colors = [0xFFFF, 0x1234, 0xF800, 0x07E0]
+        for marker in [Marker.CIRCLE, Marker.PLUS, Marker.CROSS]:
+            for size in [1, 2, 5]:
+                with self.subTest(marker=marker, size=size):
+                    shape = Markers(geometry, colors, Repeat(size), Repeat(marker))
+                    stamped = Raster.from_rect(2, 2, 40, 20)
+                    shape.draw_raster(stamped)
+
+                    expected = Raster.from_rect(2, 2, 40, 20)
+                    fbuf = expected.fbuf
+                    for (x, y), color in zip(geometry, colors):
+                        x -= 2
+                        y -= 2
+                        if marker == Marker.CIRCLE:
+                            fbuf.ellipse(x, y, size, size, color, True)
+                        elif marker == Marker.PLUS:
+                            fbuf.hline(x - size, y, 2 * size + 1, color)
+                            fbuf.vline(x, y - size, 2 * size + 1, color)
+                        else:
+                            d = (size * 17 // 24) + 1
+                            fbuf.line(x - d, y - d, x + d, y + d, color)
+                            fbuf.line(x - d, y + d, x + d, y - d, color)
+
+                    self.assertEqual(bytes(stamped.buf), bytes(expected.buf))
+
+
+if __name__ == "__main__":
+    result = unittest.main()
+    if not result.wasSuccessful():
+        import sys
+
+        sys.exit(1)
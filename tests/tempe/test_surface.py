@@ -2,13 +2,16 @@
 #
 # SPDX-License-Identifier: MIT
 
+from array import array
+import asyncio
 import framebuf
+import time
 import unittest
 
 from tempe.display import FrameBufferDisplay
-from tempe.surface import Surface, DRAWING
+from tempe.surface import Surface, BACKGROUND, UNDERLAY, DRAWING, OVERLAY
 from tempe.shapes import Shape
-from tempe.raster import Raster
+from tempe.raster import Raster, RasterPool
 
 class DummyShape(Shape):
 
@@ -77,6 +80,875 @@ class TestSurface(unittest.TestCase):
 
         self.assertTrue(any(x != 0 for x in self.display_buffer))
 
+    def test_refresh_reuses_rasters(self):
+        self.surface.rectangles(DRAWING, (25, 10, 50, 50), "white", clip=(30, 20, 10, 10))
+        self.surface.damage((0, 0, 75, 50))
+        self.surface.refresh(self.display, self.working_buffer)
+        count = self.surface._raster_pool._count
+
+        self.surface.damage((0, 0, 75, 50))
+        self.surface.refresh(self.display, self.working_buffer)
+
+        self.assertEqual(self.surface._raster_pool._count, count)
+
+
+class TestLayerCache(unittest.TestCase):
+
+    def setUp(self):
+        self.working_buffer = bytearray(2 * 75 * 11)
+        self.display_buffer = bytearray(2 * 75 * 50)
+        self.display = FrameBufferDisplay(
+            framebuf.FrameBuffer(self.display_buffer, 75, 50, framebuf.RGB565),
+            (75, 50),
+        )
+
+    def make_surface(self):
+        surface = Surface()
+        background = surface.rectangles(BACKGROUND, (0, 0, 75, 50), "grey")
+        grid = surface.vlines(BACKGROUND, [(x, 0, 50) for x in range(0, 75, 5)], "blue")
+        drawing = surface.rectangles(DRAWING, (25, 10, 20, 20), "white")
+        return surface, background, drawing
+
+    def render(self, surface):
+        self.display.clear()
+        # damage to a non-cached layer doesn't invalidate the cache
+        surface.damage((0, 0, 75, 50), DRAWING)
+        surface.refresh(self.display, self.working_buffer)
+        return bytes(self.display_buffer)
+
+    def test_matches_uncached(self):
+        surface, background, drawing = self.make_surface()
+        expected = self.render(surface)
+
+        surface.enable_layer_cache(75, 50)
+        self.assertEqual(self.render(surface), expected)
+        self.assertEqual(surface._layer_cache.hits, 0)
+        self.assertEqual(self.render(surface), expected)
+        self.assertGreater(surface._layer_cache.hits, 0)
+
+    def test_drawing_damage_keeps_cache(self):
+        surface, background, drawing = self.make_surface()
+        surface.enable_layer_cache(75, 50)
+        self.render(surface)
+        cache = surface._layer_cache
+        misses = cache.misses
+
+        drawing.update(colors=[0xF800])
+        surface.refresh(self.display, self.working_buffer)
+
+        self.assertEqual(cache.misses, misses)
+        self.assertGreater(cache.hits, 0)
+
+    def test_background_damage_invalidates(self):
+        surface, background, drawing = self.make_surface()
+        surface.enable_layer_cache(75, 50)
+        self.render(surface)
+
+        background.update(colors=[0x1234])
+        self.assertFalse(surface._layer_cache.is_valid(0, 0, 75, 50))
+        cached = self.render(surface)
+
+        surface.disable_layer_cache()
+        self.assertEqual(self.render(surface), cached)
+
+    def test_budget(self):
+        surface, background, drawing = self.make_surface()
+        expected = self.render(surface)
+
+        surface.enable_layer_cache(75, 50, budget=2 * 75 * 20)
+
+        self.assertEqual(surface._layer_cache.raster.h, 20)
+        self.render(surface)
+        self.assertEqual(self.render(surface), expected)
+
+    def test_bad_layers(self):
+        surface = Surface()
+        with self.assertRaises(ValueError):
+            surface.enable_layer_cache(75, 50, layers=(DRAWING,))
+
+
+class TestOcclusion(unittest.TestCase):
+
+    def setUp(self):
+        self.working_buffer = bytearray(2 * 75 * 11)
+        self.display_buffer = bytearray(2 * 75 * 50)
+        self.display = FrameBufferDisplay(
+            framebuf.FrameBuffer(self.display_buffer, 75, 50, framebuf.RGB565),
+            (75, 50),
+        )
+
+    def assert_renders_correctly(self, surface):
+        surface.damage((0, 0, 75, 50))
+        surface.refresh(self.display, self.working_buffer)
+
+        expected = Raster.from_rect(0, 0, 75, 50)
+        for layer in surface.layers.values():
+            for shape in layer:
+                raster = expected if shape.clip is None else expected.clip(*shape.clip)
+                shape.draw(raster.fbuf, raster.x, raster.y)
+        self.assertEqual(bytes(self.display_buffer), bytes(expected.buf))
+
+    def test_culled(self):
+        surface = Surface()
+        surface.rectangles(BACKGROUND, (0, 0, 75, 50), "grey")
+        surface.hlines(UNDERLAY, [(10, y, 20) for y in range(10, 30, 3)], "blue")
+        surface.rectangles(DRAWING, (5, 5, 40, 40), "white")
+        surface.rectangles(OVERLAY, (20, 20, 10, 10), "red")
+
+        self.assert_renders_correctly(surface)
+        self.assertGreater(surface.culled_draws, 0)
+
+    def test_not_opaque(self):
+        surface = Surface()
+        surface.rectangles(BACKGROUND, (0, 0, 75, 50), "grey")
+        surface.hlines(UNDERLAY, [(10, y, 20) for y in range(10, 30, 3)], "blue")
+        surface.rectangles(DRAWING, (5, 5, 40, 40), "white", fill=False)
+        surface.rectangles(DRAWING, [(5, 5, 40, 40), (50, 0, 5, 5)], "white", clip=(0, 0, 10, 10))
+        rounded = surface.rounded_rectangles(OVERLAY, (5, 5, 40, 40), "white", radius=8)
+
+        self.assertIsNone(rounded._opaque)
+        surface.remove_shape(OVERLAY, rounded)
+        self.assert_renders_correctly(surface)
+        self.assertEqual(surface.culled_draws, 0)
+
+    def test_clipped_opaque(self):
+        surface = Surface()
+        rect = surface.rectangles(DRAWING, (5, 5, 40, 40), "white", clip=(0, 0, 20, 60))
+
+        self.assertEqual(rect._opaque, (5, 5, 15, 40))
+
+    def test_bitmap_opaque(self):
+        surface = Surface()
+        surface.rectangles(BACKGROUND, (0, 0, 75, 50), "grey")
+        surface.hlines(UNDERLAY, [(0, y, 75) for y in range(0, 50, 3)], "blue")
+        fbuf = framebuf.FrameBuffer(bytearray(2 * 10 * 10), 10, 10, framebuf.RGB565)
+        fbuf.fill(0xFFFF)
+        exact = surface.bitmaps(DRAWING, (5, 5, 10, 10), fbuf)
+        # geometry is larger than the framebuffer, so pixels show through
+        larger = surface.bitmaps(DRAWING, (30, 5, 20, 20), fbuf)
+
+        self.assertEqual(exact._opaque, (5, 5, 10, 10))
+        self.assertIsNone(larger._opaque)
+
+        surface.damage((0, 0, 75, 50))
+        surface.refresh(self.display, self.working_buffer)
+        expected = Raster.from_rect(0, 0, 75, 50)
+        for layer in surface.layers.values():
+            for shape in layer:
+                shape.draw_raster(expected)
+        self.assertEqual(bytes(self.display_buffer), bytes(expected.buf))
+        self.assertEqual(surface.culled_draws, 0)
+
+
+class TestIndexedSurface(unittest.TestCase):
+
+    def setUp(self):
+        self.display_buffer = bytearray(2 * 75 * 50)
+        self.display = FrameBufferDisplay(
+            framebuf.FrameBuffer(self.display_buffer, 75, 50, framebuf.RGB565),
+            (75, 50),
+        )
+
+    def render(self, surface, working_buffer):
+        self.display.clear()
+        surface.damage((0, 0, 75, 50))
+        surface.refresh(self.display, working_buffer)
+        return bytes(self.display_buffer)
+
+    def populate(self, surface):
+        surface.rectangles(BACKGROUND, (0, 0, 75, 50), "#000000")
+        surface.vlines(UNDERLAY, [(x, 0, 50) for x in range(1, 75, 5)], "blue")
+        surface.rectangles(DRAWING, (25, 10, 20, 20), "white")
+        surface.rectangles(DRAWING, (3, 3, 10, 10), "red", clip=(5, 0, 7, 50))
+        surface.hlines(OVERLAY, (0, 40, 75), "white", clip=(11, 35, 30, 10))
+
+    def assert_matches_rgb565(self, format, buffer_size):
+        expected_surface = Surface()
+        self.populate(expected_surface)
+        expected = self.render(expected_surface, bytearray(2 * 75 * 11))
+
+        surface = Surface(format, ["#000000", "white", "red", "blue"])
+        self.populate(surface)
+        self.assertEqual(self.render(surface, bytearray(buffer_size)), expected)
+
+    def test_gs8(self):
+        self.assert_matches_rgb565(framebuf.GS8, 75 * 11)
+
+    def test_gs4_hmsb(self):
+        self.assert_matches_rgb565(framebuf.GS4_HMSB, 38 * 11)
+
+    def test_palette_index(self):
+        surface = Surface(framebuf.GS8, ["#000000", "white", "red", "blue"])
+
+        self.assertEqual(surface.palette_index("red"), 2)
+        self.assertEqual(surface.palette_index((240, 10, 10)), 2)
+        self.assertEqual(surface._check_colors(3).data, 3)
+
+    def test_palette_padded(self):
+        surface = Surface(framebuf.GS4_HMSB, ["#000000", "white", "red", "blue"])
+
+        self.assertEqual(len(surface.palette), 16)
+        self.assertEqual(surface.palette_index("#000000"), 0)
+        # padding isn't used for nearest colors
+        self.assertEqual(surface.palette_index("#080808"), 0)
+
+    def test_check_color_sequences(self):
+        surface = Surface(framebuf.GS8, ["#000000", "white", "red", "blue"])
+        indices = [0, 3, 1]
+
+        self.assertIs(surface._check_colors(indices), indices)
+        self.assertEqual(surface._check_colors(["red", 1, (0, 0, 255)]), [2, 1, 3])
+        with self.assertRaises(ValueError):
+            # an RGB565 color rather than an index
+            surface._check_colors([0xFFFF])
+        with self.assertRaises(ValueError):
+            surface._check_colors(array("H", [0, 4]))
+
+    def test_gs8_blit_key_index(self):
+        # index 32 is the same value as the RGB565 blit key
+        palette = ["#000000"] * 32 + ["red"]
+        surface = Surface(framebuf.GS8, palette)
+        surface.rectangles(BACKGROUND, (0, 0, 75, 50), 0)
+        glyph = framebuf.FrameBuffer(bytearray(8), 8, 8, framebuf.MONO_HLSB)
+        glyph.fill(1)
+        surface.bitmaps(DRAWING, (10, 10, 8, 8), glyph, colors=32)
+
+        expected_surface = Surface()
+        expected_surface.rectangles(BACKGROUND, (0, 0, 75, 50), "#000000")
+        expected_surface.rectangles(DRAWING, (10, 10, 8, 8), "red")
+        expected = self.render(expected_surface, bytearray(2 * 75 * 11))
+        self.assertEqual(self.render(surface, bytearray(75 * 11)), expected)
+
+    def test_component_colors(self):
+        from tempe.colors import grey_2, grey_e
+        from tempe.component import Label
+
+        palette = ["#000000", grey_e, grey_2]
+        surface = Surface(framebuf.GS8, palette)
+        surface.rectangles(BACKGROUND, (0, 0, 75, 50), 0)
+        label = Label(surface, (5, 5, 60, 20), "Tempe", background_color=grey_e)
+        label.draw()
+
+        self.assertEqual(list(label.shapes["background"].colors), [1])
+        self.assertEqual(list(label.shapes["text"].colors), [2])
+        label.style["color"] = grey_e
+        label.update()
+        self.assertEqual(list(label.shapes["text"].colors), [1])
+
+    def test_bad_palette(self):
+        with self.assertRaises(ValueError):
+            Surface(framebuf.GS8)
+        with self.assertRaises(ValueError):
+            Surface(framebuf.GS4_HMSB, ["#000000"] * 17)
+
+
+class TestMonoSurface(unittest.TestCase):
+
+    def populate(self, surface, red="red", yellow="yellow"):
+        surface.rectangles(BACKGROUND, (0, 0, 75, 50), "#000000")
+        surface.vlines(UNDERLAY, [(x, 0, 50) for x in range(1, 75, 5)], yellow)
+        surface.rectangles(DRAWING, (25, 10, 20, 20), "white")
+        surface.rectangles(DRAWING, (27, 12, 10, 10), red)
+        surface.rectangles(DRAWING, (3, 3, 10, 30), "white", clip=(5, 3, 7, 21))
+        surface.hlines(OVERLAY, [(0, y, 75) for y in range(38, 46)], "white", clip=(11, 39, 30, 5))
+
+    def assert_renders_natively(self, format, buffer_size):
+        display_raster = Raster.from_rect(0, 0, 75, 50, format)
+        display = FrameBufferDisplay(display_raster.fbuf, (75, 50), format=format)
+        surface = Surface(format)
+        self.populate(surface)
+        surface.damage((0, 0, 75, 50))
+        surface.refresh(display, bytearray(buffer_size))
+
+        expected = Raster.from_rect(0, 0, 75, 50, format)
+        for layer in surface.layers.values():
+            for shape in layer:
+                raster = expected if shape.clip is None else expected.clip(*shape.clip)
+                if raster.clip_rect is None:
+                    shape.draw(raster.fbuf, raster.x, raster.y)
+                else:
+                    # clip was widened to a byte boundary
+                    margins = array("H", bytes(2 * raster.margin_size()))
+                    raster.save_margins(margins)
+                    shape.draw(raster.fbuf, raster.x, raster.y)
+                    raster.restore_margins(margins)
+        self.assertEqual(bytes(display_raster.buf), bytes(expected.buf))
+
+    def test_mono_vlsb(self):
+        self.assert_renders_natively(framebuf.MONO_VLSB, 75 * 2)
+
+    def test_mono_vlsb_unaligned_damage(self):
+        format = framebuf.MONO_VLSB
+        display_raster = Raster.from_rect(0, 0, 75, 50, format)
+        display = FrameBufferDisplay(display_raster.fbuf, (75, 50), format=format)
+        blits = []
+        blit = display.blit
+
+        def record_blit(buffer, x, y, w, h):
+            blits.append((y, h))
+            blit(buffer, x, y, w, h)
+
+        display.blit = record_blit
+        surface = Surface(format)
+        self.populate(surface)
+        surface.refresh(display, bytearray(75 * 2))
+
+        surface._damage = []
+        surface.rectangles(OVERLAY, (20, 13, 30, 30), "white")
+        blits.clear()
+        surface.refresh(display, bytearray(75 * 2))
+
+        # damage from row 13 to 43 covers the pages from row 8 to 48
+        self.assertEqual(blits[0][0], 8)
+        self.assertEqual(sum(h for y, h in blits), 48 - 8)
+        for y, h in blits:
+            self.assertEqual(y % 8, 0)
+            self.assertTrue((y + h) % 8 == 0 or y + h == 50)
+
+        expected_surface = Surface(format)
+        self.populate(expected_surface)
+        expected_surface.rectangles(OVERLAY, (20, 13, 30, 30), "white")
+        expected = Raster.from_rect(0, 0, 75, 50, format)
+        expected_display = FrameBufferDisplay(expected.fbuf, (75, 50), format=format)
+        expected_surface.refresh(expected_display, bytearray(75 * 2))
+        self.assertEqual(bytes(display_raster.buf), bytes(expected.buf))
+
+    def test_mono_hlsb(self):
+        self.assert_renders_natively(framebuf.MONO_HLSB, 10 * 11)
+
+    def test_rgb565_display(self):
+        display_buffer = bytearray(2 * 75 * 50)
+        display = FrameBufferDisplay(
+            framebuf.FrameBuffer(display_buffer, 75, 50, framebuf.RGB565),
+            (75, 50),
+        )
+        expected_surface = Surface()
+        self.populate(expected_surface, red="#000000", yellow="white")
+        expected_surface.refresh(display, bytearray(2 * 75 * 11))
+        expected = bytes(display_buffer)
+
+        display.clear()
+        surface = Surface(framebuf.MONO_VLSB)
+        self.populate(surface)
+        surface.refresh(display, bytearray(75 * 2))
+        self.assertEqual(bytes(display_buffer), expected)
+
+    def test_threshold(self):
+        surface = Surface(framebuf.MONO_VLSB)
+
+        self.assertEqual(surface.palette_index("white"), 1)
+        self.assertEqual(surface.palette_index("yellow"), 1)
+        self.assertEqual(surface.palette_index("red"), 0)
+        surface.threshold = 64
+        self.assertEqual(surface.palette_index("red"), 1)
+
+    def test_inverted_palette(self):
+        surface = Surface(framebuf.MONO_HLSB, ["white", "#000000"])
+
+        self.assertEqual(surface.palette_index("yellow"), 0)
+        self.assertEqual(surface.palette_index("navy"), 1)
+
+
+class RecordingDisplay(FrameBufferDisplay):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.flushed = []
+
+    def flush(self, x, y, w, h):
+        self.flushed.append((x, y, w, h))
+
+
+class TestDirectRefresh(unittest.TestCase):
+
+    def populate(self, surface):
+        surface.rectangles(BACKGROUND, (0, 0, 75, 50), "#000000")
+        surface.vlines(UNDERLAY, [(x, 0, 50) for x in range(1, 75, 5)], "blue")
+        surface.rectangles(DRAWING, (25, 10, 20, 20), "white")
+        surface.rectangles(DRAWING, (3, 3, 10, 10), "red", clip=(5, 0, 7, 50))
+
+    def render_buffered(self, surface):
+        display_buffer = bytearray(2 * 75 * 50)
+        display = FrameBufferDisplay(
+            framebuf.FrameBuffer(display_buffer, 75, 50, framebuf.RGB565),
+            (75, 50),
+        )
+        surface.refresh(display, bytearray(2 * 75 * 11))
+        return bytes(display_buffer)
+
+    def make_display(self, format=framebuf.RGB565):
+        raster = Raster.from_rect(0, 0, 75, 50, format)
+        return RecordingDisplay(raster.fbuf, (75, 50), format=format, buffer=raster.buf)
+
+    def test_matches_buffered(self):
+        surface = Surface()
+        self.populate(surface)
+        expected = self.render_buffered(surface)
+
+        display = self.make_display()
+        self.populate(surface)
+        surface.refresh(display, None)
+
+        self.assertEqual(bytes(display.raster.buf), expected)
+        self.assertIn((0, 0, 75, 50), display.flushed)
+
+    def test_partial_damage(self):
+        surface = Surface()
+        self.populate(surface)
+        display = self.make_display()
+        surface.refresh(display, None)
+        before = Raster(bytearray(display.raster.buf), 0, 0, 75, 50)
+        display.flushed = []
+
+        surface.rectangles(OVERLAY, (60, 40, 30, 30), "green")
+        surface.refresh(display, None)
+
+        self.assertEqual(display.flushed, [(60, 40, 15, 10)])
+        after = display.raster
+        for y in range(0, 50, 3):
+            for x in range(0, 75, 3):
+                if x < 60 or y < 40:
+                    self.assertEqual(after.fbuf.pixel(x, y), before.fbuf.pixel(x, y))
+        self.assertNotEqual(after.fbuf.pixel(70, 45), before.fbuf.pixel(70, 45))
+
+    def test_indexed_margins(self):
+        palette = ["#000000", "white", "red", "blue"]
+        surface = Surface(framebuf.GS4_HMSB, palette)
+        self.populate(surface)
+        display = self.make_display(framebuf.GS4_HMSB)
+        surface.refresh(display, None)
+        display.raster.fbuf.fill_rect(0, 0, 75, 50, 3)
+
+        surface.damage((5, 5, 10, 10))
+        surface.refresh(display, None)
+
+        fbuf = display.raster.fbuf
+        self.assertEqual(fbuf.pixel(4, 5), 3)
+        self.assertEqual(fbuf.pixel(5, 5), 2)
+        self.assertEqual(fbuf.pixel(15, 5), 3)
+
+    def test_mono_layer_cache(self):
+        surface = Surface(framebuf.MONO_HLSB)
+        surface.rectangles(BACKGROUND, (3, 0, 72, 50), "#000000")
+        surface.rectangles(DRAWING, (0, 0, 3, 10), "white")
+        surface.enable_layer_cache(75, 50)
+        display = self.make_display(framebuf.MONO_HLSB)
+        surface.refresh(display, None)
+
+        # the raster is widened over the white pixels to a byte boundary
+        surface.damage((3, 0, 20, 10), BACKGROUND)
+        surface.refresh(display, None)
+
+        # the front layer's pixels in the margin are not cached
+        cache = surface._layer_cache.raster
+        self.assertEqual(cache.fbuf.pixel(1, 1), 0)
+        self.assertEqual(display.raster.fbuf.pixel(1, 1), 1)
+
+    def test_no_buffer(self):
+        surface = Surface()
+        self.populate(surface)
+        display = FrameBufferDisplay(Raster.from_rect(0, 0, 75, 50).fbuf, (75, 50))
+
+        with self.assertRaises(ValueError):
+            surface.refresh(display, None)
+
+
+class CountingDisplay(FrameBufferDisplay):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.blitted = 0
+
+    def blit(self, buffer, x, y, w, h, stride=None):
+        self.blitted += w * h
+        super().blit(buffer, x, y, w, h, stride)
+
+    def blit_palette(self, buffer, x, y, w, h, stride, format, palette):
+        self.blitted += w * h
+        super().blit_palette(buffer, x, y, w, h, stride, format, palette)
+
+
+class TestTileHashes(unittest.TestCase):
+
+    def setUp(self):
+        self.display_buffer = bytearray(2 * 75 * 50)
+        self.display = CountingDisplay(
+            framebuf.FrameBuffer(self.display_buffer, 75, 50, framebuf.RGB565),
+            (75, 50),
+        )
+
+    def make_surface(self, *args):
+        surface = Surface(*args)
+        surface.rectangles(BACKGROUND, (0, 0, 75, 50), "#000000")
+        surface.vlines(UNDERLAY, [(x, 0, 50) for x in range(1, 75, 5)], "blue")
+        drawing = surface.rectangles(DRAWING, (25, 10, 20, 20), "white")
+        return surface, drawing
+
+    def expected(self, surface):
+        display_buffer = bytearray(2 * 75 * 50)
+        display = FrameBufferDisplay(
+            framebuf.FrameBuffer(display_buffer, 75, 50, framebuf.RGB565),
+            (75, 50),
+        )
+        surface.damage((0, 0, 75, 50))
+        surface.refresh(display, bytearray(2 * 75 * 11))
+        return bytes(display_buffer)
+
+    def test_unchanged_skipped(self):
+        surface, drawing = self.make_surface()
+        surface.enable_tile_hashes(75, 50)
+        surface.refresh(self.display, bytearray(2 * 75 * 17))
+        self.assertEqual(self.display.blitted, 75 * 50)
+
+        self.display.blitted = 0
+        hits = surface._tile_hashes.hits
+        surface.damage((0, 0, 75, 50))
+        surface.refresh(self.display, bytearray(2 * 75 * 17))
+
+        self.assertEqual(self.display.blitted, 0)
+        self.assertEqual(surface._tile_hashes.hits - hits, 5 * 7)
+
+    def test_changed_tiles(self):
+        surface, drawing = self.make_surface()
+        surface.enable_tile_hashes(75, 50)
+        surface.refresh(self.display, bytearray(2 * 75 * 17))
+        self.display.blitted = 0
+
+        drawing.update(geometry=[(20, 10, 20, 20)])
+        surface.refresh(self.display, bytearray(2 * 75 * 17))
+
+        # only the columns of tiles from x=16 to x=48, rows 8 to 32
+        self.assertEqual(self.display.blitted, 32 * 24)
+        surface.disable_tile_hashes()
+        self.assertEqual(bytes(self.display_buffer), self.expected(surface))
+
+    def test_indexed(self):
+        surface, drawing = self.make_surface(framebuf.GS8, ["#000000", "white", "blue"])
+        surface.enable_tile_hashes(75, 50)
+        surface.refresh(self.display, bytearray(75 * 17))
+        self.display.blitted = 0
+
+        drawing.update(geometry=[(20, 10, 20, 20)])
+        surface.refresh(self.display, bytearray(75 * 17))
+
+        self.assertEqual(self.display.blitted, 32 * 24)
+        surface.disable_tile_hashes()
+        self.assertEqual(bytes(self.display_buffer), self.expected(surface))
+
+    def test_buffer_too_small(self):
+        surface, drawing = self.make_surface()
+        surface.enable_tile_hashes(75, 50)
+
+        with self.assertRaises(ValueError):
+            surface.refresh(self.display, bytearray(2 * 75 * 5))
+
+    def test_mono(self):
+        surface = Surface(framebuf.MONO_VLSB)
+
+        with self.assertRaises(ValueError):
+            surface.enable_tile_hashes(75, 50)
+
+
+class FillingDisplay(CountingDisplay):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fills = []
+
+    def fill(self, x, y, w, h, color):
+        self.fills.append((x, y, w, h))
+        super().fill(x, y, w, h, color)
+
+
+class TestSolidFill(unittest.TestCase):
+
+    def setUp(self):
+        self.display_buffer = bytearray(2 * 75 * 50)
+        self.display = FillingDisplay(
+            framebuf.FrameBuffer(self.display_buffer, 75, 50, framebuf.RGB565),
+            (75, 50),
+        )
+
+    def make_surface(self, *args):
+        surface = Surface(*args)
+        surface.rectangles(BACKGROUND, (0, 0, 75, 50), "#000000")
+        surface.vlines(UNDERLAY, [(x, 0, 50) for x in range(1, 75, 5)], "blue")
+        drawing = surface.rectangles(DRAWING, (25, 10, 20, 20), "white")
+        return surface, drawing
+
+    def expected(self, surface):
+        display_buffer = bytearray(2 * 75 * 50)
+        display = FrameBufferDisplay(
+            framebuf.FrameBuffer(display_buffer, 75, 50, framebuf.RGB565),
+            (75, 50),
+        )
+        surface.damage((0, 0, 75, 50))
+        surface.refresh(display, bytearray(2 * 75 * 11))
+        return display_buffer
+
+    def test_covered(self):
+        surface, drawing = self.make_surface()
+        surface.refresh(self.display, bytearray(2 * 75 * 17))
+        self.display.blitted = 0
+
+        surface.damage((30, 12, 10, 10))
+        surface.refresh(self.display, bytearray(2 * 75 * 17))
+
+        self.assertEqual(self.display.fills, [(30, 12, 10, 10)])
+        self.assertEqual(self.display.blitted, 0)
+        self.assertEqual(surface.solid_fills, 1)
+        self.assertEqual(self.display_buffer, self.expected(surface))
+
+    def test_not_covered(self):
+        surface, drawing = self.make_surface()
+        surface.refresh(self.display, bytearray(2 * 75 * 17))
+
+        # the rectangle doesn't cover the damage, and the vlines show through
+        surface.damage((20, 12, 10, 10))
+        surface.refresh(self.display, bytearray(2 * 75 * 17))
+
+        self.assertEqual(self.display.fills, [])
+        self.assertEqual(surface.solid_fills, 0)
+
+    def test_shape_above(self):
+        surface, drawing = self.make_surface()
+        surface.points(OVERLAY, [(35, 15)], "red", "+")
+        surface.refresh(self.display, bytearray(2 * 75 * 17))
+
+        surface.damage((30, 12, 10, 10))
+        surface.refresh(self.display, bytearray(2 * 75 * 17))
+
+        self.assertEqual(self.display.fills, [])
+
+    def test_indexed(self):
+        surface, drawing = self.make_surface(framebuf.GS8, ["#000000", "white", "blue"])
+        surface.refresh(self.display, bytearray(75 * 17))
+
+        surface.damage((30, 12, 10, 10))
+        surface.refresh(self.display, bytearray(75 * 17))
+
+        self.assertEqual(self.display.fills, [(30, 12, 10, 10)])
+        self.assertEqual(self.display_buffer, self.expected(surface))
+
+
+class SlowDisplay(FrameBufferDisplay):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.strips = 0
+
+    def blit(self, buffer, x, y, w, h, stride=None):
+        self.strips += 1
+        time.sleep(0.002)
+        super().blit(buffer, x, y, w, h, stride)
+
+
+class TestTimeSlicedRefresh(unittest.TestCase):
+
+    def setUp(self):
+        self.display_buffer = bytearray(2 * 40 * 40)
+        self.display = SlowDisplay(
+            framebuf.FrameBuffer(self.display_buffer, 40, 40, framebuf.RGB565),
+            (40, 40),
+        )
+        self.surface = Surface()
+        self.surface.rectangles(BACKGROUND, (0, 0, 40, 40), "#000000")
+        self.surface.vlines(UNDERLAY, [(x, 0, 40) for x in range(0, 40, 3)], "blue")
+        self.drawing = self.surface.rectangles(DRAWING, (5, 5, 10, 10), "white")
+
+    def expected(self):
+        display_buffer = bytearray(2 * 40 * 40)
+        display = FrameBufferDisplay(
+            framebuf.FrameBuffer(display_buffer, 40, 40, framebuf.RGB565),
+            (40, 40),
+        )
+        self.surface.damage((0, 0, 40, 40))
+        self.surface.refresh(display, bytearray(2 * 40 * 41))
+        return display_buffer
+
+    def run_refresh(self, budget, during=None):
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(self.display.strips)
+                if during is not None and self.display.strips == 3:
+                    during()
+                await asyncio.sleep(0)
+
+        async def run():
+            ticker_task = asyncio.create_task(ticker())
+            refresh_task = asyncio.create_task(
+                self.surface.arefresh(self.display, bytearray(2 * 40 * 5), budget)
+            )
+            while self.surface._damage or self.surface._refreshing or not ticks:
+                await asyncio.sleep(0.001)
+            refresh_task.cancel()
+            ticker_task.cancel()
+
+        asyncio.run(run())
+        return ticks
+
+    def test_sliced(self):
+        ticks = self.run_refresh(1000)
+
+        # other tasks ran between the strips of the damaged region
+        self.assertGreater(self.display.strips, 5)
+        self.assertGreater(len(set(ticks)), 5)
+        self.assertLess(self.surface.worst_stall_us, 10000)
+
+    def test_unsliced(self):
+        ticks = self.run_refresh(None)
+
+        self.assertNotIn(3, ticks)
+        self.assertGreater(self.surface.worst_stall_us, 10000)
+
+    def test_damage_mid_frame(self):
+        ticks = self.run_refresh(
+            1000, lambda: self.drawing.update(geometry=[(20, 20, 10, 10)])
+        )
+
+        self.assertIn(3, ticks)
+        self.assertEqual(self.display_buffer, self.expected())
+
+
+class TestHitTest(unittest.TestCase):
+
+    def setUp(self):
+        self.surface = Surface()
+        self.background = self.surface.rectangles(BACKGROUND, (0, 0, 100, 100), "#000000")
+        self.buttons = self.surface.rectangles(
+            DRAWING, [(10, 10, 20, 10), (40, 10, 20, 10), (50, 15, 20, 10)], "white"
+        )
+        self.dots = self.surface.circles(
+            OVERLAY, [(5 * i, 80, 1) for i in range(20)], "red", clip=(0, 70, 50, 20)
+        )
+
+    def test_hit_test(self):
+        hits = self.surface.hit_test(15, 15)
+
+        self.assertEqual(hits, [self.buttons, self.background])
+
+    def test_hit_test_items(self):
+        hits = self.surface.hit_test(55, 17, items=True)
+
+        self.assertEqual(
+            hits, [(self.buttons, 2), (self.buttons, 1), (self.background, 0)]
+        )
+
+    def test_between_items(self):
+        hits = self.surface.hit_test(35, 15)
+
+        self.assertEqual(hits, [self.background])
+
+    def test_cell_grid(self):
+        from tempe.spatial_index import CellGrid
+
+        # float extents, with an empty item which is never found
+        extents = array("f", [0.0, 0.0, 1.5, 1.5, 2.5, 0.5, 4.0, 3.0, 3.0, 3.0, 2.0, 2.0])
+        grid = CellGrid(extents, 0.0, 0.0, 1.0, 1.0, 4, 4)
+
+        self.assertEqual(grid.overlapping(1.0, 1.0, 3.0, 1.0), [0, 1])
+        self.assertEqual(grid.overlapping(-5.0, -5.0, 10.0, 10.0), [0, 1])
+        self.assertEqual(grid.overlapping(2.0, 2.0, 2.2, 2.2), [])
+        self.assertEqual(grid.overlapping(5.0, 5.0, 6.0, 6.0), [])
+
+    def test_clip(self):
+        self.assertEqual(self.surface.hit_test(45, 80, items=True)[0], (self.dots, 9))
+        # outside the clip, although the item is there
+        self.assertEqual(self.surface.hit_test(75, 80), [self.background])
+
+    def test_query(self):
+        hits = self.surface.query((8, 78, 10, 4), items=True)
+
+        self.assertEqual(
+            hits,
+            [(self.dots, 3), (self.dots, 2), (self.background, 0)],
+        )
+
+    def test_update(self):
+        self.surface.hit_test(15, 15)
+        builds = self.surface._spatial_index.builds
+
+        # no rebuild for unchanged shapes
+        self.surface.hit_test(45, 15)
+        self.assertEqual(self.surface._spatial_index.builds, builds)
+
+        self.buttons.update(geometry=[(80, 80, 10, 10)])
+        self.assertEqual(self.surface.hit_test(15, 15), [self.background])
+        self.assertEqual(self.surface.hit_test(85, 85), [self.buttons, self.background])
+
+    def test_remove(self):
+        self.surface.hit_test(15, 15)
+        self.surface.remove_shape(DRAWING, self.buttons)
+
+        self.assertEqual(self.surface.hit_test(15, 15), [self.background])
+        self.assertNotIn(self.buttons, self.surface._spatial_index._grids)
+
+    def test_many_items(self):
+        surface = Surface()
+        points = surface.points(
+            DRAWING, [(i % 100 * 3, i // 100 * 3) for i in range(2000)], "white", 0
+        )
+        surface.enable_hit_testing(16)
+
+        self.assertEqual(surface.hit_test(30, 33, items=True), [(points, 1110)])
+        self.assertEqual(
+            [index for shape, index in surface.query((30, 33, 4, 1), items=True)],
+            [1111, 1110],
+        )
+
+    def test_text(self):
+        text = self.surface.text(OVERLAY, [(10, 40), (10, 60)], "white", ["Hello", ""])
+
+        self.assertEqual(self.surface.hit_test(20, 45, items=True)[0], (text, 0))
+        self.assertEqual(self.surface.hit_test(10, 60), [self.background])
+        self.assertEqual(text._bounds, (10, 40, 40, 10))
+
+
+class TestRasterPool(unittest.TestCase):
+
+    def test_raster_reused(self):
+        buf = bytearray(2 * 20 * 10)
+        pool = RasterPool()
+
+        raster_1 = pool.raster(buf, 0, 0, 20, 10)
+        raster_2 = pool.raster(buf, 5, 5, 20, 10)
+
+        self.assertIs(raster_1, raster_2)
+        self.assertEqual((raster_2.x, raster_2.y), (5, 5))
+
+    def test_clip(self):
+        buf = bytearray(2 * 20 * 10)
+        pool = RasterPool()
+        raster = pool.raster(buf, 10, 10, 20, 10)
+
+        clipped = pool.clip(raster, 15, 12, 30, 3)
+
+        self.assertEqual(
+            (clipped.x, clipped.y, clipped.w, clipped.h, clipped.stride, clipped.offset),
+            (15, 12, 15, 3, 20, 45),
+        )
+        self.assertIsNone(pool.clip(raster, 0, 0, 5, 5))
+
+    def test_bounded(self):
+        buf = bytearray(2 * 20 * 10)
+        pool = RasterPool(4)
+
+        for i in range(10):
+            pool.raster(buf, 0, 0, 10, 10, 20, i)
+
+        self.assertLessEqual(pool._count, 4)
+
+    def test_pixel_size(self):
+        pool = RasterPool()
+
+        raster = pool.raster(bytearray(2 * 20 * 10), 0, 0, 20, 10)
+        mono = pool.raster(bytearray(20 * 10), 0, 0, 20, 10, format=framebuf.MONO_HLSB)
+
+        self.assertEqual((raster.bits, raster.pixel_size), (16, 2))
+        self.assertEqual((mono.bits, mono.pixel_size), (1, 0))
+
 
 
 if __name__ == "__main__":
@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import unittest
+
+from tempe.surface import Surface, BACKGROUND, DRAWING, OVERLAY
+from tempe.touch import TouchDispatcher
+
+
+class TestTouchDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.surface = Surface()
+        self.surface.rectangles(BACKGROUND, (0, 0, 100, 100), "#000000")
+        self.buttons = self.surface.rectangles(
+            DRAWING, [(10, 10, 30, 20), (50, 10, 30, 20)], "grey"
+        )
+        self.labels = self.surface.text(OVERLAY, [(12, 12), (52, 12)], "white", ["Up", "Down"])
+        self.dispatcher = TouchDispatcher(self.surface)
+        self.events = []
+        self.dispatcher.add_handler(
+            self.buttons,
+            lambda shape, index, x, y: self.events.append(("press", index, x, y)),
+            lambda shape, index, x, y: self.events.append(("release", index, x, y)),
+        )
+
+    def test_press_release(self):
+        # through the label, which has no handler
+        shape = self.dispatcher.press(60, 15)
+        self.dispatcher.release(62, 16)
+
+        self.assertIs(shape, self.buttons)
+        self.assertEqual(self.events, [("press", 1, 60, 15), ("release", 1, 62, 16)])
+
+    def test_miss(self):
+        self.assertIsNone(self.dispatcher.press(45, 15))
+        self.assertIsNone(self.dispatcher.release(45, 15))
+        self.assertEqual(self.events, [])
+
+    def test_remove_handler(self):
+        self.dispatcher.press(20, 20)
+        self.dispatcher.remove_handler(self.buttons)
+        self.dispatcher.release(20, 20)
+
+        self.assertEqual(self.dispatcher.press(20, 20), None)
+        self.assertEqual(self.events, [("press", 0, 20, 20)])
+
+    def test_run(self):
+        touches = [None, (20, 15), (21, 15), None, None, (70, 25), None]
+
+        def read_touch():
+            if touches:
+                return touches.pop(0)
+            raise asyncio.CancelledError()
+
+        async def run():
+            try:
+                await self.dispatcher.run(read_touch, interval=0)
+            except asyncio.CancelledError:
+                pass
+
+        asyncio.run(run())
+
+        self.assertEqual(
+            self.events,
+            [
+                ("press", 0, 20, 15),
+                ("release", 0, 21, 15),
+                ("press", 1, 70, 25),
+                ("release", 1, 70, 25),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    result = unittest.main()
+    if not result.wasSuccessful():
+        import sys
+
+        sys.exit(1)
@@ -0,0 +1,173 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+from array import array
+import framebuf
+import unittest
+
+from tempe.geometry import RowGeometry
+from tempe.raster import Raster
+from tempe.util import (
+    ArrayBuffer, copy_rows, expand_palette, shift_rect, simplify_points
+)
+
+
+class TestArrayBuffer(unittest.TestCase):
+    def test_same_size(self):
+        buffer = ArrayBuffer("h")
+        first = buffer.get(10)
+        second = buffer.get(10)
+
+        self.assertIs(first, second)
+        self.assertEqual(len(first), 10)
+
+    def test_shrink(self):
+        buffer = ArrayBuffer("h")
+        buffer.get(10)
+        view = buffer.get(4)
+
+        self.assertEqual(len(view), 4)
+        self.assertEqual(buffer.capacity, 10)
+
+    def test_grow(self):
+        buffer = ArrayBuffer("h", 10)
+        view = buffer.get(12)
+
+        self.assertEqual(len(view), 12)
+        self.assertEqual(buffer.capacity, 15)
+
+        view = buffer.get(40)
+        self.assertEqual(len(view), 40)
+        self.assertEqual(buffer.capacity, 40)
+
+
+class TestRowGeometryRefill(unittest.TestCase):
+    def test_refill_same_size(self):
+        geometry = RowGeometry.from_lists([(1, 2, 3, 4)])
+        row = geometry.geometry[0]
+        geometry.refill([(5, 6, 7, 8)])
+
+        self.assertIs(geometry.geometry[0], row)
+        self.assertEqual(list(row), [5, 6, 7, 8])
+
+    def test_refill_resize(self):
+        geometry = RowGeometry.from_lists([(1, 2), (3, 4)])
+        geometry.refill([(5, 6, 7)])
+
+        self.assertEqual(len(geometry), 1)
+        self.assertEqual(list(geometry.geometry[0]), [5, 6, 7])
+
+        geometry.refill([(1, 2, 3), (4, 5, 6)])
+        self.assertEqual([list(row) for row in geometry], [[1, 2, 3], [4, 5, 6]])
+        self.assertEqual(geometry.coords, 3)
+
+    def test_refill_coords(self):
+        geometry = RowGeometry.from_lists([(1, 2, 3, 4), (5, 6, 7, 8)])
+        self.assertEqual(geometry.coords, 4)
+
+        geometry.refill([(1, 2), (3, 4)])
+        self.assertEqual(geometry.coords, 2)
+
+        geometry.refill([(1, 2), (3, 4, 5, 6)])
+        self.assertIsNone(geometry.coords)
+
+        geometry.refill([(1, 2, 3), (4, 5, 6)])
+        self.assertEqual(geometry.coords, 3)
+
+
+class TestExpandPalette(unittest.TestCase):
+    def assert_expands(self, format):
+        raster = Raster.from_rect(0, 0, 11, 10, format)
+        for y in range(10):
+            for x in range(11):
+                raster.fbuf.pixel(x, y, (x * y + x) & 1)
+        palette = array("H", [0x1234, 0xABCD])
+        row = array("H", bytes(2 * 11))
+
+        for y in range(10):
+            expand_palette(row, raster.buf, y, 11, raster.stride, palette, format)
+            self.assertEqual(list(row), [palette[(x * y + x) & 1] for x in range(11)])
+
+    def test_mono_vlsb(self):
+        self.assert_expands(framebuf.MONO_VLSB)
+
+    def test_mono_hlsb(self):
+        self.assert_expands(framebuf.MONO_HLSB)
+
+
+class TestCopyRows(unittest.TestCase):
+    def test_copy_rows(self):
+        src = bytes(range(40))
+        dest = bytearray(12)
+
+        copy_rows(dest, src, 3, 4, 10, 3)
+
+        self.assertEqual(list(dest), [3, 4, 5, 6, 13, 14, 15, 16, 23, 24, 25, 26])
+
+
+class TestShiftRect(unittest.TestCase):
+    def assert_shifts(self, dx, dy):
+        buf = bytearray(range(80))
+        expected = bytearray(buf)
+        # a 5x4 rectangle of bytes starting at offset 12, with stride 10
+        for row in range(4):
+            for column in range(5):
+                if 0 <= row - dy < 4 and 0 <= column - dx < 5:
+                    source = 12 + (row - dy) * 10 + column - dx
+                    expected[12 + row * 10 + column] = buf[source]
+
+        shift_rect(buf, 12, 5, 4, 10, dx, dy)
+
+        self.assertEqual(buf, expected)
+
+    def test_shift_down_right(self):
+        self.assert_shifts(2, 1)
+
+    def test_shift_up_left(self):
+        self.assert_shifts(-3, -2)
+
+    def test_shift_too_far(self):
+        self.assert_shifts(0, 4)
+
+
+class TestSimplifyPoints(unittest.TestCase):
+    def test_collinear(self):
+        points = array("h", [i for x in range(10) for i in (x, 2 * x)])
+        self.assertEqual(list(simplify_points(points, 10, 1, ArrayBuffer())), [0, 0, 9, 18])
+
+    def test_within_tolerance(self):
+        points = array("h", [0, 0, 5, 1, 10, 0, 15, -1, 20, 0])
+        self.assertEqual(list(simplify_points(points, 5, 1, ArrayBuffer())), [0, 0, 20, 0])
+        self.assertEqual(list(simplify_points(points, 5, 0.5, ArrayBuffer())), [0, 0, 5, 1, 15, -1, 20, 0])
+
+    def test_corner(self):
+        points = array("h", [0, 0, 5, 0, 10, 0, 10, 5, 10, 10])
+        self.assertEqual(list(simplify_points(points, 5, 1, ArrayBuffer())), [0, 0, 10, 0, 10, 10])
+
+    def test_closed(self):
+        # first and last points the same, as for a closed outline
+        points = array("h", [0, 0, 10, 0, 10, 10, 0, 10, 0, 0])
+        self.assertEqual(list(simplify_points(points, 5, 1, ArrayBuffer())), list(points))
+
+    def test_short(self):
+        points = array("h", [1, 2, 3, 4])
+        self.assertEqual(list(simplify_points(points, 2, 1, ArrayBuffer())), [1, 2, 3, 4])
+
+    def test_reuses_buffer(self):
+        out = ArrayBuffer("h", 8)
+        points = array("h", [0, 0, 5, 1, 10, 0, 15, -1, 20, 0])
+
+        simplify_points(points, 5, 0.5, out)
+        storage = out._array
+        self.assertEqual(list(simplify_points(points, 5, 1, out)), [0, 0, 20, 0])
+
+        self.assertIs(out._array, storage)
+
+
+if __name__ == "__main__":
+    result = unittest.main()
+    if not result.wasSuccessful():
+        import sys
+
+        sys.exit(1)
@@ -0,0 +1,228 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+import framebuf
+import unittest
+
+from tempe.display import FrameBufferDisplay
+from tempe.surface import Surface, BACKGROUND, DRAWING, OVERLAY
+from tempe.window import Window
+
+
+class ScrollingDisplay(FrameBufferDisplay):
+    """A display which counts blitted pixels and can shift pixels."""
+
+    def __init__(self, *args, can_scroll=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.can_scroll = can_scroll
+        self.blitted = 0
+        self.scrolls = []
+
+    def blit(self, buffer, x, y, w, h, stride=None):
+        self.blitted += w * h
+        super().blit(buffer, x, y, w, h, stride)
+
+    def scroll(self, rect, dx, dy):
+        if not self.can_scroll:
+            return False
+        self.scrolls.append((rect, dx, dy))
+        x, y, w, h = rect
+        fbuf = self.fbuf
+        pixels = [[fbuf.pixel(x + i, y + j) for i in range(w)] for j in range(h)]
+        for j in range(h):
+            for i in range(w):
+                if 0 <= i - dx < w and 0 <= j - dy < h:
+                    fbuf.pixel(x + i, y + j, pixels[j - dy][i - dx])
+        return True
+
+
+class TestWindowScroll(unittest.TestCase):
+
+    def setUp(self):
+        self.display_buffer = bytearray(2 * 60 * 40)
+        self.display = ScrollingDisplay(
+            framebuf.FrameBuffer(self.display_buffer, 60, 40, framebuf.RGB565),
+            (60, 40),
+        )
+
+    def make_surface(self):
+        surface = Surface()
+        surface.rectangles(BACKGROUND, (0, 0, 60, 40), "#000000")
+        window = Window(offset=(0, 5), clip=(0, 5, 60, 30))
+        surface.add_shape(DRAWING, window)
+        window.subsurface.hlines(DRAWING, [(i % 7, i, 40 + i % 13) for i in range(80)], "white")
+        window.update()
+        return surface, window
+
+    def expected(self, surface):
+        display_buffer = bytearray(2 * 60 * 40)
+        display = FrameBufferDisplay(
+            framebuf.FrameBuffer(display_buffer, 60, 40, framebuf.RGB565),
+            (60, 40),
+        )
+        surface.damage((0, 0, 60, 40))
+        surface.refresh(display, bytearray(2 * 60 * 40))
+        return display_buffer
+
+    def test_scroll_exposed_only(self):
+        surface, window = self.make_surface()
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+        self.display.blitted = 0
+
+        window.update(offset=(0, 1))
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        self.assertEqual(self.display.scrolls, [((0, 5, 60, 30), 0, -4)])
+        self.assertEqual(self.display.blitted, 60 * 4)
+        self.assertEqual(self.display_buffer, self.expected(surface))
+
+    def test_scroll_with_overlay(self):
+        surface, window = self.make_surface()
+        surface.rectangles(OVERLAY, (20, 15, 10, 5), "red")
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        window.update(offset=(3, 8))
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        self.assertEqual(len(self.display.scrolls), 1)
+        self.assertEqual(self.display_buffer, self.expected(surface))
+
+    def test_pending_damage(self):
+        surface, window = self.make_surface()
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        window.subsurface.rectangles(DRAWING, (10, 10, 5, 5), "blue")
+        window.update()
+        window.update(offset=(0, 2))
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        self.assertEqual(self.display_buffer, self.expected(surface))
+
+    def test_fallback(self):
+        self.display.can_scroll = False
+        surface, window = self.make_surface()
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+        self.display.blitted = 0
+
+        window.update(offset=(0, 1))
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        self.assertEqual(self.display.blitted, 60 * 30)
+        self.assertEqual(self.display_buffer, self.expected(surface))
+
+    def test_no_solid_background(self):
+        surface, window = self.make_surface()
+        surface.vlines(BACKGROUND, [(5, 0, 40)], "blue")
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        window.update(offset=(0, 1))
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        # the vline would move with the pixels, so the window is redrawn
+        self.assertEqual(self.display.scrolls, [])
+        self.assertEqual(self.display_buffer, self.expected(surface))
+
+
+class CountingDisplay(FrameBufferDisplay):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.blitted = 0
+
+    def blit(self, buffer, x, y, w, h, stride=None):
+        self.blitted += w * h
+        super().blit(buffer, x, y, w, h, stride)
+
+
+class TestFrameBufferScroll(unittest.TestCase):
+
+    def make_display(self, format=framebuf.RGB565):
+        size = 2 * 60 * 40 if format == framebuf.RGB565 else 8 * 40
+        self.display_buffer = bytearray(size)
+        self.display = CountingDisplay(
+            framebuf.FrameBuffer(self.display_buffer, 60, 40, format),
+            (60, 40),
+            format=format,
+            buffer=self.display_buffer,
+        )
+
+    def make_surface(self, format=framebuf.RGB565, clip=(8, 5, 40, 30)):
+        surface = Surface(format)
+        surface.rectangles(BACKGROUND, (0, 0, 60, 40), "#000000")
+        window = Window(offset=(8, 5), clip=clip, format=format)
+        surface.add_shape(DRAWING, window)
+        window.subsurface.hlines(DRAWING, [(i % 7, i, 30 + i % 13) for i in range(80)], "white")
+        window.update()
+        return surface, window
+
+    def expected(self, surface, format=framebuf.RGB565):
+        display_buffer = bytearray(len(self.display_buffer))
+        display = FrameBufferDisplay(
+            framebuf.FrameBuffer(display_buffer, 60, 40, format), (60, 40), format=format
+        )
+        surface.damage((0, 0, 60, 40))
+        surface.refresh(display, bytearray(2 * 60 * 40))
+        return display_buffer
+
+    def test_shift(self):
+        self.make_display()
+        surface, window = self.make_surface()
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+        self.display.blitted = 0
+
+        window.update(offset=(6, 2))
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        self.assertLessEqual(self.display.blitted, 40 * 3 + 30 * 2)
+        self.assertEqual(self.display_buffer, self.expected(surface))
+
+        window.update(offset=(9, 7))
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        self.assertEqual(self.display_buffer, self.expected(surface))
+
+    def test_mono(self):
+        self.make_display(framebuf.MONO_HLSB)
+        surface, window = self.make_surface(framebuf.MONO_HLSB)
+        surface.refresh(self.display, bytearray(60 * 10))
+        self.display.blitted = 0
+
+        window.update(offset=(8, 1))
+        surface.refresh(self.display, bytearray(60 * 10))
+
+        self.assertEqual(self.display.blitted, 40 * 4)
+        self.assertEqual(
+            self.display_buffer, self.expected(surface, framebuf.MONO_HLSB)
+        )
+
+    def test_no_buffer(self):
+        self.make_display()
+        self.display.raster = None
+        surface, window = self.make_surface()
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+        self.display.blitted = 0
+
+        window.update(offset=(8, 1))
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        self.assertEqual(self.display.blitted, 40 * 30)
+        self.assertEqual(self.display_buffer, self.expected(surface))
+
+    def test_unclipped(self):
+        self.make_display()
+        surface, window = self.make_surface(clip=None)
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        window.update(offset=(2, 4))
+        surface.refresh(self.display, bytearray(2 * 60 * 10))
+
+        self.assertEqual(self.display_buffer, self.expected(surface))
+
+
+if __name__ == "__main__":
+    result = unittest.main()
+    if not result.wasSuccessful():
+        import sys
+
+        sys.exit(1)
@@ -0,0 +1,154 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+from array import array
+import framebuf
+import unittest
+
+from tempe.display import FrameBufferDisplay
+from tempe.surface import Surface, BACKGROUND, DRAWING
+from tempe.world_geometry import Viewport, WorldGeometry
+
+
+class TestViewport(unittest.TestCase):
+
+    def test_to_screen(self):
+        viewport = Viewport((10, 20, 100, 50), 1000, 2000, 0.5)
+        self.assertEqual(viewport.to_screen(1000, 2000), (10, 20))
+        self.assertEqual(viewport.to_screen(1200, 2100), (110, 70))
+        self.assertEqual(viewport.to_world(110, 70), (1200, 2100))
+        self.assertEqual(viewport.world_rect(), (1000, 2000, 1200, 2100))
+
+    def test_pan(self):
+        viewport = Viewport((0, 0, 100, 50), 1000, 2000, 2)
+        viewport.pan(10, -20)
+        self.assertEqual(viewport.version, 1)
+        # contents move with the pan
+        self.assertEqual(viewport.to_screen(1000, 2000), (10, -20))
+
+    def test_zoom(self):
+        viewport = Viewport((0, 0, 100, 50), 1000, 2000, 1)
+        viewport.zoom(4, 20, 10)
+        self.assertEqual(viewport.scale, 4)
+        # the world point under the zoom center stays put
+        self.assertEqual(viewport.to_screen(1020, 2010), (20, 10))
+        self.assertEqual(viewport.to_screen(1021, 2010), (24, 10))
+
+
+class TestWorldGeometry(unittest.TestCase):
+
+    def make_grid(self, n, spacing=1000):
+        # points far beyond the 16-bit range
+        data = array("i")
+        for i in range(n):
+            for j in range(n):
+                data.append(100000 + i * spacing)
+                data.append(-100000 + j * spacing)
+        return data
+
+    def test_visible(self):
+        viewport = Viewport((0, 0, 40, 30), 100000, -100000, 0.01)
+        geometry = WorldGeometry(self.make_grid(10), 2, viewport)
+        # 1000 units per 10 pixels, with the pixel of rounding margin
+        self.assertEqual(len(geometry), 20)
+        self.assertEqual(
+            [list(row) for row in geometry][:5],
+            [[0, 0], [0, 10], [0, 20], [0, 30], [10, 0]],
+        )
+
+        viewport.pan(-15, -15)
+        self.assertEqual(
+            [list(row) for row in geometry],
+            [
+                [5, 5], [5, 15], [5, 25],
+                [15, 5], [15, 15], [15, 25],
+                [25, 5], [25, 15], [25, 25],
+                [35, 5], [35, 15], [35, 25],
+            ],
+        )
+
+    def test_cull_large_dataset(self):
+        n = 150
+        viewport = Viewport((0, 0, 32, 24), 100000, -100000, 0.01)
+        geometry = WorldGeometry(self.make_grid(n), 2, viewport)
+        geometry.visible()
+        # only rows in nearby cells are checked
+        self.assertLess(geometry.candidates, n * n // 100)
+
+        viewport.pan(-400, -500)
+        visible = geometry.visible()
+        self.assertLess(geometry.candidates, n * n // 100)
+        expected = []
+        for i in range(n):
+            for j in range(n):
+                x = i * 10 - 400
+                y = j * 10 - 500
+                if -1 <= x <= 33 and -1 <= y <= 25:
+                    expected.append(i * n + j)
+        self.assertEqual(visible, expected)
+
+    def test_pack(self):
+        viewport = Viewport((0, 0, 40, 30), 99990, -100010, 0.02)
+        geometry = WorldGeometry(self.make_grid(5), 2, viewport)
+        buffer = array("h", bytearray(2 * 2 * 3))
+
+        packed = []
+        for n in geometry.pack(buffer):
+            packed.extend(buffer[: 2 * n])
+
+        self.assertEqual(packed, [v for row in geometry for v in row])
+
+    def test_visible_data(self):
+        viewport = Viewport((0, 0, 40, 30), 100000, -100000, 0.01)
+        geometry = WorldGeometry(self.make_grid(10), 2, viewport)
+        labels = [i for i in range(100)]
+        viewport.pan(-75, -75)
+        data = geometry.visible_data(labels)
+        self.assertEqual(list(data), [88, 89, 98, 99])
+        self.assertEqual(len(data), 4)
+        self.assertEqual(data[1], 89)
+
+    def test_float_points_and_sizes(self):
+        viewport = Viewport((0, 0, 40, 30), -1.0, -1.0, 10)
+        data = array("f", [0.0, 0.0, 3, 4, 1.5, 0.5, 2, 2, 10.0, 10.0, 5, 5])
+        geometry = WorldGeometry(data, 4, viewport, points=1)
+        self.assertEqual(
+            [list(row) for row in geometry],
+            [[10, 10, 3, 4], [25, 15, 2, 2]],
+        )
+
+    def test_draw(self):
+        viewport = Viewport((0, 0, 40, 30), 0, 0, 1)
+        data = array("i", [100000, 100000, 4, 4, 100010, 100005, 4, 4])
+        geometry = WorldGeometry(data, 4, viewport, points=1)
+        surface = Surface()
+        surface.rectangles(BACKGROUND, (0, 0, 40, 30), 0x0000)
+        rects = surface.rectangles(DRAWING, geometry, 0xFFFF, clip=viewport.rect)
+
+        viewport.set(99995, 99995)
+        rects.update(geometry=geometry)
+        result = self.render(surface)
+
+        expected_surface = Surface()
+        expected_surface.rectangles(BACKGROUND, (0, 0, 40, 30), 0x0000)
+        expected_surface.rectangles(DRAWING, [(5, 5, 4, 4), (15, 10, 4, 4)], 0xFFFF)
+        self.assertEqual(result, self.render(expected_surface))
+
+    def render(self, surface):
+        display_buffer = bytearray(2 * 40 * 30)
+        display = FrameBufferDisplay(
+            framebuf.FrameBuffer(display_buffer, 40, 30, framebuf.RGB565),
+            (40, 30),
+        )
+        surface.damage((0, 0, 40, 30))
+        surface.refresh(display, bytearray(2 * 40 * 10))
+        return display_buffer
+
+
+if __name__ == "__main__":
+    result = unittest.main()
+    if not result.wasSuccessful():
+        import sys
+
+        sys.exit(1)
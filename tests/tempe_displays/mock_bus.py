@@ -0,0 +1,169 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+"""Recording stand-ins for SPI buses and pins, for testing display drivers.
+
+This module provides ``Pin`` and ``SPI`` classes with the same names as
+the ``machine`` module, so that it can be installed as ``machine`` when
+running tests on a port which doesn't have them.
+"""
+
+_CASET = 0x2A
+_RASET = 0x2B
+_RAMWR = 0x2C
+_VSCRDEF = 0x33
+_VSCSAD = 0x37
+
+
+class Pin:
+    """A pin which remembers its value and reports changes."""
+
+    OUT = 1
+    IN = 0
+
+    def __init__(self, id=None, mode=None, value=0, callback=None):
+        self.id = id
+        self._value = value
+        self.callback = callback
+
+    def __call__(self, value=None):
+        if value is None:
+            return self._value
+        value = 1 if value else 0
+        changed = value != self._value
+        self._value = value
+        if changed and self.callback is not None:
+            self.callback(value)
+
+    def value(self, value=None):
+        return self(value)
+
+
+class SPI:
+    """An SPI bus which passes writes on to a RecordingBus."""
+
+    def __init__(self, id=0, *args, **kwargs):
+        self.bus = None
+
+    def write(self, buf):
+        if self.bus is not None:
+            self.bus.write(buf)
+
+
+class RecordingBus:
+    """An SPI bus with CS and DC pins connected to a simulated ST7789.
+
+    Transactions, bytes written and commands are counted, and writes to
+    display memory are decoded into ``memory``, which holds the big-endian
+    RGB565 contents of the panel.  The panel has as many lines of memory as
+    its height, and ``screen`` gives the image shown after vertical
+    scrolling.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.memory = bytearray(2 * width * height)
+        self.cs_pin = Pin(value=1, callback=self._cs_changed)
+        self.dc_pin = Pin()
+        self.spi = SPI()
+        self.spi.bus = self
+        self.reset_counts()
+        self._command = None
+        self._params = bytearray()
+        self._columns = (0, width - 1)
+        self._rows = (0, height - 1)
+        self.scroll_area = (0, height, 0)
+        self.scroll_start = 0
+        self._x = 0
+        self._y = 0
+        self._pending = None
+
+    def reset_counts(self):
+        self.transactions = 0
+        self.writes = 0
+        self.bytes_written = 0
+        self.commands = []
+
+    def count(self, command):
+        """The number of times a command byte was sent since the last reset."""
+        return self.commands.count(command)
+
+    def _cs_changed(self, value):
+        if value == 0:
+            self.transactions += 1
+
+    def write(self, buf):
+        if self.cs_pin() != 0:
+            raise RuntimeError("SPI write without CS asserted")
+        data = bytes(buf)
+        self.writes += 1
+        self.bytes_written += len(data)
+        if self.dc_pin() == 0:
+            for command in data:
+                self._start_command(command)
+        elif self._command == _RAMWR:
+            self._write_memory(data)
+        else:
+            self._params.extend(data)
+            self._update_params()
+
+    def _start_command(self, command):
+        self.commands.append(command)
+        self._command = command
+        self._params = bytearray()
+        if command == _RAMWR:
+            self._x = self._columns[0]
+            self._y = self._rows[0]
+            self._pending = None
+
+    def _update_params(self):
+        params = self._params
+        if len(params) == 4 and self._command in (_CASET, _RASET):
+            start = (params[0] << 8) | params[1]
+            end = (params[2] << 8) | params[3]
+            if self._command == _CASET:
+                self._columns = (start, end)
+            else:
+                self._rows = (start, end)
+        elif len(params) == 6 and self._command == _VSCRDEF:
+            self.scroll_area = (
+                (params[0] << 8) | params[1],
+                (params[2] << 8) | params[3],
+                (params[4] << 8) | params[5],
+            )
+        elif len(params) == 2 and self._command == _VSCSAD:
+            self.scroll_start = (params[0] << 8) | params[1]
+
+    def screen(self):
+        """The contents of the panel as displayed, after vertical scrolling."""
+        top, rows, bottom = self.scroll_area
+        row_bytes = 2 * self.width
+        screen = bytearray(len(self.memory))
+        for line in range(self.height):
+            source = line
+            if top <= line < top + rows:
+                source = top + (line - top + self.scroll_start - top) % rows
+            screen[line * row_bytes : (line + 1) * row_bytes] = self.memory[
+                source * row_bytes : (source + 1) * row_bytes
+            ]
+        return screen
+
+    def _write_memory(self, data):
+        x0, x1 = self._columns
+        y1 = self._rows[1]
+        memory = self.memory
+        for byte in data:
+            if self._pending is None:
+                self._pending = byte
+                continue
+            if self._y <= y1 and self._x < self.width and self._y < self.height:
+                i = 2 * (self._y * self.width + self._x)
+                memory[i] = self._pending
+                memory[i + 1] = byte
+            self._pending = None
+            self._x += 1
+            if self._x > x1:
+                self._x = x0
+                self._y += 1
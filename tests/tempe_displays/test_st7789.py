@@ -0,0 +1,295 @@
+# SPDX-FileCopyrightText: 2024-present Unital Software <info@unital.dev>
+#
+# SPDX-License-Identifier: MIT
+
+from array import array
+import sys
+import unittest
+
+import mock_bus
+
+try:
+    from machine import Pin, SPI
+except ImportError:
+    sys.modules["machine"] = mock_bus
+
+from tempe.surface import Surface, BACKGROUND, DRAWING
+from tempe_displays.st7789.spi import ST7789_SPI
+
+_CASET = 0x2A
+_RASET = 0x2B
+_RAMWR = 0x2C
+
+
+def pixels(w, h, seed=0):
+    return array("H", [(seed + 37 * i) & 0xFFFF for i in range(w * h)])
+
+
+class TestST7789Commands(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = mock_bus.RecordingBus(40, 30)
+        self.display = ST7789_SPI(
+            self.bus.spi, self.bus.cs_pin, self.bus.dc_pin, size=(40, 30)
+        )
+
+    def expected_memory(self, blits):
+        memory = bytearray(2 * 40 * 30)
+        for buf, x, y, w, h in blits:
+            data = bytes(buf)
+            for i in range(h):
+                start = 2 * ((y + i) * 40 + x)
+                memory[start : start + 2 * w] = data[2 * w * i : 2 * w * (i + 1)]
+        return memory
+
+    def test_blit_single_transaction(self):
+        buf = pixels(10, 5)
+        self.display.blit(buf, 3, 4, 10, 5)
+
+        self.assertEqual(self.bus.transactions, 1)
+        self.assertEqual(self.bus.commands, [_CASET, _RASET, _RAMWR])
+        self.assertEqual(self.bus.memory, self.expected_memory([(buf, 3, 4, 10, 5)]))
+
+    def test_unchanged_window_skipped(self):
+        buf_1 = pixels(10, 5)
+        buf_2 = pixels(10, 5, 11)
+        self.display.blit(buf_1, 3, 4, 10, 5)
+        self.bus.reset_counts()
+
+        self.display.blit(buf_2, 3, 4, 10, 5)
+
+        self.assertEqual(self.bus.transactions, 1)
+        self.assertEqual(self.bus.commands, [_RAMWR])
+        self.assertEqual(self.bus.bytes_written, 1 + 2 * 10 * 5)
+        self.assertEqual(self.bus.memory, self.expected_memory([(buf_2, 3, 4, 10, 5)]))
+
+    def test_changed_rows_only(self):
+        buf_1 = pixels(10, 5)
+        buf_2 = pixels(10, 5, 11)
+        self.display.blit(buf_1, 3, 4, 10, 5)
+        self.bus.reset_counts()
+
+        self.display.blit(buf_2, 3, 20, 10, 5)
+
+        self.assertEqual(self.bus.commands, [_RASET, _RAMWR])
+        self.assertEqual(
+            self.bus.memory,
+            self.expected_memory([(buf_1, 3, 4, 10, 5), (buf_2, 3, 20, 10, 5)]),
+        )
+
+    def test_invalidate_window(self):
+        buf = pixels(10, 5)
+        self.display.blit(buf, 3, 4, 10, 5)
+        self.display.memory_data_access_control(0)
+        self.bus.reset_counts()
+
+        self.display.blit(buf, 3, 4, 10, 5)
+
+        self.assertEqual(self.bus.commands, [_CASET, _RASET, _RAMWR])
+
+    def test_direct_address_commands(self):
+        self.display.set_column_address(0, 39)
+        self.display.set_row_address(0, 29)
+        self.bus.reset_counts()
+
+        self.display.fill(0, 0, 40, 30, b"\x12\x34")
+
+        self.assertEqual(self.bus.commands, [_RAMWR])
+        self.assertEqual(self.bus.memory, b"\x12\x34" * 40 * 30)
+
+    def test_command_single_transaction(self):
+        self.display.set_porch_control(0x0C, 0x0C, 0x00, 0x33, 0x33)
+
+        self.assertEqual(self.bus.transactions, 1)
+        self.assertEqual(self.bus.bytes_written, 6)
+
+
+class TestST7789StridedBlit(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = mock_bus.RecordingBus(40, 30)
+        self.display = ST7789_SPI(
+            self.bus.spi, self.bus.cs_pin, self.bus.dc_pin, size=(40, 30)
+        )
+
+    def assert_matches_contiguous(self, x, y, w, h, stride):
+        source = pixels(stride, h, 5)
+        contiguous = array("H", bytes(2 * w * h))
+        for i in range(h):
+            contiguous[i * w : (i + 1) * w] = source[i * stride + 3 : i * stride + 3 + w]
+        self.display.blit(contiguous, x, y, w, h)
+        expected = bytes(self.bus.memory)
+        self.bus.memory[:] = bytes(len(self.bus.memory))
+        self.bus.reset_counts()
+
+        self.display.blit(memoryview(bytes(source))[6:], x, y, w, h, stride)
+
+        self.assertEqual(self.bus.memory, expected)
+        self.assertEqual(self.bus.transactions, 1)
+
+    def test_gathered(self):
+        self.display.chunk_size = 100
+        self.assert_matches_contiguous(2, 3, 10, 12, 25)
+
+        # the window is unchanged, so RAMWR then 3 chunks of 5 rows
+        self.assertEqual(self.bus.writes, 1 + 3)
+
+    def test_default_chunk_size(self):
+        self.assert_matches_contiguous(0, 0, 17, 30, 21)
+
+        self.assertEqual(self.bus.writes, 1 + 1)
+
+    def test_rows_larger_than_chunk(self):
+        self.display.chunk_size = 30
+        self.assert_matches_contiguous(2, 3, 20, 4, 25)
+
+        self.assertEqual(self.bus.writes, 1 + 4)
+
+
+class TestST7789TileHashes(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = mock_bus.RecordingBus(40, 30)
+        self.display = ST7789_SPI(
+            self.bus.spi, self.bus.cs_pin, self.bus.dc_pin, size=(40, 30)
+        )
+        self.surface = Surface()
+        self.surface.rectangles(BACKGROUND, (0, 0, 40, 30), "#000000")
+        # not a solid color, so every tile is hashed
+        self.surface.rectangles(DRAWING, (0, 28, 40, 2), "#ffffff")
+        self.surface.enable_tile_hashes(40, 30)
+        self.working_buffer = bytearray(2 * 40 * 31)
+        self.surface.refresh(self.display, self.working_buffer)
+
+    def test_partial_run(self):
+        self.surface.rectangles(DRAWING, (2, 2, 4, 4), "#ffffff")
+        self.surface.damage((0, 0, 40, 30))
+        self.bus.reset_counts()
+
+        self.surface.refresh(self.display, self.working_buffer)
+
+        # only the first tile changed, and its rows are sent together
+        self.assertEqual(self.bus.transactions, 1)
+        self.assertEqual(self.bus.count(_RAMWR), 1)
+        expected = bytearray(2 * 40 * 28) + b"\xff" * 2 * 40 * 2
+        for y in range(2, 6):
+            expected[2 * (40 * y + 2) : 2 * (40 * y + 6)] = b"\xff" * 8
+        self.assertEqual(self.bus.screen(), expected)
+
+
+class TestST7789Fill(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = mock_bus.RecordingBus(40, 30)
+        self.display = ST7789_SPI(
+            self.bus.spi, self.bus.cs_pin, self.bus.dc_pin, size=(40, 30)
+        )
+
+    def test_fill(self):
+        self.display.fill(3, 4, 10, 5, 0x1234)
+
+        expected = bytearray(2 * 40 * 30)
+        for i in range(5):
+            start = 2 * ((4 + i) * 40 + 3)
+            expected[start : start + 20] = b"\x34\x12" * 10
+        self.assertEqual(self.bus.memory, expected)
+        self.assertEqual(self.bus.transactions, 1)
+
+    def test_clear_chunked(self):
+        self.display.chunk_size = 1000
+        self.display.fill(0, 0, 40, 30, b"\xff\xff")
+        self.bus.reset_counts()
+
+        self.display.clear()
+
+        self.assertEqual(self.bus.memory, bytes(2 * 40 * 30))
+        # the window is unchanged, so RAMWR then 3 chunks of the pattern
+        self.assertEqual(self.bus.writes, 1 + 3)
+
+    def test_pattern_reused(self):
+        self.display.fill(0, 0, 10, 10, 0x1234)
+        pattern = self.display._pattern
+
+        self.display.fill(5, 5, 20, 3, 0x1234)
+
+        self.assertIs(self.display._pattern, pattern)
+
+
+class TestST7789Scroll(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = mock_bus.RecordingBus(40, 30)
+        self.display = ST7789_SPI(
+            self.bus.spi, self.bus.cs_pin, self.bus.dc_pin, size=(40, 30)
+        )
+        self.display.memory_rows = 30
+        self.image = pixels(40, 30)
+        self.display.blit(self.image, 0, 0, 40, 30)
+
+    def expected_screen(self, image):
+        screen = bytearray(2 * 40 * 30)
+        for i in range(40 * 30):
+            screen[2 * i] = image[i] & 0xFF
+            screen[2 * i + 1] = image[i] >> 8
+        return screen
+
+    def test_scroll_up(self):
+        self.bus.reset_counts()
+
+        self.assertTrue(self.display.scroll((0, 5, 40, 20), 0, -3))
+
+        # no pixels are sent
+        self.assertEqual(self.bus.count(_RAMWR), 0)
+        expected = array("H", self.image)
+        expected[5 * 40 : 22 * 40] = self.image[8 * 40 : 25 * 40]
+        band = pixels(40, 3, 7)
+        expected[22 * 40 : 25 * 40] = band
+
+        self.display.blit(band, 0, 22, 40, 3)
+
+        self.assertEqual(self.bus.screen(), self.expected_screen(expected))
+
+    def test_blit_across_wrap(self):
+        self.display.scroll((0, 5, 40, 20), 0, 4)
+        self.display.scroll((0, 5, 40, 20), 0, 3)
+        image = pixels(40, 30, 3)
+
+        self.display.blit(bytes(image), 0, 0, 40, 30)
+
+        self.assertEqual(self.bus.screen(), self.expected_screen(image))
+
+    def test_fill_and_palette_across_wrap(self):
+        self.display.scroll((0, 5, 40, 20), 0, 6)
+        expected = array("H", self.image)
+        for i in range(10 * 40, 25 * 40):
+            expected[i] = 0x1234
+        self.display.fill(0, 10, 40, 15, 0x1234)
+        palette = array("H", [0x0000, 0xABCD])
+        indexed = bytearray([1] * 40 * 10)
+        for i in range(0, 10 * 40):
+            expected[i] = 0xABCD
+
+        self.display.blit_palette(indexed, 0, 0, 40, 10, 40, 6, palette)
+
+        self.assertEqual(self.bus.screen(), self.expected_screen(expected))
+
+    def test_partial_width(self):
+        self.assertFalse(self.display.scroll((5, 5, 30, 20), 0, 3))
+        self.assertFalse(self.display.scroll((0, 5, 40, 20), 3, 0))
+        self.assertEqual(self.bus.count(0x37), 0)
+
+    def test_other_area(self):
+        self.assertTrue(self.display.scroll((0, 5, 40, 20), 0, 3))
+
+        self.assertFalse(self.display.scroll((0, 0, 40, 20), 0, 3))
+
+        self.display.reset_scroll()
+        self.assertTrue(self.display.scroll((0, 0, 40, 20), 0, 3))
+
+
+if __name__ == "__main__":
+    result = unittest.main()
+    if not result.wasSuccessful():
+        import sys
+
+        sys.exit(1)